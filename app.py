@@ -1,50 +1,579 @@
 import os
 from flask import Flask, request, jsonify
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 from dotenv import load_dotenv
 
+from scripts.batch_issuance import issue_batch
+from scripts.certificate_pipeline import CertificatePipeline
+from scripts.event_indexer import EventIndexer
+from scripts.fee_oracle import FeeOracle
+from scripts.gas_profiles import GasProfiles
+from scripts.generate_certificate import CERTIFICATE_FIELDS, CertificateGenerator
+from scripts.ipfs_cid import bytes32_to_cid, cid_to_bytes32
+from scripts.ipfs_demo import PinataIPFS
+from scripts.ipfs_fetch import DEFAULT_GATEWAYS, ContentCache, GatewayFetcher
+from scripts.issuance_queue import IssuanceQueue, QueueSubmitter
+from scripts.merkle_campaign import TREE_FILE, ProofStore
+from scripts.multicall import MulticallReader
+from scripts.redemption import permit_deadline, permit_typed_data
+from scripts.reward_catalog import RewardCatalog
+from scripts.rpc_provider import PooledBatchProvider
+from scripts.signer_pool import SignerPool
+from scripts.view_cache import CacheInvalidator, ViewCache
+
 load_dotenv()
 
 app = Flask(__name__)
 
 # Config from .env file
 INFURA_URL = os.getenv("INFURA_SEPOLIA_URL")
+# Comma-separated fallback endpoints; the fastest healthy one is used
+RPC_URLS = os.getenv("RPC_URLS") or INFURA_URL
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "20"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "10"))
 OWNER_PRIVATE_KEY = os.getenv("OWNER_PRIVATE_KEY")
+# Comma-separated operator hot wallet keys, each enabled with setOperator and
+# given its own nonce stream; the owner key alone is used when unset
+OPERATOR_PRIVATE_KEYS = [
+    key.strip() for key in (os.getenv("OPERATOR_PRIVATE_KEYS") or OWNER_PRIVATE_KEY or "").split(",") if key.strip()
+]
+SIGNER_STUCK_AFTER = float(os.getenv("SIGNER_STUCK_AFTER", "60")) # seconds without a mined nonce
 MANAGER_CONTRACT_ADDRESS = os.getenv("MANAGER_CONTRACT_ADDRESS")
 MANAGER_CONTRACT_ABI = '[...]' # Get ABI from build file of Ape
+TOKEN_CONTRACT_ADDRESS = os.getenv("TOKEN_CONTRACT_ADDRESS")
+TOKEN_CONTRACT_ABI = '[...]' # Get ABI from build file of Ape
+MULTICALL_CONTRACT_ADDRESS = os.getenv("MULTICALL_CONTRACT_ADDRESS")
+MAX_SNAPSHOT_ADDRESSES = int(os.getenv("MAX_SNAPSHOT_ADDRESSES", "50000"))
+
+# Issuance queue: orders are persisted locally and submitted in the background
+ISSUANCE_QUEUE_PATH = os.getenv("ISSUANCE_QUEUE_PATH", "issuance_queue.db")
+ISSUANCE_RATE = float(os.getenv("ISSUANCE_RATE", "5")) # max submissions per second
+# Nonce sequences per operator key, shared by every worker process on this host
+NONCE_STORE_PATH = os.getenv("NONCE_STORE_PATH", ISSUANCE_QUEUE_PATH)
+
+# Fee oracle: EIP-1559 fees from eth_feeHistory, refreshed once per block
+FEE_REWARD_PERCENTILE = float(os.getenv("FEE_REWARD_PERCENTILE", "50"))
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "10"))
+FEE_BASE_MULTIPLIER = float(os.getenv("FEE_BASE_MULTIPLIER", "2"))
+
+# Gas limits: measured profiles (see scripts/profile_gas.py) times a safety margin
+GAS_PROFILE_PATH = os.getenv("GAS_PROFILE_PATH", "deployments/gas_profiles.json")
+GAS_MARGIN = float(os.getenv("GAS_MARGIN", "1.2"))
+
+# Batch issuance: chunks are sized so each tx stays under BATCH_GAS_LIMIT
+BATCH_GAS_LIMIT = int(os.getenv("BATCH_GAS_LIMIT", "5000000"))
+BATCH_RECEIPT_TIMEOUT = int(os.getenv("BATCH_RECEIPT_TIMEOUT", "120"))
+MAX_BATCH_SIZE = 200 # must match MAX_BATCH_SIZE in LoyaltyManager.vy
+MAX_CERTIFICATE_PAGE = 100 # must match MAX_PAGE_SIZE in LoyaltyManager.vy
+# Fallback sizing when there is no issueTokensBatch profile
+BATCH_BASE_GAS = 60000 # fixed cost of one issueTokensBatch call
+BATCH_GAS_PER_ORDER = 35000 # upper bound per order (first mint to a new address)
+
+# View cache: LRU of read results, evicted by contract events or TTL (seconds)
+VIEW_CACHE_SIZE = int(os.getenv("VIEW_CACHE_SIZE", "10000"))
+VIEW_CACHE_TTLS = {
+    'getRewardCost': 300,
+    'getRewardMetadata': 3600,
+    'getRewardImage': 3600,
+    'isCustomerRegistered': 3600,
+    'balanceOf': 30,
+    'getCertificateCount': 300,
+    'name': 86400,
+}
+
+# Certificates are rendered in memory and pinned; set CERTIFICATE_DIR to keep PDFs on disk
+PINATA_API_KEY = os.getenv("PINATA_API_KEY")
+PINATA_API_SECRET = os.getenv("PINATA_API_SECRET")
+PINATA_API_URL = os.getenv("PINATA_API_URL", "https://api.pinata.cloud")
+CERTIFICATE_DIR = os.getenv("CERTIFICATE_DIR")
+
+# Reward catalog: built from indexed events, metadata prefetched from IPFS gateways
+INDEXER_DB_PATH = os.getenv("INDEXER_DB_PATH", "loyalty_index.db")
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0")) # manager deployment block
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "12"))
+IPFS_GATEWAYS = os.getenv("IPFS_GATEWAYS", ",".join(DEFAULT_GATEWAYS)).split(",")
+IPFS_CACHE_DIR = os.getenv("IPFS_CACHE_DIR", "ipfs_cache")
+IPFS_CACHE_MAX_BYTES = int(os.getenv("IPFS_CACHE_MAX_BYTES", str(1 << 30)))
 
-w3 = Web3(Web3.HTTPProvider(INFURA_URL))
-owner_account = w3.eth.account.from_key(OWNER_PRIVATE_KEY)
+# Redemption permits: typed data the customer's wallet signs for redeemRewardWithPermit
+PERMIT_TTL = int(os.getenv("PERMIT_TTL", "600")) # seconds a signature stays valid
+
+# Merkle campaigns built by scripts/merkle_campaign.py, one directory per campaign id
+CAMPAIGN_DIR = os.getenv("CAMPAIGN_DIR", "campaigns")
+
+rpc_provider = PooledBatchProvider(RPC_URLS, pool_size=RPC_POOL_SIZE, timeout=RPC_TIMEOUT)
+w3 = Web3(rpc_provider)
 
 manager_contract = w3.eth.contract(address=MANAGER_CONTRACT_ADDRESS, abi=MANAGER_CONTRACT_ABI)
 
+# Startup reads go out as one JSON-RPC batch; chainId is reused for every tx
+startup_calls = [("eth_chainId", [])]
+if not TOKEN_CONTRACT_ADDRESS:
+    startup_calls.append(
+        ("eth_call", [{"to": MANAGER_CONTRACT_ADDRESS, "data": manager_contract.encode_abi("token_contract")}, "latest"])
+    )
+startup_results = rpc_provider.batch(startup_calls)
+CHAIN_ID = int(startup_results[0], 16)
+if not TOKEN_CONTRACT_ADDRESS:
+    # An address is returned right-aligned in one 32-byte word
+    TOKEN_CONTRACT_ADDRESS = w3.to_checksum_address("0x" + startup_results[1][-40:])
+token_contract = w3.eth.contract(address=TOKEN_CONTRACT_ADDRESS, abi=TOKEN_CONTRACT_ABI)
+
+# Storefront reads go through the cache; events evict entries as they change
+view_cache = ViewCache(maxsize=VIEW_CACHE_SIZE, ttls=VIEW_CACHE_TTLS)
+cache_invalidator = CacheInvalidator(w3, view_cache, [TOKEN_CONTRACT_ADDRESS, MANAGER_CONTRACT_ADDRESS])
+cache_invalidator.start()
+
+# The catalog is rebuilt from events in the background; requests only read memory
+event_indexer = EventIndexer(
+    w3, INDEXER_DB_PATH, TOKEN_CONTRACT_ADDRESS, MANAGER_CONTRACT_ADDRESS, start_block=INDEXER_START_BLOCK
+)
+ipfs_fetcher = GatewayFetcher(ContentCache(IPFS_CACHE_DIR, max_bytes=IPFS_CACHE_MAX_BYTES), gateways=IPFS_GATEWAYS)
+reward_catalog = RewardCatalog(event_indexer, ipfs_fetcher, refresh_interval=CATALOG_REFRESH_INTERVAL)
+reward_catalog.start()
+
+# Batched customer reads: one eth_call per ~500 addresses
+multicall_reader = None
+if MULTICALL_CONTRACT_ADDRESS:
+    multicall_reader = MulticallReader(w3, MULTICALL_CONTRACT_ADDRESS, TOKEN_CONTRACT_ADDRESS, MANAGER_CONTRACT_ADDRESS)
+
+# Fees are read from memory on the hot path instead of eth_gasPrice per request
+fee_oracle = FeeOracle(
+    w3,
+    reward_percentile=FEE_REWARD_PERCENTILE,
+    history_blocks=FEE_HISTORY_BLOCKS,
+    base_fee_multiplier=FEE_BASE_MULTIPLIER
+)
+fee_oracle.start()
+
+# Transactions are spread over the operator keys; nonces come from a SQLite
+# store so concurrent workers never hand out the same one
+signer_pool = SignerPool(
+    w3, OPERATOR_PRIVATE_KEYS, CHAIN_ID, fee_oracle.fees,
+    stuck_after=SIGNER_STUCK_AFTER, nonce_store=NONCE_STORE_PATH
+)
+signer_pool.start()
+# Any operator may call the manager, so gas estimates use the first one
+estimate_from = {'from': signer_pool.addresses[0]}
+
+gas_profiles = GasProfiles(GAS_PROFILE_PATH, margin=GAS_MARGIN)
+# Registration cache: customers known to be registered; anyone else is issued
+# through registerAndIssueTokens until a registration of ours is mined
+registered_customers = set()
+# tx hash -> customer for registerAndIssueTokens awaiting a receipt
+pending_registrations = {}
+# tx hash -> (function, shape) awaiting a receipt to refine the profile
+pending_gas_shapes = {}
+
+
+def send_manager_tx(contract_call, gas: int):
+    """Build, sign and send a LoyaltyManager call from the next operator"""
+    return signer_pool.send(contract_call, gas)
+
+
+def record_gas_used(function: str, shape, receipt):
+    """Refine the gas profile from a mined receipt"""
+    if gas_profiles.record(function, shape, receipt['gasUsed']):
+        gas_profiles.save()
+
+
+def batch_gas_limit(size: int) -> int:
+    try:
+        return gas_profiles.gas_limit('issueTokensBatch', size)
+    except KeyError:
+        return BATCH_BASE_GAS + BATCH_GAS_PER_ORDER * size
+
+
+def batch_chunk_size() -> int:
+    """Number of orders that fit in one issueTokensBatch tx"""
+    size = gas_profiles.max_batch_size('issueTokensBatch', BATCH_GAS_LIMIT, MAX_BATCH_SIZE)
+    if size is None:
+        size = (BATCH_GAS_LIMIT - BATCH_BASE_GAS) // BATCH_GAS_PER_ORDER
+    return max(1, min(MAX_BATCH_SIZE, size))
+
+
+def is_known_customer(customer: str) -> bool:
+    """Registration cache lookup, falling back to indexed CustomerRegistered events"""
+    if customer in registered_customers:
+        return True
+    if event_indexer.is_registered(customer):
+        registered_customers.add(customer)
+        return True
+    return False
+
+
+def submit_issuance(job: dict) -> str:
+    """
+    Send the issuance transaction for a queued job
+
+    New customers are registered and issued tokens in one registerAndIssueTokens
+    tx. A stale cache only costs the registration check, since the contract
+    skips customers that are already registered.
+    """
+    customer = job['customer']
+    if is_known_customer(customer):
+        function = 'issueTokens'
+        contract_call = manager_contract.functions.issueTokens(customer, job['amount'])
+        # A mint to a zero balance costs the "first" amount, and the balance
+        # may have dropped to zero since the last mint. The "first" profile
+        # bounds both cases without a balance read; unused gas is refunded
+        shape = "first"
+    else:
+        function = 'registerAndIssueTokens'
+        contract_call = manager_contract.functions.registerAndIssueTokens(customer, job['amount'])
+        shape = None
+    gas = gas_profiles.gas_limit(
+        function, shape,
+        estimate=lambda: contract_call.estimate_gas(estimate_from)
+    )
+    tx_hash = w3.to_hex(send_manager_tx(contract_call, gas=gas))
+    # Jobs may go out from other operators and be mined first, so the customer
+    # only counts as registered once this receipt is in
+    if function == 'registerAndIssueTokens':
+        pending_registrations[tx_hash] = customer
+    pending_gas_shapes[tx_hash] = (function, shape)
+    return tx_hash
+
+
+def check_issuance(tx_hash: str):
+    """Return None while pending, else whether the tx succeeded"""
+    try:
+        receipt = w3.eth.get_transaction_receipt(tx_hash)
+    except TransactionNotFound:
+        return None
+    sent_as = pending_gas_shapes.pop(tx_hash, None)
+    customer = pending_registrations.pop(tx_hash, None)
+    if receipt['status'] == 1:
+        # Receipts of jobs sent before a restart have no known shape and are not recorded
+        if sent_as is not None:
+            record_gas_used(*sent_as, receipt)
+        if customer is not None:
+            registered_customers.add(customer)
+    return receipt['status'] == 1
+
+
+def issue_certificate(customer: str, cid: str) -> str:
+    """Send issueCertificate for a pinned certificate"""
+    contract_call = manager_contract.functions.issueCertificate(customer, cid_to_bytes32(cid))
+    gas = gas_profiles.gas_limit(
+        'issueCertificate', 'first',
+        estimate=lambda: contract_call.estimate_gas(estimate_from)
+    )
+    return w3.to_hex(send_manager_tx(contract_call, gas=gas))
+
+
+certificate_pipeline = CertificatePipeline(
+    CertificateGenerator(),
+    PinataIPFS(PINATA_API_KEY, PINATA_API_SECRET, base_url=PINATA_API_URL),
+    issue_certificate,
+    output_dir=CERTIFICATE_DIR
+)
+
+issuance_queue = IssuanceQueue(ISSUANCE_QUEUE_PATH)
+issuance_submitter = QueueSubmitter(issuance_queue, submit_issuance, check_issuance, rate=ISSUANCE_RATE)
+issuance_submitter.start()
+
+
 @app.route('/issue-tokens', methods=['POST'])
 def issue_tokens():
+    """Accept an order into the issuance queue and return its job id"""
     data = request.get_json()
-    customer_address = data['customer_address']
-    # Example: 1 USD = 1 LTT
-    amount_in_wei = w3.to_wei(data['order_value'], 'ether')
 
     try:
-        # Create transaction
-        tx = manager_contract.functions.issueTokens(
-            w3.to_checksum_address(customer_address),
-            amount_in_wei
-        ).build_transaction({
-            'from': owner_account.address,
-            'nonce': w3.eth.get_transaction_count(owner_account.address),
-            'gas': 200000,
-            'gasPrice': w3.eth.gas_price
-        })
-
-        # Sign and send
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key=OWNER_PRIVATE_KEY)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        customer_address = w3.to_checksum_address(data['customer_address'])
+        # Example: 1 USD = 1 LTT
+        amount_in_wei = w3.to_wei(data['order_value'], 'ether')
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"status": "error", "message": f"Invalid order: {e}"}), 400
 
-        return jsonify({"status": "success", "tx_hash": w3.to_hex(tx_hash)}), 200
+    try:
+        job_id = issuance_queue.enqueue(customer_address, amount_in_wei)
+        return jsonify({"status": "queued", "job_id": job_id}), 202
     except Exception as e:
         # Encode sensitive information if there is an error
         return jsonify({"status": "error", "message": str(e)}), 500
 
+
+@app.route('/issue-tokens/<job_id>', methods=['GET'])
+def issue_tokens_status(job_id):
+    """Report queued/sent/mined/failed for an issuance job"""
+    job = issuance_queue.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job"}), 404
+
+    return jsonify({
+        "job_id": job['id'],
+        "status": job['status'],
+        "tx_hash": job['tx_hash'],
+        "error": job['error']
+    }), 200
+
+
+@app.route('/issue-tokens/batch', methods=['POST'])
+def issue_tokens_batch():
+    """
+    Issue tokens for many orders with as few transactions as possible
+
+    Body: {"orders": [{"order_id": ..., "customer_address": ..., "order_value": ...}, ...]}
+    Returns one result per order with its tx hash and the log index of its
+    Transfer event. Registered customers are issued in issueTokensBatch
+    chunks; unknown ones are registered and issued one tx each.
+    """
+    data = request.get_json()
+    orders = data.get('orders') or []
+    if not orders:
+        return jsonify({"status": "error", "message": "No orders"}), 400
+
+    try:
+        prepared = [
+            (
+                order.get('order_id', i),
+                w3.to_checksum_address(order['customer_address']),
+                # Example: 1 USD = 1 LTT
+                w3.to_wei(order['order_value'], 'ether')
+            )
+            for i, order in enumerate(orders)
+        ]
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({"status": "error", "message": f"Invalid order: {e}"}), 400
+
+    def send_batch(customers, amounts):
+        contract_call = manager_contract.functions.issueTokensBatch(customers, amounts)
+        return w3.to_hex(send_manager_tx(contract_call, gas=batch_gas_limit(len(customers))))
+
+    def send_new(customer, amount):
+        contract_call = manager_contract.functions.registerAndIssueTokens(customer, amount)
+        gas = gas_profiles.gas_limit(
+            'registerAndIssueTokens', None,
+            estimate=lambda: contract_call.estimate_gas(estimate_from)
+        )
+        return w3.to_hex(send_manager_tx(contract_call, gas=gas))
+
+    def on_mined(function, shape, customers, receipt):
+        record_gas_used(function, shape, receipt)
+        registered_customers.update(customers)
+
+    results = issue_batch(
+        prepared, batch_chunk_size(), is_known_customer, send_batch, send_new,
+        lambda tx_hash: w3.eth.wait_for_transaction_receipt(tx_hash, timeout=BATCH_RECEIPT_TIMEOUT),
+        on_mined=on_mined
+    )
+
+    status = "success" if all(r["status"] == "success" for r in results) else "partial"
+    return jsonify({"status": status, "results": results}), 200
+
+
+@app.route('/customers/snapshot', methods=['POST'])
+def customers_snapshot():
+    """
+    Balance, registration and certificate count for many customers
+
+    Body: {"addresses": ["0x...", ...]}
+    """
+    if multicall_reader is None:
+        return jsonify({"status": "error", "message": "MULTICALL_CONTRACT_ADDRESS not configured"}), 503
+
+    data = request.get_json()
+    addresses = data.get('addresses') or []
+    if len(addresses) > MAX_SNAPSHOT_ADDRESSES:
+        return jsonify({"status": "error", "message": f"At most {MAX_SNAPSHOT_ADDRESSES} addresses"}), 400
+
+    try:
+        snapshot = multicall_reader.customer_snapshot(addresses)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"Invalid address: {e}"}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    # uint256 balances are returned as strings to survive JSON number limits
+    results = {
+        address: dict(values, balance=str(values['balance']))
+        for address, values in snapshot.items()
+    }
+    return jsonify({"status": "success", "customers": results}), 200
+
+
+@app.route('/certificates', methods=['POST'])
+def create_certificate():
+    """
+    Render, pin and issue a redemption certificate
+
+    Body: {"customer_address", "customer_name", "reward_name",
+           "reward_description", "token_cost", "redemption_date"}
+    """
+    data = request.get_json()
+    missing = [field for field in CERTIFICATE_FIELDS if field not in data]
+    if missing:
+        return jsonify({"status": "error", "message": f"Missing fields: {', '.join(missing)}"}), 400
+
+    try:
+        data['customer_address'] = w3.to_checksum_address(data['customer_address'])
+        result = certificate_pipeline.process(data)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({
+        "status": "success",
+        "cid": result['cid'],
+        "content_hash": result['content_hash'],
+        "voucher_code": result['voucher_code'],
+        "verification_hash": result['verification_hash'],
+        "tx_hash": result['tx_hash']
+    }), 200
+
+
+def cached_view(contract, function: str, *args):
+    """Call a contract view function through the view cache"""
+    return view_cache.get(function, args, lambda: getattr(contract.functions, function)(*args).call())
+
+
+@app.route('/rewards/catalog', methods=['GET'])
+def get_reward_catalog():
+    """Every listed reward with cost, CIDs and metadata, as one cached document"""
+    body, etag = reward_catalog.document()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/rewards/<int:reward_id>', methods=['GET'])
+def get_reward(reward_id):
+    """Reward cost and IPFS CIDs"""
+    try:
+        cost = cached_view(manager_contract, 'getRewardCost', reward_id)
+        if cost == 0:
+            return jsonify({"status": "error", "message": "Unknown reward"}), 404
+        return jsonify({
+            "reward_id": reward_id,
+            "cost": str(cost),
+            "metadata_cid": cached_view(manager_contract, 'getRewardMetadata', reward_id),
+            "image_cid": cached_view(manager_contract, 'getRewardImage', reward_id)
+        }), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/rewards/<int:reward_id>/permit', methods=['GET'])
+def get_redeem_permit(reward_id):
+    """
+    EIP-712 permit for redeeming a reward in one transaction
+
+    The wallet signs the returned typed data (eth_signTypedData_v4) and calls
+    redeemRewardWithPermit(reward_id, deadline, v, r, s) itself.
+
+    Query: ?owner=0x...
+    """
+    try:
+        customer = w3.to_checksum_address(request.args.get('owner', ''))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"Invalid address: {e}"}), 400
+
+    try:
+        cost = cached_view(manager_contract, 'getRewardCost', reward_id)
+        if cost == 0:
+            return jsonify({"status": "error", "message": "Unknown reward"}), 404
+        # The nonce changes with every permit, so it is never cached
+        nonce = token_contract.functions.nonces(customer).call()
+        typed_data = permit_typed_data(
+            cached_view(token_contract, 'name'), TOKEN_CONTRACT_ADDRESS, CHAIN_ID, customer,
+            MANAGER_CONTRACT_ADDRESS, cost, nonce, permit_deadline(PERMIT_TTL)
+        )
+        return jsonify({"reward_id": reward_id, "typed_data": typed_data}), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+# campaign id -> ProofStore, opened on first request
+proof_stores = {}
+
+
+@app.route('/campaigns/<int:campaign_id>/claims/<address>', methods=['GET'])
+def get_campaign_claim(campaign_id, address):
+    """Arguments for LoyaltyManager.claim, with the Merkle proof, for one customer"""
+    try:
+        customer = w3.to_checksum_address(address)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"Invalid address: {e}"}), 400
+
+    store = proof_stores.get(campaign_id)
+    if store is None:
+        directory = os.path.join(CAMPAIGN_DIR, str(campaign_id))
+        if not os.path.exists(os.path.join(directory, TREE_FILE)):
+            return jsonify({"status": "error", "message": "Unknown campaign"}), 404
+        store = proof_stores.setdefault(campaign_id, ProofStore(directory))
+
+    try:
+        claim = store.claim(customer)
+        if claim is None:
+            return jsonify({"status": "error", "message": "Not in campaign"}), 404
+        claim["amount"] = str(claim["amount"])
+        claim["claimed"] = manager_contract.functions.isClaimed(campaign_id, claim["index"]).call()
+        return jsonify(claim), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/customers/<address>', methods=['GET'])
+def get_customer(address):
+    """Customer registration and token balance"""
+    try:
+        customer = w3.to_checksum_address(address)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"Invalid address: {e}"}), 400
+
+    try:
+        return jsonify({
+            "address": customer,
+            "registered": cached_view(manager_contract, 'isCustomerRegistered', customer),
+            "balance": str(cached_view(token_contract, 'balanceOf', customer))
+        }), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/customers/<address>/certificates', methods=['GET'])
+def get_customer_certificates(address):
+    """
+    A page of a customer's certificate CIDs, oldest first
+
+    Query: ?offset=0&limit=100
+    """
+    try:
+        customer = w3.to_checksum_address(address)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"Invalid address: {e}"}), 400
+    offset = request.args.get('offset', 0, type=int)
+    limit = min(request.args.get('limit', MAX_CERTIFICATE_PAGE, type=int), MAX_CERTIFICATE_PAGE)
+
+    try:
+        digests = manager_contract.functions.getCustomerCertificates(customer, offset, limit).call()
+        return jsonify({
+            "address": customer,
+            "offset": offset,
+            "certificates": [bytes32_to_cid(digest) for digest in digests],
+            "total": cached_view(manager_contract, 'getCertificateCount', customer)
+        }), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/signers/stats', methods=['GET'])
+def signer_stats():
+    """Backlog and health of each operator key"""
+    return jsonify(signer_pool.stats()), 200
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """View cache hit, miss and eviction counters"""
+    return jsonify(view_cache.stats()), 200
+
 if __name__ == '__main__':
-    app.run(port=5001)
\ No newline at end of file
+    app.run(port=5001)
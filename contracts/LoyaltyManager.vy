@@ -4,20 +4,33 @@ interface LoyaltyToken:
     def mint(_to: address, _value: uint256): nonpayable
     def transfer(_to: address, _value: uint256) -> bool: nonpayable
     def transferFrom(_from: address, _to: address, _value: uint256) -> bool: nonpayable
-    def balanceOf(_owner: address) -> uint256: view
-    def allowance(_owner: address, _spender: address) -> uint256: view
+
+MAX_BATCH_SIZE: constant(uint256) = 200 # max orders per issueTokensBatch / registerCustomers call
+MAX_PAGE_SIZE: constant(uint256) = 100 # max certificates returned per getCustomerCertificates call
+MAX_CART_SIZE: constant(uint256) = 20 # max line items per redeemRewards call
+MAX_PROOF_LENGTH: constant(uint256) = 32 # Merkle depth limit, i.e. up to 2**32 claims per campaign
 
 token_contract: public(address)
 owner: public(address)
 registered_customers: public(HashMap[address, bool])
+operators: public(HashMap[address, bool]) # backend hot wallets allowed to register and issue
 reward_costs: public(HashMap[uint256, uint256]) # reward_id -> token cost
 reward_metadata: public(HashMap[uint256, String[100]]) # reward_id -> IPFS CID (metadata JSON)
 reward_images: public(HashMap[uint256, String[100]]) # reward_id -> IPFS CID (image)
-customer_certificates: public(HashMap[address, DynArray[String[100], 50]]) # customer -> list of certificate IPFS CIDs
+# Certificate CIDs are stored as their 32-byte sha2-256 multihash digest (see scripts/ipfs_cid.py)
+customer_certificates: public(HashMap[address, HashMap[uint256, bytes32]]) # customer -> index -> certificate digest
+certificate_counts: public(HashMap[address, uint256]) # customer -> number of certificates
+# Merkle distributor: leaf = keccak256(abi_encode(campaign_id, index, customer, amount)), see scripts/merkle_campaign.py
+campaign_roots: public(HashMap[uint256, bytes32]) # campaign_id -> Merkle root
+claimed_bitmaps: HashMap[uint256, HashMap[uint256, uint256]] # campaign_id -> index / 256 -> claimed bits
 
 event CustomerRegistered:
     customer: indexed(address)
 
+event OperatorSet:
+    operator: indexed(address)
+    enabled: bool
+
 event RewardRedeemed:
     customer: indexed(address)
     reward_id: uint256
@@ -45,7 +58,17 @@ event RewardImageSet:
 
 event CertificateIssued:
     customer: indexed(address)
-    certificate_cid: String[100]
+    certificate: bytes32
+
+event CampaignCreated:
+    campaign_id: indexed(uint256)
+    merkle_root: bytes32
+
+event Claimed:
+    campaign_id: indexed(uint256)
+    index: uint256
+    customer: indexed(address)
+    amount: uint256
 
 @external
 def __init__(_token_address: address):
@@ -53,37 +76,123 @@ def __init__(_token_address: address):
     self.token_contract = _token_address
     # Example: set price for reward 1
     self.reward_costs[1] = 100 * 10**18 # 100 tokens
+    log RewardCreated(1, 100 * 10**18)
+
+# Enable or disable an operator (owner only)
+@external
+def setOperator(_operator: address, _enabled: bool):
+    assert msg.sender == self.owner, "Only owner"
+    self.operators[_operator] = _enabled
+    log OperatorSet(_operator, _enabled)
+
+# Registration and issuance are open to the owner and operators
+@view
+@internal
+def _check_operator():
+    assert msg.sender == self.owner or self.operators[msg.sender], "Only operator"
 
 # Requirement 1: Business - Register customer
 @external
 def registerCustomer(_customer: address):
-    assert msg.sender == self.owner, "Only owner"
+    self._check_operator()
     assert not self.registered_customers[_customer], "Already registered"
+    self._register(_customer)
+
+# Requirement 1: Business - Register many customers in one transaction
+# Already registered addresses are skipped, so a resent chunk never reverts
+@external
+def registerCustomers(_customers: DynArray[address, MAX_BATCH_SIZE]):
+    self._check_operator()
+    for customer in _customers:
+        if not self.registered_customers[customer]:
+            self._register(customer)
+
+@internal
+def _register(_customer: address):
     self.registered_customers[_customer] = True
     log CustomerRegistered(_customer)
 
 # Requirement 1: Business - Issue reward tokens (called from backend)
 @external
 def issueTokens(_customer: address, _amount: uint256):
-    assert msg.sender == self.owner, "Only owner"
+    self._check_operator()
     assert self.registered_customers[_customer], "Customer not registered"
     LoyaltyToken(self.token_contract).mint(_customer, _amount)
 
+# Requirement 1: Business - First purchase: register the customer if needed and issue
+# tokens in the same transaction, so issuance never waits on a registration tx
+@external
+def registerAndIssueTokens(_customer: address, _amount: uint256):
+    self._check_operator()
+    if not self.registered_customers[_customer]:
+        self._register(_customer)
+    LoyaltyToken(self.token_contract).mint(_customer, _amount)
+
+# Requirement 1: Business - Issue reward tokens for many orders in one transaction
+# Each mint emits one Transfer log, in the same order as _customers
+@external
+def issueTokensBatch(_customers: DynArray[address, MAX_BATCH_SIZE], _amounts: DynArray[uint256, MAX_BATCH_SIZE]):
+    self._check_operator()
+    assert len(_customers) == len(_amounts), "Length mismatch"
+    token: LoyaltyToken = LoyaltyToken(self.token_contract)
+    i: uint256 = 0
+    for customer in _customers:
+        assert self.registered_customers[customer], "Customer not registered"
+        token.mint(customer, _amounts[i])
+        i += 1
+
 # Requirement 1: Business - Redeem reward (called from frontend)
+# Requirement 2: Logic constraint - transferFrom reverts on insufficient balance or allowance
 @external
 def redeemReward(_reward_id: uint256):
+    self._redeem(msg.sender, _reward_id)
+
+# Requirement 1: Business - Redeem reward in one transaction with an EIP-2612 permit
+# signed off-chain for exactly the reward cost, instead of a separate approve
+@external
+def redeemRewardWithPermit(_reward_id: uint256, _deadline: uint256, _v: uint8, _r: bytes32, _s: bytes32):
     cost: uint256 = self.reward_costs[_reward_id]
-    assert cost > 0, "Invalid reward"
+    # A permit already submitted by someone else (front-run) leaves the allowance
+    # in place, so its failure is ignored and transferFrom decides
+    permitted: bool = raw_call(
+        self.token_contract,
+        _abi_encode(msg.sender, self, cost, _deadline, _v, _r, _s, method_id=method_id("permit(address,address,uint256,uint256,uint8,bytes32,bytes32)")),
+        revert_on_failure=False
+    )
+    self._redeem(msg.sender, _reward_id)
+
+# Requirement 1: Business - Redeem a cart of rewards with a single token transfer
+# One RewardRedeemed per line item, cost = unit cost * quantity, in cart order
+@external
+def redeemRewards(_reward_ids: DynArray[uint256, MAX_CART_SIZE], _quantities: DynArray[uint256, MAX_CART_SIZE]):
+    assert len(_reward_ids) > 0, "Empty cart"
+    assert len(_reward_ids) == len(_quantities), "Length mismatch"
+    line_costs: DynArray[uint256, MAX_CART_SIZE] = []
+    total: uint256 = 0
+    i: uint256 = 0
+    for reward_id in _reward_ids:
+        cost: uint256 = self.reward_costs[reward_id]
+        assert cost > 0, "Invalid reward"
+        assert _quantities[i] > 0, "Invalid quantity"
+        line_costs.append(cost * _quantities[i])
+        total += line_costs[i]
+        i += 1
+
+    # Requirement 2: Logic constraint - one transferFrom checks balance and allowance for the whole cart
+    LoyaltyToken(self.token_contract).transferFrom(msg.sender, self, total)
+    i = 0
+    for reward_id in _reward_ids:
+        log RewardRedeemed(msg.sender, reward_id, line_costs[i])
+        i += 1
 
-    # Requirement 2: Logic constraint - Check sufficient tokens
-    current_balance: uint256 = LoyaltyToken(self.token_contract).balanceOf(msg.sender)
-    current_allowance: uint256 = LoyaltyToken(self.token_contract).allowance(msg.sender, self)
-    assert current_balance >= cost, "Insufficient tokens"
-    assert current_allowance >= cost, "Insufficient allowance"
+@internal
+def _redeem(_customer: address, _reward_id: uint256):
+    cost: uint256 = self.reward_costs[_reward_id]
+    assert cost > 0, "Invalid reward"
 
     # Pull tokens from user to this contract (or burn)
-    LoyaltyToken(self.token_contract).transferFrom(msg.sender, self, cost)
-    log RewardRedeemed(msg.sender, _reward_id, cost)
+    LoyaltyToken(self.token_contract).transferFrom(_customer, self, cost)
+    log RewardRedeemed(_customer, _reward_id, cost)
 
 # Data retrieval function
 @view
@@ -152,22 +261,71 @@ def getRewardMetadata(_reward_id: uint256) -> String[100]:
 def getRewardImage(_reward_id: uint256) -> String[100]:
     return self.reward_images[_reward_id]
 
-# Issue certificate to customer (store IPFS CID)
+# Issue certificate to customer (store IPFS CID digest)
 @external
-def issueCertificate(_customer: address, _certificate_cid: String[100]):
-    assert msg.sender == self.owner, "Only owner"
+def issueCertificate(_customer: address, _certificate: bytes32):
+    self._check_operator()
     assert self.registered_customers[_customer], "Customer not registered"
-    self.customer_certificates[_customer].append(_certificate_cid)
-    log CertificateIssued(_customer, _certificate_cid)
+    count: uint256 = self.certificate_counts[_customer]
+    self.customer_certificates[_customer][count] = _certificate
+    self.certificate_counts[_customer] = count + 1
+    log CertificateIssued(_customer, _certificate)
 
-# Get all certificates for a customer
+# Get a page of certificates for a customer, oldest first
 @view
 @external
-def getCustomerCertificates(_customer: address) -> DynArray[String[100], 50]:
-    return self.customer_certificates[_customer]
+def getCustomerCertificates(_customer: address, _offset: uint256 = 0, _limit: uint256 = MAX_PAGE_SIZE) -> DynArray[bytes32, MAX_PAGE_SIZE]:
+    result: DynArray[bytes32, MAX_PAGE_SIZE] = []
+    count: uint256 = self.certificate_counts[_customer]
+    for i in range(MAX_PAGE_SIZE):
+        if i >= _limit or _offset + i >= count:
+            break
+        result.append(self.customer_certificates[_customer][_offset + i])
+    return result
 
 # Get certificate count for a customer
 @view
 @external
 def getCertificateCount(_customer: address) -> uint256:
-    return len(self.customer_certificates[_customer])
\ No newline at end of file
+    return self.certificate_counts[_customer]
+
+# Merkle Distributor Functions
+
+# Post a campaign: one transaction whatever the number of customers (owner only)
+# The root is fixed once set, so issued proofs stay valid
+@external
+def setCampaignRoot(_campaign_id: uint256, _merkle_root: bytes32):
+    assert msg.sender == self.owner, "Only owner"
+    assert _merkle_root != empty(bytes32), "Invalid root"
+    assert self.campaign_roots[_campaign_id] == empty(bytes32), "Campaign exists"
+    self.campaign_roots[_campaign_id] = _merkle_root
+    log CampaignCreated(_campaign_id, _merkle_root)
+
+# Whether claim slot _index of a campaign has been used
+@view
+@external
+def isClaimed(_campaign_id: uint256, _index: uint256) -> bool:
+    return self.claimed_bitmaps[_campaign_id][_index / 256] & (1 << (_index % 256)) != 0
+
+# Claim a campaign allocation; anyone may submit it, tokens go to _customer
+@external
+def claim(_campaign_id: uint256, _index: uint256, _customer: address, _amount: uint256, _proof: DynArray[bytes32, MAX_PROOF_LENGTH]):
+    root: bytes32 = self.campaign_roots[_campaign_id]
+    assert root != empty(bytes32), "Unknown campaign"
+    word: uint256 = _index / 256
+    bit: uint256 = 1 << (_index % 256)
+    bitmap: uint256 = self.claimed_bitmaps[_campaign_id][word]
+    assert bitmap & bit == 0, "Already claimed"
+
+    # Sorted-pair hashing: the proof needs no left/right flags
+    node: bytes32 = keccak256(_abi_encode(_campaign_id, _index, _customer, _amount))
+    for sibling in _proof:
+        if convert(node, uint256) < convert(sibling, uint256):
+            node = keccak256(concat(node, sibling))
+        else:
+            node = keccak256(concat(sibling, node))
+    assert node == root, "Invalid proof"
+
+    self.claimed_bitmaps[_campaign_id][word] = bitmap | bit
+    LoyaltyToken(self.token_contract).mint(_customer, _amount)
+    log Claimed(_campaign_id, _index, _customer, _amount)
\ No newline at end of file
@@ -14,6 +14,13 @@ event Approval:
     _spender: indexed(address)
     _value: uint256
 
+# EIP-712 / EIP-2612
+EIP712_TYPEHASH: constant(bytes32) = keccak256("EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+PERMIT_TYPEHASH: constant(bytes32) = keccak256("Permit(address owner,address spender,uint256 value,uint256 nonce,uint256 deadline)")
+VERSION: constant(String[1]) = "1"
+# Upper bound for s in a non-malleable signature (secp256k1 n / 2)
+MAX_S: constant(uint256) = 57896044618658097711785492504343953926418782139537452191302581570759080747168
+
 name: public(String[64])
 symbol: public(String[32])
 decimals: public(uint8)
@@ -22,6 +29,10 @@ totalSupply: public(uint256)
 balanceOf: public(HashMap[address, uint256])
 allowance: public(HashMap[address, HashMap[address, uint256]])
 owner: public(address)
+nonces: public(HashMap[address, uint256])
+
+CACHED_CHAIN_ID: immutable(uint256)
+CACHED_DOMAIN_SEPARATOR: immutable(bytes32)
 
 @external
 def __init__(_name: String[64], _symbol: String[32], _decimals: uint8):
@@ -29,6 +40,21 @@ def __init__(_name: String[64], _symbol: String[32], _decimals: uint8):
     self.symbol = _symbol
     self.decimals = _decimals
     self.owner = msg.sender
+    CACHED_CHAIN_ID = chain.id
+    CACHED_DOMAIN_SEPARATOR = self._build_domain_separator(_name)
+
+@view
+@internal
+def _build_domain_separator(_name: String[64]) -> bytes32:
+    return keccak256(_abi_encode(EIP712_TYPEHASH, keccak256(_name), keccak256(VERSION), chain.id, self))
+
+# EIP-712 domain, rebuilt only if the chain id changed (fork)
+@view
+@external
+def DOMAIN_SEPARATOR() -> bytes32:
+    if chain.id == CACHED_CHAIN_ID:
+        return CACHED_DOMAIN_SEPARATOR
+    return self._build_domain_separator(self.name)
 
 # Requirement 1: Business - Issue tokens (owner only)
 @external
@@ -65,4 +91,28 @@ def transferFrom(_from: address, _to: address, _value: uint256) -> bool:
 def approve(_spender: address, _value: uint256) -> bool:
     self.allowance[msg.sender][_spender] = _value
     log Approval(msg.sender, _spender, _value)
+    return True
+
+# EIP-2612: approve by off-chain signature, so approve + spend fit in one tx
+@external
+def permit(_owner: address, _spender: address, _value: uint256, _deadline: uint256, _v: uint8, _r: bytes32, _s: bytes32) -> bool:
+    assert _owner != empty(address), "Invalid owner"
+    assert block.timestamp <= _deadline, "Permit expired"
+    assert convert(_s, uint256) <= MAX_S, "Invalid signature"
+
+    domain_separator: bytes32 = CACHED_DOMAIN_SEPARATOR
+    if chain.id != CACHED_CHAIN_ID:
+        domain_separator = self._build_domain_separator(self.name)
+
+    nonce: uint256 = self.nonces[_owner]
+    digest: bytes32 = keccak256(concat(
+        b"\x19\x01",
+        domain_separator,
+        keccak256(_abi_encode(PERMIT_TYPEHASH, _owner, _spender, _value, nonce, _deadline))
+    ))
+    assert ecrecover(digest, _v, _r, _s) == _owner, "Invalid signature"
+
+    self.nonces[_owner] = nonce + 1
+    self.allowance[_owner][_spender] = _value
+    log Approval(_owner, _spender, _value)
     return True
\ No newline at end of file
@@ -0,0 +1,18 @@
+# @version 0.3.10
+
+MAX_CALLS: constant(uint256) = 1500 # ~500 customers x 3 view calls
+
+struct Call:
+    target: address
+    callData: Bytes[68] # selector + up to two static arguments
+
+# Aggregate view calls that each return one 32-byte word (uint256, bool, address)
+# Returns the block number the results were read at
+@view
+@external
+def aggregate(_calls: DynArray[Call, MAX_CALLS]) -> (uint256, DynArray[bytes32, MAX_CALLS]):
+    results: DynArray[bytes32, MAX_CALLS] = []
+    for c in _calls:
+        response: Bytes[32] = raw_call(c.target, c.callData, max_outsize=32, is_static_call=True)
+        results.append(extract32(response, 0))
+    return block.number, results
@@ -0,0 +1,81 @@
+"""
+Batch token issuance for the /issue-tokens/batch endpoint
+Registered customers are chunked into issueTokensBatch transactions and
+unknown customers go through registerAndIssueTokens, so one new customer
+cannot revert a whole chunk of valid orders
+"""
+
+from eth_utils import keccak
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = keccak(text="Transfer(address,address,uint256)")
+
+
+def issue_batch(orders, chunk_size: int, is_registered, send_batch, send_new, wait_receipt, on_mined=None) -> list:
+    """
+    Issue tokens for many orders with as few transactions as possible
+
+    Every transaction is sent before any receipt is awaited, so they are
+    mined together.
+
+    Args:
+        orders: (order_id, checksummed customer, amount in wei) tuples
+        chunk_size: Orders per issueTokensBatch transaction
+        is_registered: callable(customer) -> bool; a stale False only costs
+            the registration check in registerAndIssueTokens
+        send_batch: callable(customers, amounts) -> tx hash hex string
+        send_new: callable(customer, amount) -> tx hash hex string
+        wait_receipt: callable(tx hash) -> receipt; raises on timeout
+        on_mined: callable(function, shape, customers, receipt) for each
+            successful tx
+
+    Returns:
+        One result per order, in input order, with order_id, status,
+        tx_hash and either log_index (the order's Transfer log) or message
+    """
+    registered = [i for i, (_, customer, _) in enumerate(orders) if is_registered(customer)]
+    known = set(registered)
+    # (function, gas shape, order positions, send thunk)
+    groups = [
+        ('issueTokensBatch', len(chunk), chunk,
+         lambda chunk=chunk: send_batch([orders[i][1] for i in chunk], [orders[i][2] for i in chunk]))
+        for chunk in (registered[start:start + chunk_size] for start in range(0, len(registered), chunk_size))
+    ]
+    groups += [
+        ('registerAndIssueTokens', None, [i], lambda i=i: send_new(orders[i][1], orders[i][2]))
+        for i in range(len(orders)) if i not in known
+    ]
+
+    sent = []
+    for function, shape, positions, send in groups:
+        try:
+            sent.append((function, shape, positions, send(), None))
+        except Exception as e:
+            sent.append((function, shape, positions, None, str(e)))
+
+    results = [None] * len(orders)
+    for function, shape, positions, tx_hash, error in sent:
+        transfer_logs = []
+        if error is None:
+            try:
+                receipt = wait_receipt(tx_hash)
+                if receipt['status'] != 1:
+                    error = "Transaction reverted"
+                else:
+                    if on_mined is not None:
+                        on_mined(function, shape, [orders[i][1] for i in positions], receipt)
+                    # One Transfer per order, in order
+                    transfer_logs = [
+                        log for log in receipt['logs'] if log['topics'] and log['topics'][0] == TRANSFER_TOPIC
+                    ]
+            except Exception as e:
+                error = str(e)
+
+        for n, i in enumerate(positions):
+            result = {"order_id": orders[i][0], "status": "success", "tx_hash": tx_hash}
+            if error is None:
+                result["log_index"] = transfer_logs[n]['logIndex']
+            else:
+                result.update(status="error", message=error)
+            results[i] = result
+    return results
@@ -0,0 +1,80 @@
+"""
+Benchmark certificate rendering throughput (certificates/sec)
+Compares PNG with vector QR codes, and reports how much of each render
+the static layout costs: the most a pre-rendered template could save
+
+Usage: python scripts/bench_certificates.py [--count 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from reportlab.pdfgen import canvas
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.generate_certificate import CertificateGenerator
+
+SAMPLE = {
+    "customer_address": "0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb0",
+    "customer_name": "Nguyen Van A",
+    "reward_name": "Voucher giảm giá 20%",
+    "reward_description": "Giảm 20% cho đơn hàng tiếp theo, áp dụng từ 500,000 VNĐ",
+    "token_cost": 500,
+    "redemption_date": "2025-11-24 10:30:00",
+}
+
+
+def bench(generator: CertificateGenerator, count: int, output_dir: str) -> dict:
+    """Render count certificates and report throughput and average size"""
+    total_bytes = 0
+    started = time.perf_counter()
+    for i in range(count):
+        path = os.path.join(output_dir, f"bench_{i}.pdf")
+        generator.generate_certificate(output_path=path, **SAMPLE)
+        total_bytes += os.path.getsize(path)
+    elapsed = time.perf_counter() - started
+    return {"per_sec": count / elapsed, "avg_bytes": total_bytes // count}
+
+
+def bench_static_layout(generator: CertificateGenerator, count: int) -> float:
+    """Seconds per certificate spent drawing the static layout alone"""
+    started = time.perf_counter()
+    for _ in range(count):
+        generator.draw_static_layout(canvas.Canvas(BytesIO(), pagesize=generator.page_size))
+    return (time.perf_counter() - started) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark certificate rendering")
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    variants = {
+        "PNG QR": CertificateGenerator(vector_qr=False),
+        "vector QR": CertificateGenerator(vector_qr=True),
+        "... + fixed QR mask": CertificateGenerator(vector_qr=True, qr_mask_pattern=0),
+    }
+
+    print(f"Rendering {args.count} certificates per variant...")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name, generator in variants.items():
+            # Warm up fonts
+            bench(generator, 3, output_dir)
+            result = bench(generator, args.count, output_dir)
+            print(f"  {name:<24} {result['per_sec']:>8.1f} certs/sec  {result['avg_bytes']:>8,} bytes/cert")
+
+        # Share of the fastest variant's render time spent on the fixed layout
+        generator = variants["... + fixed QR mask"]
+        layout_seconds = bench_static_layout(generator, args.count)
+        share = layout_seconds * result["per_sec"]
+        print(f"  static layout            {layout_seconds * 1000:>8.2f} ms/cert  "
+              f"{share:>8.1%} of render time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+In-memory certificate pipeline: render -> hash -> pin -> issueCertificate
+Each stage overlaps the next certificate's rendering and PDFs only
+touch disk when an output directory is given
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.generate_certificate import CERTIFICATE_FIELDS, CertificateGenerator, read_redemptions
+from scripts.ipfs_demo import PinataIPFS
+
+_DONE = object()
+
+
+class CertificatePipeline:
+    """
+    Render certificates in memory, pin them and record their CIDs on-chain
+
+    The calling thread renders, a thread pool pins, and a single issuer
+    thread calls issueCertificate in input order (so transactions from
+    one account are sent with consecutive nonces).
+
+    Args:
+        generator: CertificateGenerator used for rendering
+        pinata: PinataIPFS client (anything with upload_bytes)
+        issue_certificate: callable(customer_address, cid) -> tx hash, or
+            None to pin without issuing
+        output_dir: Also write each PDF here when set
+        upload_workers: Concurrent uploads
+        max_pending: Certificates rendered but not yet issued; bounds memory
+    """
+
+    def __init__(self, generator: CertificateGenerator, pinata: PinataIPFS, issue_certificate=None,
+                 output_dir: str = None, upload_workers: int = 4, max_pending: int = 16):
+        self.generator = generator
+        self.pinata = pinata
+        self.issue_certificate = issue_certificate
+        self.output_dir = output_dir
+        self.upload_workers = upload_workers
+        self.max_pending = max_pending
+        if output_dir:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    def render(self, index: int, record: dict) -> tuple:
+        """Render one redemption record to PDF bytes and metadata"""
+        fields = {field: record[field] for field in CERTIFICATE_FIELDS}
+        fields["token_cost"] = int(fields["token_cost"])
+        pdf, metadata = self.generator.render_certificate(**fields)
+        metadata["index"] = index
+        if self.output_dir:
+            path = os.path.join(self.output_dir, f"certificate_{index:08d}.pdf")
+            with open(path, "wb") as f:
+                f.write(pdf)
+            metadata["file_path"] = path
+        return pdf, metadata
+
+    def pin(self, pdf: bytes, metadata: dict) -> str:
+        name = f"certificate_{metadata['voucher_code']}.pdf"
+        return self.pinata.upload_bytes(pdf, name, content_type="application/pdf")
+
+    def process(self, record: dict) -> dict:
+        """Run one record through every stage synchronously"""
+        pdf, metadata = self.render(0, record)
+        metadata["cid"] = self.pin(pdf, metadata)
+        if self.issue_certificate is not None:
+            metadata["tx_hash"] = self.issue_certificate(metadata["customer_address"], metadata["cid"])
+        return metadata
+
+    def run(self, records, on_result=None) -> dict:
+        """
+        Process many redemption records with overlapping stages
+
+        Args:
+            records: Iterable of redemption dicts
+            on_result: Called with each result dict, in input order; a
+                failed record has an "error" key and no tx_hash. A record
+                whose callback raises is counted as failed
+
+        Returns:
+            dict with completed and failed counts
+        """
+        counts = {"completed": 0, "failed": 0}
+        # Rendered certificates waiting for their upload and issuance
+        issue_queue = queue.Queue(maxsize=self.max_pending)
+
+        def issuer():
+            while True:
+                item = issue_queue.get()
+                if item is _DONE:
+                    return
+                metadata, upload = item
+                try:
+                    metadata["cid"] = upload.result()
+                    if self.issue_certificate is not None:
+                        metadata["tx_hash"] = self.issue_certificate(metadata["customer_address"], metadata["cid"])
+                    counts["completed"] += 1
+                except Exception as e:
+                    metadata["error"] = str(e)
+                    counts["failed"] += 1
+                if on_result is None:
+                    continue
+                try:
+                    on_result(metadata)
+                except Exception as e:
+                    # The result is lost, so count it as failed, but keep
+                    # draining: a dead issuer would block the renderer on put()
+                    if "error" not in metadata:
+                        counts["completed"] -= 1
+                        counts["failed"] += 1
+                    print(f"⚠️  Could not record certificate {metadata['index']}: {e}")
+
+        issuer_thread = threading.Thread(target=issuer, daemon=True)
+        issuer_thread.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.upload_workers) as uploads:
+                for index, record in enumerate(records):
+                    try:
+                        pdf, metadata = self.render(index, record)
+                    except Exception as e:
+                        # Keep failures in the ordered output stream
+                        failed = Future()
+                        failed.set_exception(e)
+                        issue_queue.put(({"index": index, "customer_address": record.get("customer_address")}, failed))
+                        continue
+                    issue_queue.put((metadata, uploads.submit(self.pin, pdf, metadata)))
+        finally:
+            issue_queue.put(_DONE)
+            issuer_thread.join()
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render, pin and issue certificates for redemptions")
+    parser.add_argument("--input", required=True, help="Redemptions as .jsonl or .csv")
+    parser.add_argument("--manifest", default="certificates/pipeline.jsonl")
+    parser.add_argument("--output-dir", help="Also keep the PDFs in this directory")
+    parser.add_argument("--pinata-url", default=os.getenv("PINATA_API_URL", "https://api.pinata.cloud"))
+    parser.add_argument("--upload-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    pinata = PinataIPFS(os.getenv("PINATA_API_KEY"), os.getenv("PINATA_API_SECRET"), base_url=args.pinata_url)
+    # Pin only: issueCertificate is sent by the backend (see app.py)
+    pipeline = CertificatePipeline(CertificateGenerator(), pinata, output_dir=args.output_dir,
+                                   upload_workers=args.upload_workers)
+
+    Path(args.manifest).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.manifest, "w", encoding="utf-8") as manifest:
+        counts = pipeline.run(
+            read_redemptions(args.input),
+            on_result=lambda result: manifest.write(json.dumps(result, ensure_ascii=False) + "\n")
+        )
+    print(f"✅ Pinned {counts['completed']} certificates ({counts['failed']} failed)")
+    print(f"📝 Manifest: {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ load_dotenv()
 DEPLOY_FILE = Path("deployments/sepolia.json")
 DEPLOY_FILE.parent.mkdir(parents=True, exist_ok=True)
 
-def save_deployments(token_addr: str, manager_addr: str):
+def save_deployments(token_addr: str, manager_addr: str, multicall_addr: str = None):
     data = {
         "chainId": 11155111,  # Sepolia
         "contracts": {
@@ -16,6 +16,8 @@ def save_deployments(token_addr: str, manager_addr: str):
             "LoyaltyManager": {"address": manager_addr},
         },
     }
+    if multicall_addr:
+        data["contracts"]["Multicall"] = {"address": multicall_addr}
     DEPLOY_FILE.write_text(json.dumps(data, indent=2))
 
 def main():
@@ -41,6 +43,15 @@ def main():
     except Exception:
         pass
 
+    # Multicall aggregator for batched reads; set MULTICALL_CONTRACT_ADDRESS
+    # to reuse one already on the network instead of deploying a new one
+    multicall_addr = os.getenv("MULTICALL_CONTRACT_ADDRESS")
+    if multicall_addr:
+        print(f"ℹ Using existing Multicall at: {multicall_addr}")
+    else:
+        multicall_addr = owner.deploy(project.Multicall).address
+        print(f"✔ Multicall deployed to: {multicall_addr}")
+
     # Lưu địa chỉ để dùng lại
-    save_deployments(token.address, manager.address)
+    save_deployments(token.address, manager.address, multicall_addr)
     print(f"📝 Saved to {DEPLOY_FILE}")
\ No newline at end of file
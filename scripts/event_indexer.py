@@ -0,0 +1,400 @@
+"""
+Incremental event indexer for LoyaltyToken and LoyaltyManager
+Follows contract events with chunked eth_getLogs calls and keeps a local
+SQLite read model, so history queries do not need per-question RPC calls
+
+Usage: python scripts/event_indexer.py [--db loyalty_index.db] [--from-block N] [--follow]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+from eth_abi import decode
+from eth_utils import keccak, to_checksum_address
+from web3.exceptions import BlockNotFound
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.ipfs_cid import bytes32_to_cid
+
+# name -> (contract, signature, [(field, abi type, indexed)])
+EVENTS = {
+    "Transfer": ("LoyaltyToken", "Transfer(address,address,uint256)", [
+        ("from", "address", True), ("to", "address", True), ("value", "uint256", False)]),
+    "CustomerRegistered": ("LoyaltyManager", "CustomerRegistered(address)", [
+        ("customer", "address", True)]),
+    "RewardRedeemed": ("LoyaltyManager", "RewardRedeemed(address,uint256,uint256)", [
+        ("customer", "address", True), ("reward_id", "uint256", False), ("cost", "uint256", False)]),
+    "RewardCreated": ("LoyaltyManager", "RewardCreated(uint256,uint256)", [
+        ("reward_id", "uint256", True), ("cost", "uint256", False)]),
+    "RewardUpdated": ("LoyaltyManager", "RewardUpdated(uint256,uint256,uint256)", [
+        ("reward_id", "uint256", True), ("old_cost", "uint256", False), ("new_cost", "uint256", False)]),
+    "RewardRemoved": ("LoyaltyManager", "RewardRemoved(uint256)", [
+        ("reward_id", "uint256", True)]),
+    "RewardMetadataSet": ("LoyaltyManager", "RewardMetadataSet(uint256,string)", [
+        ("reward_id", "uint256", True), ("metadata_cid", "string", False)]),
+    "RewardImageSet": ("LoyaltyManager", "RewardImageSet(uint256,string)", [
+        ("reward_id", "uint256", True), ("image_cid", "string", False)]),
+    "CertificateIssued": ("LoyaltyManager", "CertificateIssued(address,bytes32)", [
+        ("customer", "address", True), ("certificate", "bytes32", False)]),
+}
+
+TOPICS = {"0x" + keccak(text=sig).hex(): name for name, (_, sig, _) in EVENTS.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    block_number INTEGER NOT NULL, log_index INTEGER NOT NULL, tx_hash TEXT NOT NULL,
+    from_address TEXT NOT NULL, to_address TEXT NOT NULL, value TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS transfers_from ON transfers (from_address);
+CREATE INDEX IF NOT EXISTS transfers_to ON transfers (to_address);
+
+CREATE TABLE IF NOT EXISTS customers (
+    block_number INTEGER NOT NULL, log_index INTEGER NOT NULL, tx_hash TEXT NOT NULL,
+    customer TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS customers_customer ON customers (customer);
+
+CREATE TABLE IF NOT EXISTS redemptions (
+    block_number INTEGER NOT NULL, log_index INTEGER NOT NULL, tx_hash TEXT NOT NULL,
+    customer TEXT NOT NULL, reward_id TEXT NOT NULL, cost TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS redemptions_customer ON redemptions (customer);
+
+CREATE TABLE IF NOT EXISTS reward_events (
+    block_number INTEGER NOT NULL, log_index INTEGER NOT NULL, tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL, reward_id TEXT NOT NULL,
+    cost TEXT, old_cost TEXT, cid TEXT,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS reward_events_reward ON reward_events (reward_id);
+
+CREATE TABLE IF NOT EXISTS certificates (
+    block_number INTEGER NOT NULL, log_index INTEGER NOT NULL, tx_hash TEXT NOT NULL,
+    customer TEXT NOT NULL, certificate_cid TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS certificates_customer ON certificates (customer);
+
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_block INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS block_hashes (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL
+);
+"""
+
+INDEXED_TABLES = ("transfers", "customers", "redemptions", "reward_events", "certificates")
+
+
+def _hex(value) -> str:
+    if isinstance(value, str):
+        return value if value.startswith("0x") else "0x" + value
+    return "0x" + bytes(value).hex()
+
+
+def decode_log(log):
+    """
+    Decode a raw log from either contract
+
+    Returns:
+        (event name, args dict) or None for unknown events
+    """
+    topics = log["topics"]
+    if not topics:
+        return None
+    name = TOPICS.get(_hex(topics[0]))
+    if name is None:
+        return None
+
+    fields = EVENTS[name][2]
+    indexed = [(f, t) for f, t, is_indexed in fields if is_indexed]
+    plain = [(f, t) for f, t, is_indexed in fields if not is_indexed]
+
+    args = {}
+    for (field, abi_type), topic in zip(indexed, topics[1:]):
+        args[field] = decode([abi_type], bytes.fromhex(_hex(topic)[2:]))[0]
+    data = bytes.fromhex(_hex(log["data"])[2:])
+    for (field, _), value in zip(plain, decode([t for _, t in plain], data)):
+        args[field] = value
+    for field, abi_type, _ in fields:
+        if abi_type == "address":
+            args[field] = to_checksum_address(args[field])
+    return name, args
+
+
+class EventIndexer:
+    """
+    Follows LoyaltyToken and LoyaltyManager logs into SQLite
+
+    Args:
+        w3: Web3 instance
+        db_path: SQLite database file
+        token_address: LoyaltyToken address
+        manager_address: LoyaltyManager address
+        start_block: First block to index on an empty database
+        chunk_size: Initial eth_getLogs block range
+        max_chunk_size: Upper bound for the adaptive block range
+        reorg_depth: Blocks rolled back when a reorg is detected
+        confirmations: Blocks behind head to stop at
+    """
+
+    def __init__(self, w3, db_path: str, token_address: str, manager_address: str,
+                 start_block: int = 0, chunk_size: int = 2000, max_chunk_size: int = 10000,
+                 reorg_depth: int = 12, confirmations: int = 0):
+        self.w3 = w3
+        self.addresses = [to_checksum_address(token_address), to_checksum_address(manager_address)]
+        self.start_block = start_block
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.reorg_depth = reorg_depth
+        self.confirmations = confirmations
+        self.rollbacks = 0  # bumped on every rollback so read models can rebuild
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def last_block(self) -> int:
+        """Last fully indexed block (start_block - 1 on an empty database)"""
+        with self._lock:
+            row = self.conn.execute("SELECT last_block FROM checkpoint WHERE id = 1").fetchone()
+        return row["last_block"] if row else self.start_block - 1
+
+    def sync(self, to_block: int = None) -> int:
+        """
+        Index all new logs up to to_block (default: head - confirmations)
+
+        Returns:
+            Number of logs stored
+        """
+        self._check_reorg()
+        head = self.w3.eth.block_number - self.confirmations
+        target = head if to_block is None else min(to_block, head)
+
+        stored = 0
+        from_block = self.last_block + 1
+        while from_block <= target:
+            to = min(from_block + self.chunk_size - 1, target)
+            try:
+                logs = self.w3.eth.get_logs({
+                    "fromBlock": from_block,
+                    "toBlock": to,
+                    "address": self.addresses,
+                })
+            except Exception:
+                if self.chunk_size == 1:
+                    raise
+                # Range or result-size limit: retry with a smaller window
+                self.chunk_size = max(1, self.chunk_size // 2)
+                continue
+
+            block_hash = self.w3.eth.get_block(to)["hash"]
+            stored += self._store(logs, to, _hex(block_hash))
+            from_block = to + 1
+            if len(logs) < 1000:
+                self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+        return stored
+
+    def run(self, poll_interval: float = 5.0, stop_event: threading.Event = None):
+        """Keep syncing until stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"⚠️  Indexer sync failed: {e}")
+            stop_event.wait(poll_interval)
+
+    def rollback(self, to_block: int):
+        """Drop everything indexed after to_block"""
+        with self._lock, self.conn:
+            for table in INDEXED_TABLES:
+                self.conn.execute(f"DELETE FROM {table} WHERE block_number > ?", (to_block,))
+            self.conn.execute("DELETE FROM block_hashes WHERE block_number > ?", (to_block,))
+            self.conn.execute(
+                "INSERT INTO checkpoint (id, last_block) VALUES (1, ?) "
+                "ON CONFLICT(id) DO UPDATE SET last_block = excluded.last_block",
+                (to_block,)
+            )
+            self.rollbacks += 1
+
+    def _check_reorg(self):
+        """
+        Roll back reorg_depth blocks if the last indexed block changed
+
+        A block that no longer exists counts as changed. Any other error
+        propagates, so a flaky RPC call is retried on the next sync instead
+        of forcing a rollback.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT block_number, block_hash FROM block_hashes ORDER BY block_number DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return
+        try:
+            current = _hex(self.w3.eth.get_block(row["block_number"])["hash"])
+        except BlockNotFound:
+            current = None
+        if current != row["block_hash"]:
+            self.rollback(max(self.start_block - 1, row["block_number"] - self.reorg_depth))
+
+    def _store(self, logs, to_block: int, block_hash: str) -> int:
+        stored = 0
+        with self._lock, self.conn:
+            for log in logs:
+                decoded = decode_log(log)
+                if decoded is None:
+                    continue
+                name, args = decoded
+                key = (log["blockNumber"], log["logIndex"], _hex(log["transactionHash"]))
+                self._insert(name, args, key)
+                stored += 1
+            self.conn.execute(
+                "INSERT INTO checkpoint (id, last_block) VALUES (1, ?) "
+                "ON CONFLICT(id) DO UPDATE SET last_block = excluded.last_block",
+                (to_block,)
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO block_hashes (block_number, block_hash) VALUES (?, ?)",
+                (to_block, block_hash)
+            )
+            self.conn.execute(
+                "DELETE FROM block_hashes WHERE block_number < ?", (to_block - self.reorg_depth,)
+            )
+        return stored
+
+    def _insert(self, name: str, args: dict, key: tuple):
+        if name == "Transfer":
+            self.conn.execute(
+                "INSERT OR IGNORE INTO transfers VALUES (?, ?, ?, ?, ?, ?)",
+                key + (args["from"], args["to"], str(args["value"]))
+            )
+        elif name == "CustomerRegistered":
+            self.conn.execute("INSERT OR IGNORE INTO customers VALUES (?, ?, ?, ?)", key + (args["customer"],))
+        elif name == "RewardRedeemed":
+            self.conn.execute(
+                "INSERT OR IGNORE INTO redemptions VALUES (?, ?, ?, ?, ?, ?)",
+                key + (args["customer"], str(args["reward_id"]), str(args["cost"]))
+            )
+        elif name == "CertificateIssued":
+            self.conn.execute(
+                "INSERT OR IGNORE INTO certificates VALUES (?, ?, ?, ?, ?)",
+                key + (args["customer"], bytes32_to_cid(args["certificate"]))
+            )
+        else:
+            cost = args.get("new_cost", args.get("cost"))
+            cid = args.get("metadata_cid", args.get("image_cid"))
+            self.conn.execute(
+                "INSERT OR IGNORE INTO reward_events VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (name, str(args["reward_id"]),
+                       None if cost is None else str(cost),
+                       None if args.get("old_cost") is None else str(args["old_cost"]),
+                       cid)
+            )
+
+    # Read model
+
+    def balance_of(self, address: str) -> int:
+        address = to_checksum_address(address)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT from_address, to_address, value FROM transfers "
+                "WHERE from_address = ? OR to_address = ?",
+                (address, address)
+            ).fetchall()
+        balance = 0
+        for row in rows:
+            if row["to_address"] == address:
+                balance += int(row["value"])
+            if row["from_address"] == address:
+                balance -= int(row["value"])
+        return balance
+
+    def is_registered(self, customer: str) -> bool:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM customers WHERE customer = ? LIMIT 1", (to_checksum_address(customer),)
+            ).fetchone()
+        return row is not None
+
+    def certificates_of(self, customer: str) -> list:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT certificate_cid FROM certificates WHERE customer = ? ORDER BY block_number, log_index",
+                (to_checksum_address(customer),)
+            ).fetchall()
+        return [row["certificate_cid"] for row in rows]
+
+    def redemptions_of(self, customer: str) -> list:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM redemptions WHERE customer = ? ORDER BY block_number, log_index",
+                (to_checksum_address(customer),)
+            ).fetchall()
+        return [dict(row, reward_id=int(row["reward_id"]), cost=int(row["cost"])) for row in rows]
+
+    def reward_history(self, reward_id: int) -> list:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM reward_events WHERE reward_id = ? ORDER BY block_number, log_index",
+                (str(reward_id),)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def reward_events_after(self, block_number: int, log_index: int) -> list:
+        """Reward events after (block_number, log_index), in chain order"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM reward_events WHERE block_number > ? OR (block_number = ? AND log_index > ?) "
+                "ORDER BY block_number, log_index",
+                (block_number, block_number, log_index)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def main():
+    from dotenv import load_dotenv
+    from web3 import Web3
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Index LoyaltyToken/LoyaltyManager events into SQLite")
+    parser.add_argument("--db", default=os.getenv("INDEXER_DB_PATH", "loyalty_index.db"))
+    parser.add_argument("--deployments", default="deployments/sepolia.json")
+    parser.add_argument("--from-block", type=int, default=0)
+    parser.add_argument("--follow", action="store_true", help="Keep polling for new blocks")
+    parser.add_argument("--poll-interval", type=float, default=12.0)
+    args = parser.parse_args()
+
+    contracts = json.loads(Path(args.deployments).read_text())["contracts"]
+    w3 = Web3(Web3.HTTPProvider(os.getenv("INFURA_SEPOLIA_URL")))
+    indexer = EventIndexer(
+        w3, args.db,
+        contracts["LoyaltyToken"]["address"],
+        contracts["LoyaltyManager"]["address"],
+        start_block=args.from_block
+    )
+
+    if args.follow:
+        indexer.run(args.poll_interval)
+    else:
+        stored = indexer.sync()
+        print(f"✅ Indexed {stored} events up to block {indexer.last_block}")
+
+
+if __name__ == "__main__":
+    main()
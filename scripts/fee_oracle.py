@@ -0,0 +1,130 @@
+"""
+Cached EIP-1559 fee oracle
+Fees are refreshed once per new block from eth_feeHistory so request
+handlers can read them without an RPC round trip
+"""
+
+import threading
+
+
+class FeeOracle:
+    """
+    Keeps the current maxFeePerGas / maxPriorityFeePerGas in memory
+
+    Args:
+        w3: Web3 instance
+        reward_percentile: Percentile of recent priority fees to pay
+        history_blocks: Number of blocks sampled from eth_feeHistory
+        base_fee_multiplier: Headroom over the next base fee, so the tx stays
+            valid through several full blocks
+        refresh_interval: Seconds between block number polls in the
+            background thread
+    """
+
+    def __init__(self, w3, reward_percentile: float = 50, history_blocks: int = 10,
+                 base_fee_multiplier: float = 2, refresh_interval: float = 2.0):
+        self.w3 = w3
+        self.reward_percentile = reward_percentile
+        self.history_blocks = history_blocks
+        self.base_fee_multiplier = base_fee_multiplier
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._fees = None
+        self._block_number = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Refresh now, then keep refreshing in a daemon thread"""
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def fees(self) -> dict:
+        """
+        Fee fields to merge into a transaction dict
+
+        Returns:
+            {'maxFeePerGas', 'maxPriorityFeePerGas'} on EIP-1559 chains,
+            otherwise {'gasPrice'}
+        """
+        with self._lock:
+            fees = self._fees
+        if fees is None:
+            self.refresh(force=True)
+            with self._lock:
+                fees = self._fees
+        return dict(fees)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Recompute fees if a new block has been produced
+
+        Returns:
+            True if the cached fees were updated
+        """
+        block_number, history = self._read_head()
+        if not force and block_number == self._block_number and self._fees is not None:
+            return False
+
+        fees = self._compute_fees(history)
+        with self._lock:
+            self._fees = fees
+            self._block_number = block_number
+        return True
+
+    def _read_head(self) -> tuple:
+        """
+        Current block number and, where the provider batches (see
+        PooledBatchProvider), the fee history fetched in the same request
+
+        Returns:
+            (block number, fee history or None)
+        """
+        provider = getattr(self.w3, 'provider', None)
+        if not hasattr(provider, 'batch'):
+            return self.w3.eth.block_number, None
+        block_number, history = provider.batch([
+            ("eth_blockNumber", []),
+            ("eth_feeHistory", [hex(self.history_blocks), 'latest', [self.reward_percentile]]),
+        ])
+        return int(block_number, 16), {
+            'baseFeePerGas': [int(fee, 16) for fee in history.get('baseFeePerGas') or []],
+            'reward': [[int(r, 16) for r in rewards] for rewards in history.get('reward') or []],
+        }
+
+    def _compute_fees(self, history: dict = None) -> dict:
+        if history is None:
+            history = self.w3.eth.fee_history(self.history_blocks, 'latest', [self.reward_percentile])
+        base_fees = history.get('baseFeePerGas') or []
+        # The last entry is the base fee of the next block
+        next_base_fee = base_fees[-1] if base_fees else None
+        if next_base_fee is None:
+            next_base_fee = self.w3.eth.get_block('latest').get('baseFeePerGas')
+        if next_base_fee is None:
+            # Pre-London chain
+            return {'gasPrice': self.w3.eth.gas_price}
+
+        rewards = sorted(r[0] for r in history.get('reward') or [] if r and r[0] > 0)
+        if rewards:
+            priority_fee = rewards[len(rewards) // 2]
+        else:
+            priority_fee = self.w3.eth.max_priority_fee
+
+        return {
+            'maxFeePerGas': int(next_base_fee * self.base_fee_multiplier) + priority_fee,
+            'maxPriorityFeePerGas': priority_fee,
+        }
+
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the last known fees until the provider recovers
+                pass
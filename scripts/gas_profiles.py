@@ -0,0 +1,129 @@
+"""
+Measured gas limits per contract function and argument shape
+Profiles come from scripts/profile_gas.py, estimate_gas and receipts, so
+most transactions can be sent without an eth_estimateGas round trip
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class GasProfiles:
+    """
+    Max observed gas used, keyed by "<function>:<shape>"
+
+    Shapes describe what drives the cost, e.g. "first" vs "repeat" for a
+    mint to a new vs an already funded address, or the item count for
+    batch calls ("issueTokensBatch:100").
+
+    Args:
+        path: JSON file to load from and save to (optional)
+        margin: Multiplier applied to measured gas when used as a limit
+    """
+
+    def __init__(self, path: str = None, margin: float = 1.2):
+        self.path = Path(path) if path else None
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._profiles = {}
+        if self.path and self.path.exists():
+            self._profiles = {k: int(v) for k, v in json.loads(self.path.read_text()).items()}
+
+    @staticmethod
+    def key(function: str, shape=None) -> str:
+        return function if shape is None else f"{function}:{shape}"
+
+    def record(self, function: str, shape, gas_used: int) -> bool:
+        """
+        Store a measurement, keeping the maximum seen for the key
+
+        Returns:
+            True if the stored profile changed
+        """
+        key = self.key(function, shape)
+        with self._lock:
+            if gas_used <= self._profiles.get(key, 0):
+                return False
+            self._profiles[key] = int(gas_used)
+            return True
+
+    def lookup(self, function: str, shape=None):
+        """
+        Measured gas for a call shape, or None if unknown
+
+        Numeric shapes (batch sizes) with no exact measurement are
+        extrapolated linearly from the measured sizes, using the steepest
+        per-item slope so the result errs on the high side.
+        """
+        with self._lock:
+            exact = self._profiles.get(self.key(function, shape))
+            if exact is not None or not isinstance(shape, int):
+                return exact
+            sizes = sorted(
+                (int(k.split(':', 1)[1]), v) for k, v in self._profiles.items()
+                if k.startswith(f"{function}:") and k.split(':', 1)[1].isdigit()
+            )
+
+        if not sizes:
+            return None
+        if len(sizes) == 1:
+            n, gas = sizes[0]
+            return gas * max(shape, n) // n
+        slope = max((g2 - g1) / (n2 - n1) for (n1, g1), (n2, g2) in zip(sizes, sizes[1:]))
+        # Anchor on the nearest measured size below (or the smallest one)
+        below = [(n, g) for n, g in sizes if n <= shape] or sizes[:1]
+        n, gas = below[-1]
+        return int(gas + slope * (shape - n))
+
+    def gas_limit(self, function: str, shape=None, estimate=None) -> int:
+        """
+        Gas limit to send with, including the safety margin
+
+        Args:
+            function: Contract function name
+            shape: Argument shape key
+            estimate: Callable returning an eth_estimateGas result, used
+                (and recorded) only when there is no profile
+
+        Raises:
+            KeyError: If there is no profile and no estimate callable
+        """
+        gas = self.lookup(function, shape)
+        if gas is None:
+            if estimate is None:
+                raise KeyError(f"No gas profile for {self.key(function, shape)}")
+            gas = estimate()
+            self.record(function, shape, gas)
+        return int(gas * self.margin)
+
+    def max_batch_size(self, function: str, gas_budget: int, upper: int):
+        """
+        Largest batch size whose gas limit fits in gas_budget
+
+        Returns:
+            Batch size in [1, upper], or None without a profile for function
+        """
+        if self.lookup(function, 1) is None:
+            return None
+        low, high = 1, upper
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.gas_limit(function, mid) <= gas_budget:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return dict(sorted(self._profiles.items()))
+
+    def save(self, path: str = None):
+        """Atomically write the profiles as JSON"""
+        target = Path(path) if path else self.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.as_dict(), indent=2))
+        os.replace(tmp, target)
@@ -3,11 +3,18 @@ Script to generate PDF certificates for redeemed rewards
 Includes QR code for verification
 """
 
+import argparse
+import csv
 import json
 import hashlib
+import os
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from io import BytesIO
+from itertools import islice
+from pathlib import Path
 
 try:
     from reportlab.lib.pagesizes import letter, A4
@@ -24,9 +31,44 @@ except ImportError:
 class CertificateGenerator:
     """Generate PDF certificates for loyalty program"""
     
-    def __init__(self):
+    # Colors
+    PRIMARY_COLOR = HexColor('#2563eb')  # Blue
+    SECONDARY_COLOR = HexColor('#64748b')  # Gray
+    ACCENT_COLOR = HexColor('#10b981')  # Green
+    
+    QR_ERROR_CORRECTION = {
+        "L": qrcode.constants.ERROR_CORRECT_L,
+        "M": qrcode.constants.ERROR_CORRECT_M,
+        "Q": qrcode.constants.ERROR_CORRECT_Q,
+        "H": qrcode.constants.ERROR_CORRECT_H,
+    }
+    
+    def __init__(self, vector_qr: bool = True,
+                 qr_error_correction: str = "L", qr_version: int = None, qr_mask_pattern: int = None):
+        """
+        Args:
+            vector_qr: Draw the QR code as vector rectangles instead of
+                embedding a PNG
+            qr_error_correction: QR error-correction level: L, M, Q or H
+            qr_version: Fixed QR version (1-40); None picks the smallest fit
+            qr_mask_pattern: Fixed QR mask (0-7); None evaluates all eight
+                and keeps the best, which is most of the QR encoding time
+        """
         self.page_size = A4
         self.width, self.height = self.page_size
+        self.vector_qr = vector_qr
+        self.qr_error_correction = self.QR_ERROR_CORRECTION[qr_error_correction.upper()]
+        self.qr_version = qr_version
+        self.qr_mask_pattern = qr_mask_pattern
+        
+        # Layout positions shared by the static layout and the variable fields
+        line_height = 0.35*inch
+        self.name_y = self.height - 3.2*inch
+        self.address_y = self.name_y - line_height
+        self.box_y = self.address_y - line_height * 1.3
+        self.voucher_y = self.box_y - 2.2*inch
+        self.hash_y = self.voucher_y - 0.6*inch
+        self.date_y = self.hash_y - 0.25*inch
     
     def generate_voucher_code(self) -> str:
         """Generate unique voucher code"""
@@ -57,41 +99,61 @@ class CertificateGenerator:
         
         return img_buffer
     
-    def generate_certificate(
-        self,
-        customer_address: str,
-        customer_name: str,
-        reward_name: str,
-        reward_description: str,
-        token_cost: int,
-        redemption_date: str,
-        output_path: str
-    ) -> dict:
+    def qr_matrix(self, data: str) -> list:
+        """QR modules (including the quiet zone) as rows of booleans"""
+        qr = qrcode.QRCode(
+            version=self.qr_version,
+            error_correction=self.qr_error_correction,
+            box_size=1,
+            border=4,
+            mask_pattern=self.qr_mask_pattern,
+        )
+        qr.add_data(data)
+        qr.make(fit=self.qr_version is None)
+        return qr.get_matrix()
+    
+    def draw_qr_code(self, c: canvas.Canvas, data: str, x: float, y: float, size: float):
         """
-        Generate PDF certificate
+        Draw a QR code as vector rectangles
         
-        Returns:
-            dict with voucher_code, verification_hash, and certificate metadata
+        Runs of dark modules in a row are merged into one rectangle and the
+        whole code is filled as a single path, so no raster image is encoded
+        or embedded.
         """
-        # Create canvas
-        c = canvas.Canvas(output_path, pagesize=self.page_size)
-        
-        # Generate voucher code and verification hash
-        voucher_code = self.generate_voucher_code()
-        verification_hash = self.generate_verification_hash(customer_address, voucher_code)
-        
-        # Colors
-        primary_color = HexColor('#2563eb')  # Blue
-        secondary_color = HexColor('#64748b')  # Gray
-        accent_color = HexColor('#10b981')  # Green
+        matrix = self.qr_matrix(data)
+        module = size / len(matrix)
+        
+        c.saveState()
+        c.setFillColor(HexColor('#ffffff'))
+        c.rect(x, y, size, size, stroke=0, fill=1)
+        
+        path = c.beginPath()
+        for row_index, row in enumerate(matrix):
+            row_y = y + size - (row_index + 1) * module
+            col = 0
+            while col < len(row):
+                if not row[col]:
+                    col += 1
+                    continue
+                start = col
+                while col < len(row) and row[col]:
+                    col += 1
+                path.rect(x + start * module, row_y, (col - start) * module, module)
+        c.setFillColor(HexColor('#000000'))
+        c.drawPath(path, stroke=0, fill=1)
+        c.restoreState()
+    
+    def draw_static_layout(self, c: canvas.Canvas):
+        """Draw everything that is identical on every certificate"""
+        c.saveState()
         
         # Header - Certificate Title
-        c.setFillColor(primary_color)
+        c.setFillColor(self.PRIMARY_COLOR)
         c.setFont("Helvetica-Bold", 32)
         c.drawCentredString(self.width / 2, self.height - 1.5*inch, "REWARD CERTIFICATE")
         
         # Border decoration
-        c.setStrokeColor(primary_color)
+        c.setStrokeColor(self.PRIMARY_COLOR)
         c.setLineWidth(3)
         c.rect(0.5*inch, 0.5*inch, self.width - inch, self.height - inch)
         
@@ -99,47 +161,86 @@ class CertificateGenerator:
         c.rect(0.6*inch, 0.6*inch, self.width - 1.2*inch, self.height - 1.2*inch)
         
         # Subtitle
-        c.setFillColor(secondary_color)
+        c.setFillColor(self.SECONDARY_COLOR)
         c.setFont("Helvetica", 14)
         c.drawCentredString(self.width / 2, self.height - 2*inch, 
                           "LoyaltyToken Rewards Platform")
         
         # Horizontal line
-        c.setStrokeColor(accent_color)
+        c.setStrokeColor(self.ACCENT_COLOR)
         c.setLineWidth(2)
         c.line(2*inch, self.height - 2.3*inch, self.width - 2*inch, self.height - 2.3*inch)
         
-        # Certificate details
-        y_position = self.height - 3.2*inch
-        line_height = 0.35*inch
+        # Field labels
+        c.setFillColor(HexColor('#000000'))
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(1.5*inch, self.name_y, "Issued to:")
+        c.drawString(1.5*inch, self.address_y, "Wallet Address:")
+        
+        # Reward details box
+        c.setFillColor(HexColor('#f1f5f9'))
+        c.rect(1.3*inch, self.box_y - 0.6*inch, self.width - 2.6*inch, 1.8*inch, fill=1)
         
         c.setFillColor(HexColor('#000000'))
-        c.setFont("Helvetica", 12)
+        c.setFont("Helvetica-Bold", 14)
+        c.drawString(1.5*inch, self.box_y + 0.9*inch, "Reward Details")
         
-        # Customer name
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(1.5*inch, y_position, "Issued to:")
-        c.setFont("Helvetica", 11)
-        c.drawString(3*inch, y_position, customer_name)
+        # QR code label
+        c.setFillColor(self.SECONDARY_COLOR)
+        c.setFont("Helvetica", 8)
+        c.drawCentredString(self.width - 1.75*inch, 0.9*inch, "Scan to verify")
         
-        y_position -= line_height
+        # Footer
+        c.setFont("Helvetica-Oblique", 8)
+        c.drawCentredString(self.width / 2, 0.7*inch, 
+                          "This certificate is cryptographically secured on Ethereum blockchain")
+        c.drawCentredString(self.width / 2, 0.5*inch, 
+                          "Visit loyalty-token.example.com to verify authenticity")
         
-        # Customer address (shortened)
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(1.5*inch, y_position, "Wallet Address:")
-        c.setFont("Courier", 9)
-        c.drawString(3*inch, y_position, f"{customer_address[:10]}...{customer_address[-8:]}")
+        c.restoreState()
+    
+    def generate_certificate(
+        self,
+        customer_address: str,
+        customer_name: str,
+        reward_name: str,
+        reward_description: str,
+        token_cost: int,
+        redemption_date: str,
+        output_path
+    ) -> dict:
+        """
+        Generate PDF certificate
         
-        y_position -= line_height * 1.3
+        Args:
+            output_path: File path, or a binary file object such as BytesIO
+                to render without touching disk
         
-        # Reward details box
-        c.setFillColor(HexColor('#f1f5f9'))
-        c.rect(1.3*inch, y_position - 0.6*inch, self.width - 2.6*inch, 1.8*inch, fill=1)
+        Returns:
+            dict with voucher_code, verification_hash, and certificate metadata
+        """
+        # Create canvas
+        c = canvas.Canvas(output_path, pagesize=self.page_size)
+        
+        # Generate voucher code and verification hash
+        voucher_code = self.generate_voucher_code()
+        verification_hash = self.generate_verification_hash(customer_address, voucher_code)
+        
+        # Borders, title, labels, reward box and footer
+        self.draw_static_layout(c)
         
         c.setFillColor(HexColor('#000000'))
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(1.5*inch, y_position + 0.9*inch, "Reward Details")
         
+        # Customer name
+        c.setFont("Helvetica", 11)
+        c.drawString(3*inch, self.name_y, customer_name)
+        
+        # Customer address (shortened)
+        c.setFont("Courier", 9)
+        c.drawString(3*inch, self.address_y, f"{customer_address[:10]}...{customer_address[-8:]}")
+        
+        # Reward details
+        y_position = self.box_y
         c.setFont("Helvetica-Bold", 12)
         c.drawString(1.5*inch, y_position + 0.4*inch, reward_name)
         
@@ -149,22 +250,16 @@ class CertificateGenerator:
         c.setFont("Helvetica-Bold", 10)
         c.drawString(1.5*inch, y_position - 0.3*inch, f"Token Cost: {token_cost:,} LTT")
         
-        y_position -= 2.2*inch
-        
         # Voucher code (prominent)
-        c.setFillColor(accent_color)
+        c.setFillColor(self.ACCENT_COLOR)
         c.setFont("Helvetica-Bold", 18)
-        c.drawCentredString(self.width / 2, y_position, f"VOUCHER CODE: {voucher_code}")
-        
-        y_position -= 0.6*inch
+        c.drawCentredString(self.width / 2, self.voucher_y, f"VOUCHER CODE: {voucher_code}")
         
         # Verification details
-        c.setFillColor(secondary_color)
+        c.setFillColor(self.SECONDARY_COLOR)
         c.setFont("Helvetica", 9)
-        c.drawString(1.5*inch, y_position, f"Verification Hash: {verification_hash}")
-        
-        y_position -= 0.25*inch
-        c.drawString(1.5*inch, y_position, f"Redemption Date: {redemption_date}")
+        c.drawString(1.5*inch, self.hash_y, f"Verification Hash: {verification_hash}")
+        c.drawString(1.5*inch, self.date_y, f"Redemption Date: {redemption_date}")
         
         # QR Code
         qr_data = json.dumps({
@@ -174,25 +269,16 @@ class CertificateGenerator:
             "reward": reward_name
         })
         
-        qr_buffer = self.create_qr_code(qr_data)
         qr_size = 1.5*inch
         
-        # Save QR code temporarily and draw it
-        from reportlab.platypus import Image as RLImage
-        qr_img = RLImage(qr_buffer, width=qr_size, height=qr_size)
-        qr_img.drawOn(c, self.width - 2.5*inch, 1.2*inch)
-        
-        # QR code label
-        c.setFont("Helvetica", 8)
-        c.drawCentredString(self.width - 1.75*inch, 0.9*inch, "Scan to verify")
-        
-        # Footer
-        c.setFont("Helvetica-Oblique", 8)
-        c.setFillColor(secondary_color)
-        c.drawCentredString(self.width / 2, 0.7*inch, 
-                          "This certificate is cryptographically secured on Ethereum blockchain")
-        c.drawCentredString(self.width / 2, 0.5*inch, 
-                          "Visit loyalty-token.example.com to verify authenticity")
+        if self.vector_qr:
+            self.draw_qr_code(c, qr_data, self.width - 2.5*inch, 1.2*inch, qr_size)
+        else:
+            # Save QR code temporarily and draw it
+            qr_buffer = self.create_qr_code(qr_data)
+            from reportlab.platypus import Image as RLImage
+            qr_img = RLImage(qr_buffer, width=qr_size, height=qr_size)
+            qr_img.drawOn(c, self.width - 2.5*inch, 1.2*inch)
         
         # Save PDF
         c.save()
@@ -207,14 +293,160 @@ class CertificateGenerator:
             "token_cost": token_cost,
             "redemption_date": redemption_date,
             "qr_data": qr_data,
-            "file_path": output_path
+            "file_path": output_path if isinstance(output_path, str) else None
         }
         
         return metadata
+    
+    def render_certificate(self, **fields) -> tuple:
+        """
+        Render a certificate into memory
+        
+        Args:
+            **fields: generate_certificate arguments except output_path
+        
+        Returns:
+            (PDF bytes, metadata) where metadata also carries the PDF's
+            content_hash (sha256 hex) and size
+        """
+        buffer = BytesIO()
+        metadata = self.generate_certificate(output_path=buffer, **fields)
+        pdf = buffer.getvalue()
+        metadata["content_hash"] = hashlib.sha256(pdf).hexdigest()
+        metadata["size"] = len(pdf)
+        return pdf, metadata
+
+
+CERTIFICATE_FIELDS = (
+    "customer_address", "customer_name", "reward_name",
+    "reward_description", "token_cost", "redemption_date",
+)
+
+# One generator per worker process, created by the pool initializer
+_worker_generator = None
+
+
+def _init_worker():
+    global _worker_generator
+    _worker_generator = CertificateGenerator()
+
+
+def _render_chunk(output_dir: str, start: int, records: list) -> list:
+    """Render a chunk of redemptions in a worker process"""
+    results = []
+    for offset, record in enumerate(records):
+        index = start + offset
+        output_path = record.get("output_path") or os.path.join(output_dir, f"certificate_{index:08d}.pdf")
+        try:
+            kwargs = {field: record[field] for field in CERTIFICATE_FIELDS}
+            kwargs["token_cost"] = int(kwargs["token_cost"])
+            metadata = _worker_generator.generate_certificate(output_path=output_path, **kwargs)
+            results.append(dict(metadata, index=index))
+        except Exception as e:
+            results.append({"index": index, "error": str(e), "customer_address": record.get("customer_address")})
+    return results
+
+
+def read_redemptions(path: str):
+    """
+    Stream redemption records from a JSONL or CSV file
+
+    Yields:
+        One dict per redemption with the generate_certificate fields
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def generate_many(records, output_dir: str, manifest_path: str, workers: int = None,
+                  chunk_size: int = 50, max_pending: int = None) -> dict:
+    """
+    Render certificates for many redemptions across a process pool
+
+    Records are consumed lazily and at most max_pending chunks are in
+    flight, so memory stays bounded whatever the input size. Results are
+    appended to a JSONL manifest in input order as each chunk completes.
+
+    Args:
+        records: Iterable of redemption dicts
+        output_dir: Directory for PDFs without an explicit output_path
+        manifest_path: JSONL file receiving one metadata line per record
+        workers: Process count (default: CPU count)
+        chunk_size: Records per task sent to a worker
+        max_pending: Chunks in flight (default: 2 per worker)
+
+    Returns:
+        dict with rendered and failed counts
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    records = iter(records)
+    counts = {"rendered": 0, "failed": 0}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool, \
+            open(manifest_path, "w", encoding="utf-8") as manifest:
+        pending = deque()
+        start = 0
+
+        def submit_next() -> bool:
+            nonlocal start
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return False
+            pending.append(pool.submit(_render_chunk, output_dir, start, chunk))
+            start += len(chunk)
+            return True
+
+        while len(pending) < max_pending and submit_next():
+            pass
+
+        while pending:
+            for result in pending.popleft().result():
+                counts["failed" if "error" in result else "rendered"] += 1
+                manifest.write(json.dumps(result, ensure_ascii=False) + "\n")
+            manifest.flush()
+            submit_next()
+
+    return counts
+
+
+def bulk_main(args):
+    """Render every redemption in args.input"""
+    print(f"Rendering certificates from {args.input} with {args.workers or os.cpu_count()} workers...")
+    started = datetime.now()
+    counts = generate_many(
+        read_redemptions(args.input),
+        output_dir=args.output_dir,
+        manifest_path=args.manifest,
+        workers=args.workers,
+        chunk_size=args.chunk_size
+    )
+    elapsed = (datetime.now() - started).total_seconds()
+    total = counts["rendered"] + counts["failed"]
+    print(f"✅ Rendered {counts['rendered']} certificates ({counts['failed']} failed) "
+          f"in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f}/s)")
+    print(f"💾 Manifest saved to: {args.manifest}")
 
 
 def main():
-    """Demo certificate generation"""
+    """Demo certificate generation, or bulk rendering with --input"""
+    parser = argparse.ArgumentParser(description="Generate PDF reward certificates")
+    parser.add_argument("--input", help="JSONL or CSV file of redemptions for bulk rendering")
+    parser.add_argument("--output-dir", default="certificates")
+    parser.add_argument("--manifest", default="certificates/manifest.jsonl")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.input:
+        bulk_main(args)
+        return
     
     print("=" * 70)
     print("Certificate Generator Demo")
@@ -253,7 +485,7 @@ def main():
     print()
     print("Next steps:")
     print("  1. Upload PDF to IPFS")
-    print("  2. Call manager.issueCertificate(customer, ipfs_cid)")
+    print("  2. Call manager.issueCertificate(customer, cid_to_bytes32(ipfs_cid))")
     print("  3. Customer can download and use voucher")
     print()
     print("=" * 70)
@@ -0,0 +1,394 @@
+"""
+Bulk customer onboarding through LoyaltyManager.registerCustomers
+Streams a CSV/JSONL of wallet addresses into gas-bounded chunks, sends them
+with pipelined nonces and checkpoints progress in SQLite so a crashed
+import resumes where it stopped
+
+Usage: python -m scripts.import_customers --input members.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from eth_utils import is_address, to_checksum_address
+
+ADDRESS_FIELDS = ("address", "customer_address", "wallet")
+
+PENDING = "pending"
+SENT = "sent"
+MINED = "mined"
+FAILED = "failed"
+
+MAX_BATCH_SIZE = 200  # must match MAX_BATCH_SIZE in LoyaltyManager.vy
+# Fallback sizing when there is no registerCustomers profile
+REGISTER_BASE_GAS = 30000  # fixed cost of one registerCustomers call
+REGISTER_GAS_PER_CUSTOMER = 25000  # upper bound per new customer
+
+
+def read_addresses(path: str, offset: int = 0):
+    """
+    Stream raw addresses from a CSV or JSONL file
+
+    CSV files use the first of ADDRESS_FIELDS found in the header, else the
+    first column. JSONL lines are objects with one of ADDRESS_FIELDS or bare
+    strings; any other line yields an empty address, so callers count it as
+    invalid. Lines are read as bytes so their offsets can be checkpointed.
+
+    Args:
+        offset: Byte offset to resume from, as yielded earlier
+
+    Yields:
+        (raw address, byte offset just past its line)
+    """
+    is_csv = path.endswith(".csv")
+    with open(path, "rb") as f:
+        column = 0
+        if is_csv:
+            header = next(csv.reader([f.readline().decode("utf-8-sig")]), [])
+            names = [name.strip().lower() for name in header]
+            column = next((names.index(field) for field in ADDRESS_FIELDS if field in names), 0)
+            if not any(field in names for field in ADDRESS_FIELDS) and header and is_address(header[0].strip()):
+                f.seek(0)  # no header row
+        if offset:
+            f.seek(offset)
+        for line in iter(f.readline, b""):
+            text = line.decode("utf-8", errors="replace").strip()
+            if not text:
+                continue
+            if is_csv:
+                row = next(csv.reader([text]))
+                raw = row[column] if column < len(row) else ""
+            else:
+                try:
+                    value = json.loads(text)
+                except ValueError:
+                    value = None
+                if isinstance(value, dict):
+                    value = next((value[field] for field in ADDRESS_FIELDS if field in value), "")
+                raw = value if isinstance(value, str) else ""
+            yield raw.strip(), f.tell()
+
+
+class ImportCheckpoint:
+    """
+    SQLite record of an import: every address assigned to a chunk, chunk
+    states and the input offset after the last assigned address
+
+    The addresses table doubles as the dedupe set, so memory does not grow
+    with the input.
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY,
+                status TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                tx_hash TEXT,
+                sent_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS addresses (
+                address TEXT PRIMARY KEY,
+                chunk_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS addresses_chunk ON addresses (chunk_id);
+            CREATE INDEX IF NOT EXISTS chunks_status ON chunks (status, id);
+            """
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def seen(self, address: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM addresses WHERE address = ?", (address,)).fetchone() is not None
+
+    def add_chunk(self, addresses: list, offset: int) -> int:
+        """Persist a new chunk and the input offset it ends at in one transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                chunk_id = self._conn.execute(
+                    "INSERT INTO chunks (status, size) VALUES (?, ?)", (PENDING, len(addresses))
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO addresses (address, chunk_id) VALUES (?, ?)",
+                    [(address, chunk_id) for address in addresses]
+                )
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('offset', ?)", (str(offset),))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return chunk_id
+
+    def chunk_addresses(self, chunk_id: int) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT address FROM addresses WHERE chunk_id = ? ORDER BY rowid", (chunk_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def chunks(self, *statuses) -> list:
+        marks = ",".join("?" * len(statuses))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM chunks WHERE status IN ({marks}) ORDER BY id", statuses
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_sent(self, chunk_id: int, tx_hash: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE chunks SET status = ?, tx_hash = ?, sent_at = ?, attempts = attempts + 1, error = NULL "
+                "WHERE id = ?",
+                (SENT, tx_hash, time.time(), chunk_id)
+            )
+
+    def mark(self, chunk_id: int, status: str, error: str = None):
+        with self._lock:
+            self._conn.execute("UPDATE chunks SET status = ?, error = ? WHERE id = ?", (status, error, chunk_id))
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, SUM(size) FROM chunks GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+
+class CustomerImporter:
+    """
+    Register every address of an input file, resumably
+
+    Up to max_in_flight chunk transactions are outstanding at once; the
+    oldest is awaited before the next one is sent. A chunk that reverts is
+    marked failed and retried on the next run, as is a chunk that was sent
+    more than receipt_timeout ago and still has no receipt (dropped). Sending
+    a chunk again is safe because registerCustomers skips addresses that are
+    already registered.
+
+    Args:
+        checkpoint: ImportCheckpoint for this input
+        send_chunk: callable(addresses) -> tx hash
+        check_chunk: callable(tx hash) -> None while pending, else whether it succeeded
+        chunk_size: Addresses per registerCustomers call
+        max_in_flight: Chunk transactions awaiting a receipt at once
+        receipt_timeout: Seconds before an unmined chunk is sent again
+        poll_interval: Seconds between receipt checks
+    """
+
+    def __init__(self, checkpoint: ImportCheckpoint, send_chunk, check_chunk, chunk_size: int = MAX_BATCH_SIZE,
+                 max_in_flight: int = 4, receipt_timeout: float = 300, poll_interval: float = 2.0):
+        self.checkpoint = checkpoint
+        self.send_chunk = send_chunk
+        self.check_chunk = check_chunk
+        self.chunk_size = max(1, min(chunk_size, MAX_BATCH_SIZE))
+        self.max_in_flight = max(1, max_in_flight)
+        self.receipt_timeout = receipt_timeout
+        self.poll_interval = poll_interval
+        self._in_flight = deque()  # (chunk_id, tx_hash, sent_at), oldest first
+        self.stats = {"read": 0, "invalid": 0, "duplicates": 0}
+
+    def run(self, path: str, progress=None) -> dict:
+        """
+        Import path, resuming from the checkpoint
+
+        Args:
+            progress: Optional callable(stats, checkpoint counts) after each chunk
+
+        Returns:
+            Input stats merged with the number of addresses per chunk status
+
+        Raises:
+            ValueError: If the checkpoint belongs to a different input file
+        """
+        source = os.path.abspath(path)
+        recorded = self.checkpoint.get_meta("source")
+        if recorded is None:
+            self.checkpoint.set_meta("source", source)
+        elif recorded != source:
+            raise ValueError(f"Checkpoint {self.checkpoint.path} belongs to {recorded}")
+
+        # Chunks left over from an interrupted run
+        for chunk in self.checkpoint.chunks(SENT):
+            result = self.check_chunk(chunk["tx_hash"])
+            if result is None and time.time() - chunk["sent_at"] > self.receipt_timeout:
+                self.checkpoint.mark(chunk["id"], PENDING, "No receipt")
+            elif result is None:
+                self._in_flight.append((chunk["id"], chunk["tx_hash"], chunk["sent_at"]))
+            else:
+                self.checkpoint.mark(chunk["id"], MINED if result else FAILED,
+                                     None if result else "Transaction reverted")
+        for chunk in self.checkpoint.chunks(PENDING, FAILED):
+            self._submit(chunk["id"], progress)
+
+        buffer, buffered = [], set()
+        offset = int(self.checkpoint.get_meta("offset", 0))
+        for raw, offset in read_addresses(path, offset):
+            self.stats["read"] += 1
+            if not is_address(raw):
+                self.stats["invalid"] += 1
+                continue
+            address = to_checksum_address(raw)
+            if address in buffered or self.checkpoint.seen(address):
+                self.stats["duplicates"] += 1
+                continue
+            buffer.append(address)
+            buffered.add(address)
+            if len(buffer) == self.chunk_size:
+                self._submit(self.checkpoint.add_chunk(buffer, offset), progress)
+                buffer, buffered = [], set()
+        if buffer:
+            self._submit(self.checkpoint.add_chunk(buffer, offset), progress)
+        else:
+            # Trailing invalid or duplicate lines need no chunk
+            self.checkpoint.set_meta("offset", offset)
+
+        while self._in_flight:
+            self._await_oldest()
+            if progress is not None:
+                progress(self.stats, self.checkpoint.counts())
+        return dict(self.stats, **self.checkpoint.counts())
+
+    def _submit(self, chunk_id: int, progress):
+        while len(self._in_flight) >= self.max_in_flight:
+            self._await_oldest()
+        tx_hash = self.send_chunk(self.checkpoint.chunk_addresses(chunk_id))
+        self.checkpoint.mark_sent(chunk_id, tx_hash)
+        self._in_flight.append((chunk_id, tx_hash, time.time()))
+        if progress is not None:
+            progress(self.stats, self.checkpoint.counts())
+
+    def _await_oldest(self):
+        chunk_id, tx_hash, sent_at = self._in_flight.popleft()
+        while True:
+            result = self.check_chunk(tx_hash)
+            if result is True:
+                self.checkpoint.mark(chunk_id, MINED)
+                return
+            if result is False:
+                self.checkpoint.mark(chunk_id, FAILED, "Transaction reverted")
+                return
+            if time.time() - sent_at > self.receipt_timeout:
+                # Later nonces wait behind this one, so stop; the next run resends it
+                raise TimeoutError(f"No receipt for chunk {chunk_id} ({tx_hash}); run again to resend")
+            time.sleep(self.poll_interval)
+
+
+def main():
+    from dotenv import load_dotenv
+    from web3 import Web3
+    from web3.exceptions import TransactionNotFound
+
+    from scripts.fee_oracle import FeeOracle
+    from scripts.gas_profiles import GasProfiles
+    from scripts.nonce_manager import NonceManager
+    from scripts.rpc_provider import PooledBatchProvider
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Register customers from a CSV/JSONL of wallet addresses")
+    parser.add_argument("--input", required=True, help="Addresses as .csv or .jsonl")
+    parser.add_argument("--checkpoint", default="import_customers.db", help="Progress database for resuming")
+    parser.add_argument("--gas-limit", type=int, default=int(os.getenv("BATCH_GAS_LIMIT", "5000000")),
+                        help="Gas budget per registerCustomers transaction")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Unconfirmed transactions at once")
+    parser.add_argument("--receipt-timeout", type=float, default=300)
+    parser.add_argument("--gas-profiles", default=os.getenv("GAS_PROFILE_PATH", "deployments/gas_profiles.json"))
+    args = parser.parse_args()
+
+    w3 = Web3(PooledBatchProvider(os.getenv("RPC_URLS") or os.getenv("INFURA_SEPOLIA_URL")))
+    owner_key = os.getenv("OWNER_PRIVATE_KEY")
+    owner_address = w3.eth.account.from_key(owner_key).address
+    chain_id = w3.eth.chain_id
+    abi = [{
+        "type": "function", "name": "registerCustomers", "stateMutability": "nonpayable",
+        "inputs": [{"name": "_customers", "type": "address[]"}], "outputs": [],
+    }]
+    manager = w3.eth.contract(address=os.getenv("MANAGER_CONTRACT_ADDRESS"), abi=abi)
+
+    profiles = GasProfiles(args.gas_profiles)
+    chunk_size = profiles.max_batch_size("registerCustomers", args.gas_limit, MAX_BATCH_SIZE)
+    if chunk_size is None:
+        chunk_size = (args.gas_limit - REGISTER_BASE_GAS) // REGISTER_GAS_PER_CUSTOMER
+    chunk_size = max(1, min(MAX_BATCH_SIZE, chunk_size))
+
+    def gas_limit(size: int) -> int:
+        try:
+            return profiles.gas_limit("registerCustomers", size)
+        except KeyError:
+            return REGISTER_BASE_GAS + REGISTER_GAS_PER_CUSTOMER * size
+
+    nonce_manager = NonceManager(w3, owner_address)
+    fee_oracle = FeeOracle(w3)
+    fee_oracle.start()
+
+    def send_chunk(addresses: list) -> str:
+        with nonce_manager.reserve() as nonce:
+            tx = manager.functions.registerCustomers(addresses).build_transaction({
+                "from": owner_address,
+                "nonce": nonce,
+                "chainId": chain_id,
+                "gas": gas_limit(len(addresses)),
+                **fee_oracle.fees()
+            })
+            signed = w3.eth.account.sign_transaction(tx, private_key=owner_key)
+            return w3.to_hex(w3.eth.send_raw_transaction(signed.raw_transaction))
+
+    def check_chunk(tx_hash: str):
+        try:
+            return w3.eth.get_transaction_receipt(tx_hash)["status"] == 1
+        except TransactionNotFound:
+            return None
+
+    def progress(stats: dict, counts: dict):
+        print(f"\r  read {stats['read']:,}  mined {counts.get(MINED, 0):,}  "
+              f"in flight {counts.get(SENT, 0):,}  failed {counts.get(FAILED, 0):,}", end="", flush=True)
+
+    checkpoint = ImportCheckpoint(args.checkpoint)
+    importer = CustomerImporter(checkpoint, send_chunk, check_chunk, chunk_size=chunk_size,
+                                max_in_flight=args.max_in_flight, receipt_timeout=args.receipt_timeout)
+    print(f"Importing {args.input} in chunks of {chunk_size}")
+    try:
+        result = importer.run(args.input, progress=progress)
+    finally:
+        fee_oracle.stop()
+        checkpoint.close()
+    print()
+    print(f"✅ Registered {result.get(MINED, 0):,} addresses "
+          f"({result['duplicates']:,} duplicates, {result['invalid']:,} invalid, {result.get(FAILED, 0):,} failed)")
+    if result.get(FAILED):
+        print("⚠️  Run again with the same --checkpoint to retry failed chunks")
+
+
+if __name__ == "__main__":
+    main()
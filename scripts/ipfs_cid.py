@@ -0,0 +1,321 @@
+"""
+Local IPFS CID computation and an index of already-pinned content
+Uses the same UnixFS layout as the pinning service (256 KiB chunks,
+balanced DAG of up to 174 links) so a CID is known before any upload
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from base64 import b32decode, b32encode
+
+CHUNK_SIZE = 256 * 1024
+MAX_LINKS = 174
+
+DAG_PB = 0x70
+RAW = 0x55
+SHA2_256 = 0x12
+UNIXFS_FILE = 2
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def b58encode(data: bytes) -> str:
+    n = int.from_bytes(data, "big")
+    out = ""
+    while n:
+        n, r = divmod(n, 58)
+        out = BASE58_ALPHABET[r] + out
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + out
+
+
+def b58decode(text: str) -> bytes:
+    n = 0
+    for char in text:
+        n = n * 58 + BASE58_ALPHABET.index(char)
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    return b"\0" * (len(text) - len(text.lstrip("1"))) + body
+
+
+def _field(number: int, value: bytes) -> bytes:
+    """Length-delimited protobuf field"""
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+
+def _uint_field(number: int, value: int) -> bytes:
+    return varint(number << 3) + varint(value)
+
+
+def multihash(data: bytes) -> bytes:
+    return bytes([SHA2_256, 32]) + hashlib.sha256(data).digest()
+
+
+def format_cid(digest: bytes, version: int, codec: int) -> str:
+    """CIDv0 (base58btc) or CIDv1 (base32) string for a sha2-256 multihash"""
+    if version == 0:
+        return b58encode(digest)
+    raw = varint(1) + varint(codec) + digest
+    return "b" + b32encode(raw).decode().lower().rstrip("=")
+
+
+def _unixfs_file(data: bytes, filesize: int, blocksizes=()) -> bytes:
+    message = _uint_field(1, UNIXFS_FILE)
+    if data:
+        message += _field(2, data)
+    message += _uint_field(3, filesize)
+    for size in blocksizes:
+        message += _uint_field(4, size)
+    return message
+
+
+def _pb_node(links: list, data: bytes) -> bytes:
+    """dag-pb node; links are (cid bytes, cumulative size) and precede data"""
+    encoded = b""
+    for cid_bytes, tsize in links:
+        link = _field(1, cid_bytes) + _field(2, b"") + _uint_field(3, tsize)
+        encoded += _field(2, link)
+    return encoded + _field(1, data)
+
+
+class _Node:
+    """A block in the file DAG: CID bytes, serialized size subtotal and file bytes"""
+
+    __slots__ = ("cid_bytes", "tsize", "filesize")
+
+    def __init__(self, cid_bytes: bytes, tsize: int, filesize: int):
+        self.cid_bytes = cid_bytes
+        self.tsize = tsize
+        self.filesize = filesize
+
+
+def _leaf(chunk: bytes, version: int) -> _Node:
+    if version == 0:
+        block = _pb_node([], _unixfs_file(chunk, len(chunk)))
+        return _Node(multihash(block), len(block), len(chunk))
+    # CIDv1 uploads use raw leaves
+    return _Node(varint(1) + varint(RAW) + multihash(chunk), len(chunk), len(chunk))
+
+
+def _parent(children: list, version: int) -> _Node:
+    filesize = sum(child.filesize for child in children)
+    block = _pb_node(
+        [(child.cid_bytes, child.tsize) for child in children],
+        _unixfs_file(b"", filesize, [child.filesize for child in children])
+    )
+    digest = multihash(block)
+    cid_bytes = digest if version == 0 else varint(1) + varint(DAG_PB) + digest
+    return _Node(cid_bytes, len(block) + sum(child.tsize for child in children), filesize)
+
+
+def _root(chunks, version: int) -> _Node:
+    """
+    Build the balanced DAG bottom-up, MAX_LINKS children per node
+
+    Only one level of pending nodes per depth is kept, so memory stays
+    O(depth * MAX_LINKS) whatever the file size.
+    """
+    levels = [[]]
+    for chunk in chunks:
+        levels[0].append(_leaf(chunk, version))
+        depth = 0
+        while len(levels[depth]) > MAX_LINKS:
+            # A full node is final once its next sibling exists
+            full = _parent(levels[depth][:MAX_LINKS], version)
+            levels[depth] = levels[depth][MAX_LINKS:]
+            if depth + 1 == len(levels):
+                levels.append([])
+            levels[depth + 1].append(full)
+            depth += 1
+
+    if not levels[0]:
+        levels[0].append(_leaf(b"", version))
+    if len(levels) == 1 and len(levels[0]) == 1:
+        return levels[0][0]
+
+    for depth in range(len(levels)):
+        if depth + 1 == len(levels):
+            if len(levels[depth]) == 1 and depth > 0:
+                return levels[depth][0]
+            return _parent(levels[depth], version)
+        if levels[depth]:
+            levels[depth + 1].append(_parent(levels[depth], version))
+
+
+def _cid_of_chunks(chunks, version: int) -> str:
+    root = _root(chunks, version)
+    if version == 0:
+        return format_cid(root.cid_bytes, 0, DAG_PB)
+    return "b" + b32encode(root.cid_bytes).decode().lower().rstrip("=")
+
+
+def _iter_chunks(data: bytes):
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+
+def cid_of_bytes(data: bytes, version: int = 0) -> str:
+    """CID the pinning service assigns to this file content"""
+    return _cid_of_chunks(_iter_chunks(data), version)
+
+
+def cid_of_file(path: str, version: int = 0) -> str:
+    """CID of a file on disk, read one chunk at a time"""
+    def chunks():
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    return _cid_of_chunks(chunks(), version)
+
+
+def json_bytes(data) -> bytes:
+    """JSON serialized the way pinJSONToIPFS stores it (JSON.stringify)"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def cid_of_json(data, version: int = 0) -> str:
+    return cid_of_bytes(json_bytes(data), version)
+
+
+def parse_cid(cid: str) -> tuple:
+    """
+    Split a CID string into (version, codec, multihash)
+
+    Raises:
+        ValueError: For encodings other than base58btc CIDv0 and base32 CIDv1
+    """
+    if len(cid) == 46 and cid.startswith("Qm"):
+        return 0, DAG_PB, b58decode(cid)
+    if not cid.startswith("b"):
+        raise ValueError(f"Unsupported CID encoding: {cid}")
+    body = cid[1:].upper()
+    raw = b32decode(body + "=" * (-len(body) % 8))
+    if raw[0] != 1:
+        raise ValueError(f"Unsupported CID version: {cid}")
+    return 1, raw[1], raw[2:]
+
+
+def cid_to_bytes32(cid: str) -> bytes:
+    """
+    Pack a CID into the bytes32 digest LoyaltyManager stores for certificates
+
+    Raises:
+        ValueError: If the CID is not a dag-pb sha2-256 CID (raw-leaf CIDv1
+            content cannot be told apart once packed)
+    """
+    version, codec, digest = parse_cid(cid)
+    if codec != DAG_PB or digest[:2] != bytes([SHA2_256, 32]):
+        raise ValueError(f"Only dag-pb sha2-256 CIDs fit in bytes32: {cid}")
+    return digest[2:]
+
+
+def bytes32_to_cid(digest: bytes, version: int = 0) -> str:
+    """CID string for a digest stored on-chain"""
+    digest = bytes(digest)
+    if len(digest) != 32:
+        raise ValueError("Certificate digest must be 32 bytes")
+    return format_cid(bytes([SHA2_256, 32]) + digest, version, DAG_PB)
+
+
+def _verify(cid: str, digest_of_content, cid_of_content) -> bool:
+    version, codec, digest = parse_cid(cid)
+    if digest[:2] != bytes([SHA2_256, 32]):
+        return False
+    if codec == RAW:
+        return digest_of_content() == digest[2:]
+    return cid_of_content(version) == cid
+
+
+def verify_bytes(cid: str, data: bytes) -> bool:
+    """
+    Whether data is the content addressed by cid
+
+    Content added with a different chunker than the defaults above does
+    not reproduce its CID and is reported as not matching.
+    """
+    return _verify(cid, lambda: hashlib.sha256(data).digest(), lambda v: cid_of_bytes(data, v))
+
+
+def verify_file(cid: str, path: str) -> bool:
+    def digest():
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                h.update(chunk)
+        return h.digest()
+
+    return _verify(cid, digest, lambda v: cid_of_file(path, v))
+
+
+class PinIndex:
+    """
+    Persistent map of locally computed CIDs to the CIDs already pinned
+
+    The service CID is stored separately in case it ever disagrees with the
+    local computation (e.g. JSON serialized differently by the service).
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path: str = "pin_index.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pins (
+                local_cid TEXT PRIMARY KEY,
+                cid TEXT NOT NULL,
+                name TEXT,
+                size INTEGER NOT NULL,
+                pinned_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, local_cid: str):
+        """Pinned CID for locally computed local_cid, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT cid FROM pins WHERE local_cid = ?", (local_cid,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, local_cid: str, cid: str, name: str, size: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pins (local_cid, cid, name, size, pinned_at) VALUES (?, ?, ?, ?, ?)",
+                (local_cid, cid, name, size, time.time())
+            )
+
+    def remove(self, local_cid: str):
+        """Forget a pin, e.g. after it was unpinned from the service"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pins WHERE local_cid = ?", (local_cid,))
+
+    def __contains__(self, local_cid: str) -> bool:
+        return self.get(local_cid) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pins").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
@@ -4,21 +4,184 @@ Demonstrates uploading metadata, images, and certificates to IPFS
 """
 
 import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.ipfs_cid import PinIndex, cid_of_bytes, cid_of_file, cid_of_json
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class MultipartStream:
+    """
+    multipart/form-data body read lazily from a file object
+
+    Exposes read() and __len__ so requests sends a Content-Length header
+    and streams the file in blocks instead of loading it into memory.
+    """
+    
+    def __init__(self, fields: dict, file_name: str, file, file_size: int,
+                 content_type: str = "application/octet-stream"):
+        self.boundary = uuid.uuid4().hex
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode()
+            for key, value in fields.items()
+        )
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="file"; filename="{file_name}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+        self._parts = [BytesIO(head), file, BytesIO(f"\r\n--{self.boundary}--\r\n".encode())]
+        self._length = len(head) + file_size + len(self._parts[2].getvalue())
+        self._start = file.tell()
+        self._index = 0
+    
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def rewind(self):
+        """Restart the body for a retry"""
+        self._parts[0].seek(0)
+        self._parts[1].seek(self._start)
+        self._parts[2].seek(0)
+        self._index = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while self._index < len(self._parts) and size != 0:
+            chunk = self._parts[self._index].read(size)
+            if not chunk:
+                self._index += 1
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
 
 class PinataIPFS:
-    """Helper class to interact with Pinata IPFS service"""
+    """
+    Helper class to interact with Pinata IPFS service
+
+    Requests share one pooled session with timeouts. Responses with 429 or
+    5xx and dropped connections are retried with jittered exponential
+    backoff, honoring Retry-After; pinning the same content twice yields
+    the same CID, so retried uploads are safe.
+
+    Args:
+        api_key: Pinata API key
+        api_secret: Pinata API secret
+        base_url: Pinning API root
+        gateway_url: Gateway used by get_content
+        pool_size: Keep-alive connections kept open
+        timeout: (connect, read) timeout in seconds
+        max_retries: Retries per request after the first attempt
+        backoff: Base delay in seconds between retries
+        max_workers: Concurrent uploads in upload_many
+        cid_version: CID version requested from the pinning service (0 or 1)
+        pin_index: PinIndex of content already pinned; when set, the CID is
+            computed locally first and known content is not uploaded again
+    """
     
-    def __init__(self, api_key: str, api_secret: str):
+    def __init__(self, api_key: str, api_secret: str, base_url: str = "https://api.pinata.cloud",
+                 gateway_url: str = "https://gateway.pinata.cloud", pool_size: int = 10,
+                 timeout: tuple = (5, 120), max_retries: int = 5, backoff: float = 0.5, max_workers: int = 4,
+                 cid_version: int = 0, pin_index: PinIndex = None):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.base_url = "https://api.pinata.cloud"
+        self.base_url = base_url.rstrip("/")
+        self.gateway_url = gateway_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_workers = max_workers
+        self.cid_version = cid_version
+        self.pin_index = pin_index
         self.headers = {
             'pinata_api_key': api_key,
             'pinata_secret_api_key': api_secret
         }
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+        self._lock = threading.Lock()
+        self._stats = {"uploads": 0, "bytes": 0, "seconds": 0.0, "retries": 0, "skipped": 0}
+    
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        if response is not None and response.headers.get("Retry-After"):
+            value = response.headers["Retry-After"]
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+    
+    def _request(self, method: str, url: str, body=None, **kwargs) -> requests.Response:
+        """Send a request, retrying rate limits, server errors and dropped connections"""
+        for attempt in range(self.max_retries + 1):
+            if isinstance(body, MultipartStream):
+                body.rewind()
+                kwargs["data"] = body
+            response = None
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response
+            with self._lock:
+                self._stats["retries"] += 1
+            time.sleep(self._retry_delay(attempt, response))
+    
+    def _record_upload(self, size: int, elapsed: float):
+        with self._lock:
+            self._stats["uploads"] += 1
+            self._stats["bytes"] += size
+            self._stats["seconds"] += elapsed
+    
+    def _pin_once(self, local_cid, name: str, size: int, upload) -> str:
+        """Return the indexed CID for local_cid, or upload and index it"""
+        if self.pin_index is None:
+            return upload()
+        cid = self.pin_index.get(local_cid)
+        if cid is not None:
+            with self._lock:
+                self._stats["skipped"] += 1
+            return cid
+        cid = upload()
+        self.pin_index.add(local_cid, cid, name, size)
+        return cid
+    
+    def stats(self) -> dict:
+        """Upload counters; throughput is bytes per second of request time"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["throughput"] = stats["bytes"] / stats["seconds"] if stats["seconds"] else 0.0
+        return stats
     
     def upload_json(self, json_data: dict, name: str) -> str:
         """
@@ -37,11 +200,32 @@ class PinataIPFS:
             "pinataContent": json_data,
             "pinataMetadata": {
                 "name": name
+            },
+            "pinataOptions": {
+                "cidVersion": self.cid_version
             }
         }
         
-        response = requests.post(url, json=payload, headers=self.headers)
-        response.raise_for_status()
+        def upload():
+            started = time.monotonic()
+            response = self._request("POST", url, json=payload)
+            self._record_upload(len(response.request.body or b""), time.monotonic() - started)
+            return response.json()['IpfsHash']
+        
+        local_cid = cid_of_json(json_data, self.cid_version) if self.pin_index is not None else None
+        return self._pin_once(local_cid, name, 0, upload)
+    
+    def _upload_stream(self, file, size: int, name: str, filename: str, content_type: str) -> str:
+        url = f"{self.base_url}/pinning/pinFileToIPFS"
+        fields = {
+            'pinataMetadata': json.dumps({"name": name}),
+            'pinataOptions': json.dumps({"cidVersion": self.cid_version}),
+        }
+        body = MultipartStream(fields, filename, file, size, content_type)
+        
+        started = time.monotonic()
+        response = self._request("POST", url, body=body, headers={'Content-Type': body.content_type})
+        self._record_upload(len(body), time.monotonic() - started)
         
         result = response.json()
         return result['IpfsHash']
@@ -50,6 +234,8 @@ class PinataIPFS:
         """
         Upload file (image, PDF, etc.) to IPFS
         
+        The file is streamed from disk rather than read into memory.
+        
         Args:
             file_path: Path to file
             name: Name for the pinned content
@@ -57,27 +243,70 @@ class PinataIPFS:
         Returns:
             IPFS CID (hash)
         """
-        url = f"{self.base_url}/pinning/pinFileToIPFS"
+        def upload():
+            with open(file_path, 'rb') as file:
+                return self._upload_stream(file, os.fstat(file.fileno()).st_size, name,
+                                           os.path.basename(file_path), "application/octet-stream")
         
-        with open(file_path, 'rb') as file:
-            files = {
-                'file': file
-            }
-            
-            metadata = {
-                "name": name
-            }
+        local_cid = cid_of_file(file_path, self.cid_version) if self.pin_index is not None else None
+        return self._pin_once(local_cid, name, os.path.getsize(file_path), upload)
+    
+    def upload_bytes(self, data: bytes, name: str, filename: str = None,
+                     content_type: str = "application/octet-stream") -> str:
+        """
+        Upload in-memory content to IPFS without writing it to disk
+        
+        Args:
+            data: File content
+            name: Name for the pinned content
+            filename: File name sent in the multipart body (default: name)
+            content_type: MIME type of the content
             
-            response = requests.post(
-                url,
-                files=files,
-                headers=self.headers,
-                data={'pinataMetadata': json.dumps(metadata)}
-            )
-            response.raise_for_status()
+        Returns:
+            IPFS CID (hash)
+        """
+        def upload():
+            return self._upload_stream(BytesIO(data), len(data), name, filename or name, content_type)
+        
+        local_cid = cid_of_bytes(data, self.cid_version) if self.pin_index is not None else None
+        return self._pin_once(local_cid, name, len(data), upload)
+    
+    def upload_many(self, items: list, progress=None) -> list:
+        """
+        Upload many files concurrently over the shared connection pool
+        
+        Args:
+            items: List of (source, name) where source is a file path, bytes,
+                or a dict for pinJSONToIPFS
+            progress: Optional callable(done, total, stats) after each upload
             
-            result = response.json()
-            return result['IpfsHash']
+        Returns:
+            One dict per item, in input order, with name and either cid or
+            error
+        """
+        total = len(items)
+        done = 0
+        
+        def upload(item):
+            source, name = item
+            if isinstance(source, dict):
+                return self.upload_json(source, name)
+            if isinstance(source, (bytes, bytearray)):
+                return self.upload_bytes(bytes(source), name)
+            return self.upload_file(str(source), name)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(upload, item) for item in items]
+            results = []
+            for (_, name), future in zip(items, futures):
+                try:
+                    results.append({"name": name, "cid": future.result()})
+                except Exception as e:
+                    results.append({"name": name, "error": str(e)})
+                done += 1
+                if progress is not None:
+                    progress(done, total, self.stats())
+        return results
     
     def get_content(self, cid: str) -> requests.Response:
         """
@@ -89,10 +318,14 @@ class PinataIPFS:
         Returns:
             Response object with content
         """
-        url = f"https://gateway.pinata.cloud/ipfs/{cid}"
-        response = requests.get(url)
-        response.raise_for_status()
-        return response
+        url = f"{self.gateway_url}/ipfs/{cid}"
+        return self._request("GET", url)
+
+
+def print_progress(done: int, total: int, stats: dict):
+    """Progress callback for upload_many"""
+    print(f"   {done}/{total} uploaded  {stats['bytes'] / 1e6:.1f} MB  "
+          f"{stats['throughput'] / 1e6:.2f} MB/s  {stats['retries']} retries")
 
 
 def demo_create_reward_metadata():
@@ -220,7 +453,7 @@ def main():
     print("   # Issue certificate to customer")
     print("   manager.issueCertificate(")
     print("       customer='0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb',")
-    print("       certificate_cid='QmS4ustL54uo8FzR9455qaxZwuMiUhyvMcX9Ba8nUH4uVv'")
+    print("       certificate=cid_to_bytes32('QmS4ustL54uo8FzR9455qaxZwuMiUhyvMcX9Ba8nUH4uVv')")
     print("   )")
     
     print("\n" + "-" * 60)
@@ -257,11 +490,15 @@ def demo_pinata_integration():
     
     pinata = PinataIPFS(
         api_key=os.getenv('PINATA_API_KEY'),
-        api_secret=os.getenv('PINATA_API_SECRET')
+        api_secret=os.getenv('PINATA_API_SECRET'),
+        pin_index=PinIndex('pin_index.db')
     )
     
-    # Upload metadata
+    # The CID is known before uploading, so the contract call need not wait
     metadata = demo_create_reward_metadata()['reward_1']
+    print(f"Metadata CID: {cid_of_json(metadata)}")
+    
+    # Upload metadata (skipped if this content was pinned before)
     cid = pinata.upload_json(metadata, 'Reward_1_Metadata')
     print(f"Uploaded metadata: {cid}")
     
@@ -269,6 +506,11 @@ def demo_pinata_integration():
     image_cid = pinata.upload_file('rewards/reward_1.png', 'Reward_1_Image')
     print(f"Uploaded image: {image_cid}")
     
+    # Upload every reward image concurrently
+    images = [(path, path.stem) for path in sorted(Path('rewards').glob('*.png'))]
+    for result in pinata.upload_many(images, progress=print_progress):
+        print(f"{result['name']}: {result.get('cid') or result['error']}")
+    
     # Retrieve content
     content = pinata.get_content(cid)
     print(f"Retrieved metadata: {content.json()}")
@@ -0,0 +1,268 @@
+"""
+Content-addressed IPFS fetch layer: on-disk LRU cache by CID plus hedged
+requests across several public gateways
+Content is verified against its CID before it is cached or returned
+"""
+
+import mmap
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts.ipfs_cid import parse_cid, verify_file
+
+DEFAULT_GATEWAYS = (
+    "https://gateway.pinata.cloud",
+    "https://ipfs.io",
+    "https://cloudflare-ipfs.com",
+)
+
+
+class ContentNotFound(Exception):
+    """Raised when no gateway returned content matching the CID"""
+
+
+class ContentCache:
+    """
+    Size-bounded on-disk LRU of IPFS content keyed by CID
+
+    Entries are immutable files named by CID; hits are served as read-only
+    memory maps so repeated reads cost no copies. Recency is kept in
+    memory and persisted through file mtimes across restarts.
+
+    Args:
+        directory: Cache directory
+        max_bytes: Total size above which least recently used entries are removed
+    """
+
+    def __init__(self, directory: str = "ipfs_cache", max_bytes: int = 1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # cid -> size, least recent first
+        self._size = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+        existing = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".part"):
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+            existing.append((stat.st_mtime, name, stat.st_size))
+        for _, cid, size in sorted(existing):
+            self._entries[cid] = size
+            self._size += size
+
+    def path(self, cid: str) -> str:
+        parse_cid(cid)  # rejects anything that is not a CID, including path separators
+        return os.path.join(self.directory, cid)
+
+    def temp_path(self) -> str:
+        """Scratch file in the cache directory, so commit() is an atomic rename"""
+        return os.path.join(self.directory, f"{uuid.uuid4().hex}.part")
+
+    def get(self, cid: str):
+        """
+        Cached content as a read-only mmap (b"" for empty content), or None
+
+        The map stays valid after the entry is evicted.
+        """
+        path = self.path(cid)
+        with self._lock:
+            if cid not in self._entries:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(cid)
+            self._stats["hits"] += 1
+            size = self._entries[cid]
+        if size == 0:
+            return b""
+        try:
+            os.utime(path)
+            with open(path, "rb") as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            # Evicted by another thread since the lookup
+            return None
+
+    def __contains__(self, cid: str) -> bool:
+        with self._lock:
+            return cid in self._entries
+
+    def commit(self, cid: str, temp_path: str):
+        """Move a verified scratch file into the cache and evict down to max_bytes"""
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, self.path(cid))
+        with self._lock:
+            self._size += size - self._entries.pop(cid, 0)
+            self._entries[cid] = size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                old_cid, old_size = self._entries.popitem(last=False)
+                self._size -= old_size
+                self._stats["evictions"] += 1
+                try:
+                    os.remove(os.path.join(self.directory, old_cid))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._size, max_bytes=self.max_bytes)
+
+
+class GatewayFetcher:
+    """
+    Read IPFS content through a ContentCache, fetching misses from gateways
+
+    A miss goes to the first gateway; if it has not answered within
+    hedge_delay the next gateway is asked as well, and so on. The first
+    response whose content matches the CID wins. Concurrent reads of the
+    same CID share one fetch.
+
+    Args:
+        cache: ContentCache for verified content
+        gateways: Gateway base URLs, in order of preference
+        hedge_delay: Seconds to wait before asking the next gateway
+        timeout: (connect, read) timeout per gateway request
+        pool_size: Keep-alive connections per gateway
+        max_concurrent: CIDs fetched at once by fetch_many
+    """
+
+    def __init__(self, cache: ContentCache, gateways=DEFAULT_GATEWAYS, hedge_delay: float = 0.3,
+                 timeout: tuple = (3, 30), pool_size: int = 10, max_concurrent: int = 8):
+        self.cache = cache
+        self.gateways = [g.rstrip("/") for g in gateways]
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.gateways), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.max_concurrent = max_concurrent
+        # Runs gateway downloads only, so hedging never waits on its own pool
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent * len(self.gateways))
+        self._lock = threading.Lock()
+        self._inflight = {}  # cid -> Future of the shared fetch
+        self._wins = {gateway: 0 for gateway in self.gateways}
+
+    def fetch(self, cid: str):
+        """
+        Content for cid as bytes or a read-only mmap
+
+        Raises:
+            ContentNotFound: If no gateway returned matching content
+        """
+        content = self.cache.get(cid)
+        if content is not None:
+            return content
+
+        with self._lock:
+            shared = self._inflight.get(cid)
+            if shared is None:
+                shared = self._inflight[cid] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if owner:
+            try:
+                self._fetch_hedged(cid)
+                shared.set_result(None)
+            except Exception as e:
+                shared.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight.pop(cid, None)
+        shared.result()
+        content = self.cache.get(cid)
+        if content is None:
+            # Evicted between the commit and this read
+            return self.fetch(cid)
+        return content
+
+    def fetch_many(self, cids) -> dict:
+        """Fetch several CIDs concurrently; failures map to None"""
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as pool:
+            futures = {cid: pool.submit(self.fetch, cid) for cid in set(cids)}
+        results = {}
+        for cid, future in futures.items():
+            try:
+                results[cid] = future.result()
+            except ContentNotFound:
+                results[cid] = None
+        return results
+
+    def gateway_stats(self) -> dict:
+        """Number of fetches each gateway won"""
+        with self._lock:
+            return dict(self._wins)
+
+    def _download(self, gateway: str, cid: str, cancelled: threading.Event):
+        """
+        Stream one gateway response to a scratch file
+
+        Returns:
+            Path of the verified scratch file, or None
+        """
+        temp_path = self.cache.temp_path()
+        verified = False
+        try:
+            with self.session.get(f"{gateway}/ipfs/{cid}", timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    return None
+                with open(temp_path, "wb") as f:
+                    for chunk in response.iter_content(64 * 1024):
+                        if cancelled.is_set():
+                            return None
+                        f.write(chunk)
+            verified = not cancelled.is_set() and verify_file(cid, temp_path)
+            return temp_path if verified else None
+        except requests.RequestException:
+            return None
+        finally:
+            if not verified and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _fetch_hedged(self, cid: str):
+        cancelled = threading.Event()
+        pending = {}
+        gateways = iter(self.gateways)
+        try:
+            while True:
+                gateway = next(gateways, None)
+                if gateway is not None:
+                    pending[self._pool.submit(self._download, gateway, cid, cancelled)] = gateway
+                if not pending:
+                    raise ContentNotFound(f"No gateway returned content for {cid}")
+
+                done, _ = wait(pending, timeout=self.hedge_delay if gateway is not None else None,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    winner = pending.pop(future)
+                    temp_path = future.result()
+                    if temp_path is None:
+                        continue
+                    cancelled.set()
+                    self.cache.commit(cid, temp_path)
+                    with self._lock:
+                        self._wins[winner] += 1
+                    return
+        finally:
+            cancelled.set()
+            # A slower gateway may still finish verifying; drop its copy
+            for future in pending:
+                future.add_done_callback(_discard_download)
+
+
+def _discard_download(future):
+    temp_path = future.result()
+    if temp_path is not None and os.path.exists(temp_path):
+        os.remove(temp_path)
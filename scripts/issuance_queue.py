@@ -0,0 +1,239 @@
+"""
+Durable local queue for token issuance requests
+Orders are accepted into SQLite at once and submitted on-chain by a
+background thread, so HTTP workers never wait on the RPC provider
+"""
+
+import sqlite3
+import threading
+import time
+import uuid
+
+QUEUED = "queued"
+SUBMITTING = "submitting"
+SENT = "sent"
+MINED = "mined"
+FAILED = "failed"
+
+
+class IssuanceQueue:
+    """SQLite-backed job store shared by the API and the submitter"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                customer TEXT NOT NULL,
+                amount TEXT NOT NULL,
+                status TEXT NOT NULL,
+                tx_hash TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, customer: str, amount: int) -> str:
+        """
+        Persist a new issuance job
+
+        Args:
+            customer: Checksummed customer address
+            amount: Token amount in wei
+
+        Returns:
+            Job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, customer, amount, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, customer, str(amount), QUEUED, now, now)
+            )
+        return job_id
+
+    def claim(self, limit: int = 1) -> list:
+        """Atomically take the oldest queued jobs for submission"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT ?",
+                    (QUEUED, limit)
+                ).fetchall()
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                    [(SUBMITTING, now, row["id"]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [self._to_dict(row) for row in rows]
+
+    def mark_sent(self, job_id: str, tx_hash: str):
+        self._update(job_id, SENT, tx_hash=tx_hash)
+
+    def mark_mined(self, job_id: str):
+        self._update(job_id, MINED)
+
+    def mark_failed(self, job_id: str, error: str):
+        self._update(job_id, FAILED, error=error)
+
+    def sent_jobs(self, limit: int = 100) -> list:
+        """Jobs whose transaction was broadcast but not yet confirmed, least recently checked first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY updated_at LIMIT ?",
+                (SENT, limit)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def touch(self, job_ids):
+        """Move jobs to the back of sent_jobs() without changing their status"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("UPDATE jobs SET updated_at = ? WHERE id = ?", [(now, job_id) for job_id in job_ids])
+
+    def get(self, job_id: str):
+        """Return a job as a dict, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def fail_interrupted(self, older_than: float = 300.0) -> int:
+        """
+        Fail jobs left mid-submission by a crash
+
+        Such a job may or may not have been broadcast, so it is not retried
+        automatically: resubmitting could mint twice.
+
+        Args:
+            older_than: Only jobs claimed at least this many seconds ago are
+                touched, so submitters in other processes are left alone
+
+        Returns:
+            Number of jobs marked failed
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status = ? AND updated_at <= ?",
+                (FAILED, "Interrupted during submission", now, SUBMITTING, now - older_than)
+            )
+        return cursor.rowcount
+
+    def _update(self, job_id: str, status: str, tx_hash: str = None, error: str = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, tx_hash = COALESCE(?, tx_hash), error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (status, tx_hash, error, time.time(), job_id)
+            )
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["amount"] = int(job["amount"])
+        # Claimed-but-unsent jobs are still waiting from the caller's point of view
+        if job["status"] == SUBMITTING:
+            job["status"] = QUEUED
+        return job
+
+
+class QueueSubmitter(threading.Thread):
+    """
+    Background thread that drains an IssuanceQueue
+
+    Args:
+        queue: IssuanceQueue to drain
+        submit: Callable(job) -> tx hash hex string; raises on failure
+        check: Callable(tx_hash) -> None while pending, else True/False for
+            mined successfully / reverted
+        rate: Maximum submissions per second
+        poll_interval: Seconds to sleep when there is nothing to do
+        interrupted_after: Seconds a job may stay mid-submission before it
+            is failed as interrupted (see IssuanceQueue.fail_interrupted)
+    """
+
+    def __init__(self, queue: IssuanceQueue, submit, check, rate: float = 5.0, poll_interval: float = 1.0,
+                 interrupted_after: float = 300.0):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.submit = submit
+        self.check = check
+        self.rate = rate
+        self.poll_interval = poll_interval
+        self.interrupted_after = interrupted_after
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                # Checked every pass: jobs claimed shortly before a restart only
+                # become old enough to fail after this thread has started
+                self.queue.fail_interrupted(older_than=self.interrupted_after)
+                submitted = self.submit_pending()
+                self.confirm_sent()
+            except Exception as e:
+                # e.g. database locked; the queue must keep draining
+                print(f"⚠️  Issuance submitter pass failed: {e}")
+                submitted = 0
+            if not submitted:
+                self._stop_event.wait(self.poll_interval)
+
+    def submit_pending(self) -> int:
+        """Submit up to one second's worth of queued jobs at the configured rate"""
+        jobs = self.queue.claim(limit=max(1, int(self.rate)))
+        for job in jobs:
+            started = time.monotonic()
+            try:
+                tx_hash = self.submit(job)
+            except Exception as e:
+                self.queue.mark_failed(job["id"], str(e))
+            else:
+                self.queue.mark_sent(job["id"], tx_hash)
+            delay = 1.0 / self.rate - (time.monotonic() - started)
+            if delay > 0:
+                self._stop_event.wait(delay)
+        return len(jobs)
+
+    def confirm_sent(self, limit: int = 100):
+        """
+        Move sent jobs to mined/failed once their receipts are available
+
+        Jobs still without a receipt go to the back of the line, so a pile of
+        dropped transactions cannot keep newer jobs from being checked.
+        """
+        waiting = []
+        for job in self.queue.sent_jobs(limit):
+            try:
+                result = self.check(job["tx_hash"])
+            except Exception:
+                result = None
+            if result is True:
+                self.queue.mark_mined(job["id"])
+            elif result is False:
+                self.queue.mark_failed(job["id"], "Transaction reverted")
+            else:
+                waiting.append(job["id"])
+        self.queue.touch(waiting)
@@ -0,0 +1,276 @@
+"""
+Merkle campaigns for LoyaltyManager.claim
+Builds the tree over (campaign, index, customer, amount) leaves from a
+streamed allocation file in bounded memory and serves O(log n) proofs from
+an indexed store, so posting a campaign is one setCampaignRoot transaction
+
+Usage: python -m scripts.merkle_campaign --campaign 1 --input allocations.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import struct
+import threading
+from pathlib import Path
+
+from eth_utils import is_address, keccak, to_checksum_address
+
+MAX_PROOF_LENGTH = 32  # must match MAX_PROOF_LENGTH in LoyaltyManager.vy
+ADDRESS_FIELDS = ("address", "customer_address", "wallet")
+
+TREE_FILE = "tree.bin"
+CLAIMS_FILE = "claims.db"
+ROOT_FILE = "root.json"
+TREE_MAGIC = b"LMT1"
+TREE_HEADER = struct.Struct(">4sQ")  # magic, leaf count
+NODE_SIZE = 32
+NODES_PER_READ = 4096
+
+
+def leaf_hash(campaign_id: int, index: int, customer: str, amount: int) -> bytes:
+    """keccak256(abi_encode(campaign_id, index, customer, amount)), packed by hand for speed"""
+    return keccak(
+        campaign_id.to_bytes(32, "big") + index.to_bytes(32, "big")
+        + bytes(12) + bytes.fromhex(customer[2:]) + amount.to_bytes(32, "big")
+    )
+
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    """Parent of two nodes, sorted so proofs carry no left/right flags"""
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def level_sizes(leaf_count: int) -> list:
+    """Node count per level, leaves first; an odd last node is carried up as is"""
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def verify_proof(root: bytes, leaf: bytes, proof: list) -> bool:
+    node = leaf
+    for sibling in proof:
+        node = hash_pair(node, bytes(sibling))
+    return node == bytes(root)
+
+
+def read_allocations(path: str):
+    """
+    Stream (customer, amount) pairs from a CSV or JSONL file
+
+    Amounts are integers in wei. Rows with an invalid address or amount
+    raise ValueError with the line number.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f) if path.endswith(".csv") else (json.loads(line) for line in f if line.strip())
+        for line, row in enumerate(rows, start=1):
+            raw = next((row[field] for field in ADDRESS_FIELDS if row.get(field)), "")
+            try:
+                amount = int(row["amount"])
+            except (KeyError, TypeError, ValueError):
+                amount = -1
+            if not is_address(str(raw).strip()) or amount <= 0:
+                raise ValueError(f"{path}:{line}: invalid allocation {row}")
+            yield to_checksum_address(str(raw).strip()), amount
+
+
+def build_campaign(campaign_id: int, allocations, directory: str) -> dict:
+    """
+    Build a campaign's claim index and Merkle tree
+
+    Allocations are merged per customer in SQLite, leaves are written to
+    the tree file in claim index order and each level is built by
+    streaming the one below, so memory does not grow with the input.
+
+    Args:
+        campaign_id: Id passed to setCampaignRoot and claim
+        allocations: Iterable of (customer, amount in wei)
+        directory: Output directory for claims.db, tree.bin and root.json
+
+    Returns:
+        The root.json summary
+    """
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    for name in (CLAIMS_FILE, TREE_FILE):
+        if (out / name).exists():
+            os.remove(out / name)
+
+    conn = sqlite3.connect(str(out / CLAIMS_FILE), isolation_level=None)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute(
+        """
+        CREATE TABLE claims (
+            customer TEXT PRIMARY KEY,
+            amount TEXT NOT NULL,
+            claim_index INTEGER
+        )
+        """
+    )
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    conn.execute("BEGIN")
+    for customer, amount in allocations:
+        row = conn.execute("SELECT amount FROM claims WHERE customer = ?", (customer,)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO claims (customer, amount) VALUES (?, ?)", (customer, str(amount)))
+        else:
+            # Amounts exceed SQLite integers, so duplicates are summed here
+            conn.execute("UPDATE claims SET amount = ? WHERE customer = ?", (str(int(row[0]) + amount), customer))
+    # Claim indexes follow first appearance in the input
+    conn.execute("UPDATE claims SET claim_index = rowid - 1")
+    conn.execute("CREATE UNIQUE INDEX claims_index ON claims (claim_index)")
+    conn.execute("COMMIT")
+
+    leaf_count = conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+    if leaf_count == 0:
+        conn.close()
+        raise ValueError("Campaign has no allocations")
+    sizes = level_sizes(leaf_count)
+    if len(sizes) - 1 > MAX_PROOF_LENGTH:
+        conn.close()
+        raise ValueError(f"{leaf_count} claims need proofs longer than {MAX_PROOF_LENGTH}")
+
+    total = 0
+    with open(out / TREE_FILE, "w+b") as tree:
+        tree.write(TREE_HEADER.pack(TREE_MAGIC, leaf_count))
+        for customer, amount, index in conn.execute(
+            "SELECT customer, amount, claim_index FROM claims ORDER BY claim_index"
+        ):
+            total += int(amount)
+            tree.write(leaf_hash(campaign_id, index, customer, int(amount)))
+
+        offset = TREE_HEADER.size
+        for size in sizes[:-1]:
+            _build_level(tree, offset, size)
+            offset += size * NODE_SIZE
+        tree.seek(offset)
+        root = tree.read(NODE_SIZE)
+
+    summary = {
+        "campaign_id": campaign_id,
+        "merkle_root": "0x" + root.hex(),
+        "claims": leaf_count,
+        "total_amount": str(total),
+        "depth": len(sizes) - 1,
+    }
+    conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [(k, str(v)) for k, v in summary.items()])
+    conn.close()
+    (out / ROOT_FILE).write_text(json.dumps(summary, indent=2))
+    return summary
+
+
+def _build_level(tree, offset: int, size: int):
+    """Append the parents of the size nodes at offset to the end of the tree file"""
+    end = offset + size * NODE_SIZE
+    read_at = offset
+    while read_at < end:
+        tree.seek(read_at)
+        # An even number of nodes per read keeps pairs together
+        block = tree.read(min(NODES_PER_READ * NODE_SIZE, end - read_at))
+        read_at += len(block)
+        parents = []
+        for i in range(0, len(block), 2 * NODE_SIZE):
+            left = block[i:i + NODE_SIZE]
+            right = block[i + NODE_SIZE:i + 2 * NODE_SIZE]
+            parents.append(hash_pair(left, right) if right else left)
+        tree.seek(0, os.SEEK_END)
+        tree.write(b"".join(parents))
+
+
+class ProofStore:
+    """
+    Read-only claim lookup for a built campaign
+
+    A claim is found through the claims.db index and its proof is read
+    from tree.bin with one 32-byte read per level.
+
+    Args:
+        directory: Directory written by build_campaign
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            f"file:{self.directory / CLAIMS_FILE}?mode=ro", uri=True, check_same_thread=False
+        )
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        self.campaign_id = int(meta["campaign_id"])
+        self.merkle_root = meta["merkle_root"]
+        self._tree = open(self.directory / TREE_FILE, "rb")
+        magic, leaf_count = TREE_HEADER.unpack(self._tree.read(TREE_HEADER.size))
+        if magic != TREE_MAGIC:
+            raise ValueError(f"{self.directory / TREE_FILE} is not a campaign tree")
+        self.leaf_count = leaf_count
+        self._offsets = []
+        offset = TREE_HEADER.size
+        for size in level_sizes(leaf_count):
+            self._offsets.append((offset, size))
+            offset += size * NODE_SIZE
+
+    def close(self):
+        self._conn.close()
+        self._tree.close()
+
+    def proof_for_index(self, index: int) -> list:
+        """Sibling hashes from the leaf up to the root"""
+        if not 0 <= index < self.leaf_count:
+            raise IndexError(f"No claim {index}")
+        proof = []
+        for offset, size in self._offsets[:-1]:
+            sibling = index ^ 1
+            if sibling < size:
+                proof.append(self._read_node(offset, sibling))
+            index //= 2
+        return proof
+
+    def claim(self, customer: str) -> dict:
+        """
+        claim() arguments for a customer, or None if not in the campaign
+
+        Returns:
+            {"campaign_id", "index", "customer", "amount", "proof"} with
+            hex-encoded proof nodes
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT claim_index, amount FROM claims WHERE customer = ?", (to_checksum_address(customer),)
+            ).fetchone()
+        if row is None:
+            return None
+        index, amount = row
+        return {
+            "campaign_id": self.campaign_id,
+            "index": index,
+            "customer": to_checksum_address(customer),
+            "amount": int(amount),
+            "proof": ["0x" + node.hex() for node in self.proof_for_index(index)],
+        }
+
+    def _read_node(self, offset: int, index: int) -> bytes:
+        return os.pread(self._tree.fileno(), NODE_SIZE, offset + index * NODE_SIZE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a Merkle campaign for LoyaltyManager.claim")
+    parser.add_argument("--campaign", type=int, required=True, help="Campaign id")
+    parser.add_argument("--input", required=True, help="Allocations as .csv or .jsonl (address, amount in wei)")
+    parser.add_argument("--output-dir", help="Defaults to campaigns/<campaign id>")
+    args = parser.parse_args()
+
+    directory = args.output_dir or os.path.join(os.getenv("CAMPAIGN_DIR", "campaigns"), str(args.campaign))
+    summary = build_campaign(args.campaign, read_allocations(args.input), directory)
+    print(f"✅ Campaign {summary['campaign_id']}: {summary['claims']:,} claims, depth {summary['depth']}")
+    print(f"🌳 Merkle root: {summary['merkle_root']}")
+    print(f"📝 Proof store: {directory}")
+    print(f"Post it with setCampaignRoot({summary['campaign_id']}, {summary['merkle_root']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Batched reads through the Multicall aggregate contract
+Fetches balanceOf, isCustomerRegistered and getCertificateCount for many
+customers with one eth_call per chunk instead of three per customer
+"""
+
+from eth_abi import decode, encode
+from eth_utils import keccak, to_checksum_address
+
+MAX_CALLS = 1500  # must match MAX_CALLS in Multicall.vy
+
+
+def selector(signature: str) -> bytes:
+    return keccak(text=signature)[:4]
+
+
+AGGREGATE = selector("aggregate((address,bytes)[])")
+BALANCE_OF = selector("balanceOf(address)")
+IS_CUSTOMER_REGISTERED = selector("isCustomerRegistered(address)")
+GET_CERTIFICATE_COUNT = selector("getCertificateCount(address)")
+
+
+class MulticallReader:
+    """
+    Customer snapshot reader backed by Multicall.aggregate
+
+    Args:
+        w3: Web3 instance
+        multicall_address: Deployed Multicall contract
+        token_address: LoyaltyToken address
+        manager_address: LoyaltyManager address
+        max_calls: Calls per eth_call, kept under provider request limits
+    """
+
+    def __init__(self, w3, multicall_address: str, token_address: str, manager_address: str,
+                 max_calls: int = MAX_CALLS):
+        self.w3 = w3
+        self.multicall_address = to_checksum_address(multicall_address)
+        self.token_address = to_checksum_address(token_address)
+        self.manager_address = to_checksum_address(manager_address)
+        self.max_calls = min(max_calls, MAX_CALLS)
+
+    def aggregate(self, calls: list, block_identifier="latest"):
+        """
+        Run (target, calldata) pairs in one eth_call
+
+        Returns:
+            (block number, list of 32-byte results)
+        """
+        data = AGGREGATE + encode(["(address,bytes)[]"], [calls])
+        raw = self.w3.eth.call({"to": self.multicall_address, "data": data}, block_identifier)
+        block_number, results = decode(["uint256", "bytes32[]"], bytes(raw))
+        return block_number, list(results)
+
+    def customer_snapshot(self, addresses: list, block_identifier="latest") -> dict:
+        """
+        Balance, registration and certificate count per customer
+
+        Chunks are read at one pinned block so the snapshot is consistent.
+
+        Returns:
+            {address: {"balance": int, "registered": bool, "certificate_count": int}}
+        """
+        addresses = [to_checksum_address(a) for a in addresses]
+        if block_identifier == "latest":
+            block_identifier = self.w3.eth.block_number
+
+        per_chunk = max(1, self.max_calls // 3)
+        snapshot = {}
+        for start in range(0, len(addresses), per_chunk):
+            chunk = addresses[start:start + per_chunk]
+            calls = []
+            for address in chunk:
+                arg = encode(["address"], [address])
+                calls.append((self.token_address, BALANCE_OF + arg))
+                calls.append((self.manager_address, IS_CUSTOMER_REGISTERED + arg))
+                calls.append((self.manager_address, GET_CERTIFICATE_COUNT + arg))
+
+            _, results = self.aggregate(calls, block_identifier)
+            for i, address in enumerate(chunk):
+                balance, registered, certificates = results[3 * i:3 * i + 3]
+                snapshot[address] = {
+                    "balance": int.from_bytes(balance, "big"),
+                    "registered": int.from_bytes(registered, "big") != 0,
+                    "certificate_count": int.from_bytes(certificates, "big"),
+                }
+        return snapshot
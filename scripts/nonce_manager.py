@@ -0,0 +1,166 @@
+"""
+Local nonce allocator for the backend signing account
+Lets several threads, and several worker processes sharing a SQLite file,
+build and send transactions without racing on eth_getTransactionCount
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class NonceManager:
+    """
+    Thread-safe nonce sequence for one sending address
+
+    The counter and released nonces live in SQLite and every change is one
+    immediate transaction, so processes that open the same file (e.g. each
+    gunicorn worker) share one sequence per address. Without a path the
+    sequence is private to this instance.
+
+    Args:
+        w3: Web3 instance
+        address: Sending address
+        path: SQLite file shared by every process sending from the address
+    """
+
+    def __init__(self, w3, address: str, path: str = None):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._in_flight = set()  # allocated here but not yet confirmed or released
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS nonces (
+                address TEXT PRIMARY KEY,
+                next_nonce INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS released_nonces (
+                address TEXT NOT NULL,
+                nonce INTEGER NOT NULL,
+                PRIMARY KEY (address, nonce)
+            );
+            """
+        )
+        self.sync()
+
+    def sync(self) -> int:
+        """
+        Re-read the pending nonce from the chain
+
+        Released nonces that the chain has already consumed are dropped.
+        The counter only moves forward: a node that lags behind (or a
+        different node behind a pooled provider) reports a lower pending
+        count while our sent transactions are still in the mempool, and
+        handing those nonces out again would replace them. Use reset() to
+        move backwards after transactions were dropped.
+
+        Returns:
+            The next nonce that will be handed out
+        """
+        pending = self.w3.eth.get_transaction_count(self.address, 'pending')
+        with self._transaction():
+            self._conn.execute(
+                "INSERT INTO nonces (address, next_nonce) VALUES (?, ?) "
+                "ON CONFLICT (address) DO UPDATE SET next_nonce = MAX(next_nonce, excluded.next_nonce)",
+                (self.address, pending)
+            )
+            self._conn.execute("DELETE FROM released_nonces WHERE address = ? AND nonce < ?", (self.address, pending))
+            return self._peek()
+
+    def reset(self) -> int:
+        """
+        Restart the sequence at the chain's pending nonce, even if lower
+
+        Only for an operator who knows the transactions above it were
+        dropped; anything still in flight may be reissued.
+
+        Returns:
+            The next nonce that will be handed out
+        """
+        pending = self.w3.eth.get_transaction_count(self.address, 'pending')
+        with self._transaction():
+            self._conn.execute("INSERT OR REPLACE INTO nonces (address, next_nonce) VALUES (?, ?)",
+                               (self.address, pending))
+            self._conn.execute("DELETE FROM released_nonces WHERE address = ?", (self.address,))
+            return self._peek()
+
+    def peek(self) -> int:
+        """The nonce allocate() would hand out next"""
+        with self._lock:
+            return self._peek()
+
+    def allocate(self) -> int:
+        """Hand out the lowest free nonce, filling released gaps first"""
+        with self._transaction():
+            nonce = self._conn.execute(
+                "SELECT MIN(nonce) FROM released_nonces WHERE address = ?", (self.address,)
+            ).fetchone()[0]
+            if nonce is not None:
+                self._conn.execute("DELETE FROM released_nonces WHERE address = ? AND nonce = ?",
+                                   (self.address, nonce))
+            else:
+                nonce = self._conn.execute(
+                    "SELECT next_nonce FROM nonces WHERE address = ?", (self.address,)
+                ).fetchone()[0]
+                self._conn.execute("UPDATE nonces SET next_nonce = ? WHERE address = ?", (nonce + 1, self.address))
+            self._in_flight.add(nonce)
+            return nonce
+
+    def confirm(self, nonce: int):
+        """Mark a nonce as accepted by the node"""
+        with self._lock:
+            self._in_flight.discard(nonce)
+
+    def release(self, nonce: int):
+        """Return a nonce whose signed transaction was rejected"""
+        with self._transaction():
+            if nonce in self._in_flight:
+                self._in_flight.discard(nonce)
+                self._conn.execute("INSERT OR IGNORE INTO released_nonces (address, nonce) VALUES (?, ?)",
+                                   (self.address, nonce))
+
+    @contextmanager
+    def reserve(self):
+        """
+        Allocate a nonce for the duration of a send
+
+        The nonce is confirmed when the block exits normally. If the block
+        raises, the nonce is released and the counter is resynced with the
+        chain before the exception propagates.
+        """
+        nonce = self.allocate()
+        try:
+            yield nonce
+        except Exception:
+            self.release(nonce)
+            try:
+                self.sync()
+            except Exception:
+                pass
+            raise
+        self.confirm(nonce)
+
+    @contextmanager
+    def _transaction(self):
+        """Hold the thread lock and an immediate (write-locked) SQLite transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _peek(self) -> int:
+        released = self._conn.execute(
+            "SELECT MIN(nonce) FROM released_nonces WHERE address = ?", (self.address,)
+        ).fetchone()[0]
+        if released is not None:
+            return released
+        return self._conn.execute("SELECT next_nonce FROM nonces WHERE address = ?", (self.address,)).fetchone()[0]
@@ -0,0 +1,109 @@
+"""
+Benchmark gas used by every LoyaltyManager entry point on a local chain
+and write the profile file read by GasProfiles
+
+Usage: ape run profile_gas [--network ethereum:local:test]
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from ape import chain, project, accounts
+from eth_utils import keccak, to_checksum_address
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.gas_profiles import GasProfiles
+from scripts.ipfs_cid import cid_to_bytes32
+from scripts.merkle_campaign import ProofStore, build_campaign
+from scripts.redemption import permit_deadline, permit_typed_data, sign_permit
+
+PROFILE_FILE = Path(os.getenv("GAS_PROFILE_PATH", "deployments/gas_profiles.json"))
+BATCH_SIZES = (1, 10, 50, 100, 200)
+CART_SIZES = (1, 5, 10, 20)
+CAMPAIGN_SIZE = 4096  # claim gas grows with log2 of the campaign size
+SAMPLE_CID = "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG"
+
+
+def fresh_addresses(count: int, salt: str) -> list:
+    """Deterministic addresses that have never held tokens"""
+    return [to_checksum_address(keccak(text=f"{salt}-{i}")[-20:]) for i in range(count)]
+
+
+def main():
+    owner = accounts.test_accounts[0]
+    customer = accounts.test_accounts[1]
+    # The backend sends from operator keys, which pay for the operators lookup
+    operator = accounts.test_accounts[2]
+    profiles = GasProfiles()
+
+    def measure(function, shape, receipt):
+        profiles.record(function, shape, receipt.gas_used)
+        print(f"  {GasProfiles.key(function, shape):<32} {receipt.gas_used:>10,}")
+
+    token = owner.deploy(project.LoyaltyToken, "Loyalty Token", "LTT", 18)
+    manager = owner.deploy(project.LoyaltyManager, token.address)
+    token.set_owner(manager.address, sender=owner)
+    print("Measuring gas on", manager.address)
+
+    measure("setOperator", None, manager.setOperator(operator.address, True, sender=owner))
+    measure("registerCustomer", None, manager.registerCustomer(customer.address, sender=operator))
+    measure("issueTokens", "first", manager.issueTokens(customer.address, 10**21, sender=operator))
+    measure("issueTokens", "repeat", manager.issueTokens(customer.address, 10**21, sender=operator))
+    newcomer = fresh_addresses(1, "newcomer")[0]
+    measure("registerAndIssueTokens", None, manager.registerAndIssueTokens(newcomer, 10**21, sender=operator))
+
+    for size in BATCH_SIZES:
+        batch = fresh_addresses(size, f"batch{size}")
+        measure("registerCustomers", size, manager.registerCustomers(batch, sender=operator))
+        measure("issueTokensBatch", size, manager.issueTokensBatch(batch, [10**18] * size, sender=operator))
+
+    measure("setRewardCost", "create", manager.setRewardCost(2, 10**20, sender=owner))
+    measure("setRewardCost", "update", manager.setRewardCost(2, 2 * 10**20, sender=owner))
+    measure("setRewardMetadata", "first", manager.setRewardMetadata(2, SAMPLE_CID, sender=owner))
+    measure("setRewardMetadata", "repeat", manager.setRewardMetadata(2, SAMPLE_CID, sender=owner))
+    measure("setRewardImage", "first", manager.setRewardImage(2, SAMPLE_CID, sender=owner))
+    measure("setRewardImage", "repeat", manager.setRewardImage(2, SAMPLE_CID, sender=owner))
+    measure("removeReward", None, manager.removeReward(2, sender=owner))
+
+    certificate = cid_to_bytes32(SAMPLE_CID)
+    measure("issueCertificate", "first", manager.issueCertificate(customer.address, certificate, sender=operator))
+    measure("issueCertificate", "repeat", manager.issueCertificate(customer.address, certificate, sender=operator))
+
+    cost = manager.reward_costs(1)
+    token.approve(manager.address, 2 * cost, sender=customer)
+    measure("redeemReward", "first", manager.redeemReward(1, sender=customer))
+    measure("redeemReward", "repeat", manager.redeemReward(1, sender=customer))
+
+    deadline = permit_deadline()
+    typed_data = permit_typed_data(
+        token.name(), token.address, chain.chain_id, customer.address, manager.address,
+        cost, token.nonces(customer.address), deadline
+    )
+    v, r, s = sign_permit(customer.private_key, typed_data)
+    measure("redeemRewardWithPermit", None, manager.redeemRewardWithPermit(1, deadline, v, r, s, sender=customer))
+
+    reward_ids = list(range(100, 100 + max(CART_SIZES)))
+    for reward_id in reward_ids:
+        manager.setRewardCost(reward_id, 10**18, sender=owner)
+    manager.issueTokens(customer.address, sum(CART_SIZES) * 10**18, sender=operator)
+    token.approve(manager.address, sum(CART_SIZES) * 10**18, sender=customer)
+    for size in CART_SIZES:
+        receipt = manager.redeemRewards(reward_ids[:size], [1] * size, sender=customer)
+        measure("redeemRewards", size, receipt)
+
+    claimants = fresh_addresses(CAMPAIGN_SIZE, "campaign")
+    with tempfile.TemporaryDirectory() as directory:
+        summary = build_campaign(1, ((claimant, 10**18) for claimant in claimants), directory)
+        measure("setCampaignRoot", None, manager.setCampaignRoot(1, summary["merkle_root"], sender=owner))
+        store = ProofStore(directory)
+        # The first claim in a bitmap word writes a fresh slot
+        for shape, claimant in (("first", claimants[0]), ("same_word", claimants[1])):
+            args = store.claim(claimant)
+            receipt = manager.claim(1, args["index"], claimant, args["amount"], args["proof"], sender=customer)
+            measure("claim", shape, receipt)
+        store.close()
+
+    profiles.save(PROFILE_FILE)
+    print(f"📝 Saved to {PROFILE_FILE}")
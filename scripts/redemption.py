@@ -0,0 +1,127 @@
+"""
+Client helpers for reward redemption: EIP-2612 permit signatures for
+LoyaltyManager.redeemRewardWithPermit (no separate approve) and cart
+arguments for redeemRewards (several rewards, one token transfer)
+"""
+
+import time
+
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from eth_utils import to_checksum_address
+
+PERMIT_VERSION = "1"  # must match VERSION in LoyaltyToken.vy
+DEFAULT_PERMIT_TTL = 600  # seconds a signature stays valid
+MAX_CART_SIZE = 20  # must match MAX_CART_SIZE in LoyaltyManager.vy
+
+EIP712_DOMAIN_TYPE = [
+    {"name": "name", "type": "string"},
+    {"name": "version", "type": "string"},
+    {"name": "chainId", "type": "uint256"},
+    {"name": "verifyingContract", "type": "address"},
+]
+PERMIT_TYPE = [
+    {"name": "owner", "type": "address"},
+    {"name": "spender", "type": "address"},
+    {"name": "value", "type": "uint256"},
+    {"name": "nonce", "type": "uint256"},
+    {"name": "deadline", "type": "uint256"},
+]
+
+
+def permit_deadline(ttl: int = DEFAULT_PERMIT_TTL) -> int:
+    return int(time.time()) + ttl
+
+
+def permit_typed_data(token_name: str, token_address: str, chain_id: int, owner: str, spender: str,
+                      value: int, nonce: int, deadline: int) -> dict:
+    """
+    EIP-712 message for LoyaltyToken.permit, as passed to eth_signTypedData_v4
+
+    Args:
+        token_name: LoyaltyToken.name(), part of the signing domain
+        token_address: LoyaltyToken address
+        chain_id: Chain the permit is valid on
+        owner: Customer whose tokens are approved
+        spender: LoyaltyManager address
+        value: Allowance to grant (the reward cost)
+        nonce: LoyaltyToken.nonces(owner)
+        deadline: Unix time after which the permit is rejected
+    """
+    return {
+        "types": {"EIP712Domain": EIP712_DOMAIN_TYPE, "Permit": PERMIT_TYPE},
+        "primaryType": "Permit",
+        "domain": {
+            "name": token_name,
+            "version": PERMIT_VERSION,
+            "chainId": chain_id,
+            "verifyingContract": to_checksum_address(token_address),
+        },
+        "message": {
+            "owner": to_checksum_address(owner),
+            "spender": to_checksum_address(spender),
+            "value": value,
+            "nonce": nonce,
+            "deadline": deadline,
+        },
+    }
+
+
+def split_signature(signature: bytes) -> tuple:
+    """65-byte r || s || v signature as the (v, r, s) contract arguments"""
+    signature = bytes(signature)
+    if len(signature) != 65:
+        raise ValueError("Signature must be 65 bytes")
+    v = signature[64]
+    if v < 27:
+        v += 27
+    return v, signature[:32], signature[32:64]
+
+
+def sign_permit(private_key, typed_data: dict) -> tuple:
+    """
+    Sign permit typed data
+
+    Returns:
+        (v, r, s) for permit / redeemRewardWithPermit
+    """
+    signed = Account.sign_message(encode_typed_data(full_message=typed_data), private_key)
+    return signed.v, signed.r.to_bytes(32, "big"), signed.s.to_bytes(32, "big")
+
+
+def build_cart(items) -> tuple:
+    """
+    redeemRewards arguments for a cart
+
+    Args:
+        items: {reward_id: quantity} or (reward_id, quantity) pairs; repeated
+            rewards are merged into one line, keeping first-seen order
+
+    Returns:
+        (reward_ids, quantities)
+
+    Raises:
+        ValueError: For an empty cart, a quantity below 1 or more than
+            MAX_CART_SIZE distinct rewards
+    """
+    lines = {}
+    for reward_id, quantity in (items.items() if isinstance(items, dict) else items):
+        if quantity < 1:
+            raise ValueError(f"Invalid quantity {quantity} for reward {reward_id}")
+        lines[int(reward_id)] = lines.get(int(reward_id), 0) + int(quantity)
+    if not lines:
+        raise ValueError("Empty cart")
+    if len(lines) > MAX_CART_SIZE:
+        raise ValueError(f"Cart has {len(lines)} rewards, max {MAX_CART_SIZE} per transaction")
+    return list(lines), list(lines.values())
+
+
+def cart_total(reward_ids: list, quantities: list, reward_cost) -> int:
+    """
+    Tokens redeemRewards will pull, i.e. the allowance to approve or permit
+
+    Args:
+        reward_cost: Callable returning the cost of a reward id
+            (e.g. manager.getRewardCost)
+    """
+    return sum(reward_cost(reward_id) * quantity for reward_id, quantity in zip(reward_ids, quantities))
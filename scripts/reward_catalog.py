@@ -0,0 +1,150 @@
+"""
+Reward catalog materialized from indexed reward events
+Costs and IPFS CIDs come from the EventIndexer's reward_events table and
+the linked metadata JSON is prefetched, so the storefront is served one
+precomputed document with no RPC calls per request
+"""
+
+import hashlib
+import json
+import threading
+
+from scripts.event_indexer import EventIndexer
+from scripts.ipfs_cid import parse_cid
+from scripts.ipfs_fetch import GatewayFetcher
+
+
+class RewardCatalog:
+    """
+    In-memory reward catalog kept current from reward_events
+
+    Events are applied incrementally after the last one seen; an indexer
+    rollback (reorg) rebuilds the catalog from scratch. Metadata JSON is
+    fetched once per CID, and a failed fetch is retried on the next refresh.
+
+    Args:
+        indexer: EventIndexer whose database holds reward_events
+        fetcher: GatewayFetcher for metadata JSON, or None to list CIDs only
+        refresh_interval: Seconds between refreshes of the background thread
+    """
+
+    def __init__(self, indexer: EventIndexer, fetcher: GatewayFetcher = None, refresh_interval: float = 5.0):
+        self.indexer = indexer
+        self.fetcher = fetcher
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._rewards = {}  # reward_id -> {"cost", "metadata_cid", "image_cid"}
+        self._metadata = {}  # metadata CID -> parsed JSON
+        self._cursor = (-1, -1)  # (block_number, log_index) of the last applied event
+        self._rollbacks = indexer.rollbacks
+        self._document = None
+        self._etag = None
+        self._sync_indexer = True
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, sync_indexer: bool = True):
+        """Refresh in a background thread, optionally syncing the indexer first"""
+        self._sync_indexer = sync_indexer
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def refresh(self) -> bool:
+        """
+        Apply new reward events and fetch missing metadata
+
+        Returns:
+            True if the catalog document changed
+        """
+        changed = False
+        if self.indexer.rollbacks != self._rollbacks:
+            self._rollbacks = self.indexer.rollbacks
+            self._rewards = {}
+            self._cursor = (-1, -1)
+            changed = True
+
+        for event in self.indexer.reward_events_after(*self._cursor):
+            self._apply(event)
+            self._cursor = (event["block_number"], event["log_index"])
+            changed = True
+
+        missing = {
+            reward["metadata_cid"] for reward in self._rewards.values()
+            if reward["metadata_cid"] and reward["metadata_cid"] not in self._metadata
+        }
+        for cid in list(missing):
+            try:
+                parse_cid(cid)
+            except ValueError as e:
+                # Set on-chain as-is; one bad CID must not block the other fetches
+                print(f"⚠️  Reward metadata CID {cid!r} skipped: {e}")
+                self._metadata[cid] = None
+                missing.discard(cid)
+                changed = True
+        if missing and self.fetcher is not None:
+            for cid, content in self.fetcher.fetch_many(missing).items():
+                if content is None:
+                    continue
+                try:
+                    self._metadata[cid] = json.loads(bytes(content))
+                except ValueError:
+                    self._metadata[cid] = None  # pinned but not JSON; do not refetch
+                changed = True
+
+        if changed or self._document is None:
+            self._render()
+        return changed
+
+    def document(self) -> tuple:
+        """(JSON bytes, ETag) of the current catalog"""
+        with self._lock:
+            return self._document, self._etag
+
+    def _apply(self, event: dict):
+        reward_id = int(event["reward_id"])
+        reward = self._rewards.setdefault(reward_id, {"cost": 0, "metadata_cid": "", "image_cid": ""})
+        name = event["event"]
+        if name in ("RewardCreated", "RewardUpdated"):
+            reward["cost"] = int(event["cost"])
+        elif name == "RewardRemoved":
+            reward["cost"] = 0
+        elif name == "RewardMetadataSet":
+            reward["metadata_cid"] = event["cid"]
+        elif name == "RewardImageSet":
+            reward["image_cid"] = event["cid"]
+
+    def _render(self):
+        # Removed rewards keep their CIDs on-chain but are not listed
+        rewards = [
+            {
+                "reward_id": reward_id,
+                "cost": str(reward["cost"]),
+                "metadata_cid": reward["metadata_cid"],
+                "image_cid": reward["image_cid"],
+                "metadata": self._metadata.get(reward["metadata_cid"]),
+            }
+            for reward_id, reward in sorted(self._rewards.items())
+            if reward["cost"] > 0
+        ]
+        body = json.dumps(
+            {"last_event_block": self._cursor[0], "rewards": rewards},
+            separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        with self._lock:
+            self._document, self._etag = body, etag
+
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                if self._sync_indexer:
+                    self.indexer.sync()
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  Catalog refresh failed: {e}")
@@ -0,0 +1,186 @@
+"""
+Pooled, batching JSON-RPC provider with retries and latency-based failover
+Drop-in replacement for Web3.HTTPProvider in the Flask backend
+"""
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3.providers.base import JSONBaseProvider
+
+# Read-only methods that are safe to resend on timeouts and 429/5xx
+IDEMPOTENT_METHODS = {
+    "eth_blockNumber", "eth_call", "eth_chainId", "eth_estimateGas", "eth_feeHistory",
+    "eth_gasPrice", "eth_getBalance", "eth_getBlockByHash", "eth_getBlockByNumber",
+    "eth_getCode", "eth_getLogs", "eth_getStorageAt", "eth_getTransactionByHash",
+    "eth_getTransactionCount", "eth_getTransactionReceipt", "eth_maxPriorityFeePerGas",
+    "eth_syncing", "net_version", "web3_clientVersion",
+}
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RPCEndpointError(Exception):
+    """Raised when no configured RPC endpoint returned a usable response"""
+
+
+class _Endpoint:
+    """One RPC URL with its observed latency and health"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency = None  # EWMA of successful request time, seconds
+        self.unhealthy_until = 0.0
+
+    def record_success(self, elapsed: float, alpha: float = 0.3):
+        self.latency = elapsed if self.latency is None else alpha * elapsed + (1 - alpha) * self.latency
+        self.unhealthy_until = 0.0
+
+    def record_failure(self, cooldown: float):
+        self.unhealthy_until = time.monotonic() + cooldown
+
+
+class PooledBatchProvider(JSONBaseProvider):
+    """
+    JSON-RPC over a pooled requests.Session across several URLs
+
+    Requests go to the healthy endpoint with the lowest observed latency
+    (each URL is tried once first to measure it).
+    Failed endpoints are skipped for a cooldown. Idempotent reads are
+    retried with jittered exponential backoff; other methods (such as
+    eth_sendRawTransaction) only fail over when the connection could not
+    be opened, so a transaction is never sent twice on a timeout.
+
+    Args:
+        urls: RPC endpoint URLs, in order of preference before any latency
+            has been observed
+        pool_size: Keep-alive connections per endpoint
+        timeout: Per-request timeout in seconds
+        max_retries: Extra rounds over all endpoints for idempotent calls
+        backoff: Base delay in seconds between retry rounds
+        cooldown: Seconds an endpoint is skipped after a failure
+    """
+
+    def __init__(self, urls, pool_size: int = 20, timeout: float = 10.0, max_retries: int = 3,
+                 backoff: float = 0.2, cooldown: float = 30.0, **kwargs):
+        super().__init__(**kwargs)
+        if isinstance(urls, str):
+            urls = [u.strip() for u in urls.split(",") if u.strip()]
+        if not urls:
+            raise ValueError("At least one RPC URL is required")
+        self.endpoints = [_Endpoint(url) for url in urls]
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(urls), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def make_request(self, method, params):
+        raw = self._post(self.encode_rpc_request(method, params), retry=method in IDEMPOTENT_METHODS)
+        return self.decode_rpc_response(raw)
+
+    def make_batch_request(self, batch_requests):
+        """
+        Send several (method, params) calls as one JSON-RPC batch
+
+        Returns:
+            Responses in request order, or a single error response if the
+            node rejected the whole batch
+        """
+        retry = all(method in IDEMPOTENT_METHODS for method, _ in batch_requests)
+        data = b"[" + b",".join(self.encode_rpc_request(m, p) for m, p in batch_requests) + b"]"
+        raw = self._post(data, retry=retry)
+        response = self.decode_rpc_response(raw)
+        if not isinstance(response, list):
+            return response
+        return sorted(response, key=lambda r: r.get("id", 0))
+
+    def batch(self, calls: list) -> list:
+        """
+        Convenience wrapper around make_batch_request
+
+        Args:
+            calls: List of (method, params)
+
+        Returns:
+            The "result" of each call, in order
+
+        Raises:
+            RPCEndpointError: If the batch or any call returned an error
+        """
+        responses = self.make_batch_request(calls)
+        if not isinstance(responses, list):
+            raise RPCEndpointError(f"Batch rejected: {responses.get('error')}")
+        errors = [r["error"] for r in responses if "error" in r]
+        if errors:
+            raise RPCEndpointError(f"Batch call failed: {errors[0]}")
+        return [r["result"] for r in responses]
+
+    def endpoint_stats(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {"url": e.url, "latency": e.latency, "healthy": e.unhealthy_until <= now}
+                for e in self.endpoints
+            ]
+
+    def _ordered_endpoints(self) -> list:
+        """
+        Healthy endpoints fastest first, then cooling-down ones as a last resort
+
+        Endpoints without a latency sample yet sort first so each one gets
+        measured.
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.unhealthy_until <= now]
+            unhealthy = [e for e in self.endpoints if e.unhealthy_until > now]
+        healthy.sort(key=lambda e: 0.0 if e.latency is None else e.latency)
+        unhealthy.sort(key=lambda e: e.unhealthy_until)
+        return healthy + unhealthy
+
+    def _post(self, data: bytes, retry: bool) -> bytes:
+        last_error = None
+        rounds = self.max_retries + 1 if retry else 1
+        for attempt in range(rounds):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+            for endpoint in self._ordered_endpoints():
+                started = time.monotonic()
+                try:
+                    response = self.session.post(endpoint.url, data=data, timeout=self.timeout)
+                except requests.ConnectionError as e:
+                    # Nothing reached the node: safe to try the next endpoint
+                    last_error = e
+                    with self._lock:
+                        endpoint.record_failure(self.cooldown)
+                    continue
+                except requests.Timeout as e:
+                    last_error = e
+                    with self._lock:
+                        endpoint.record_failure(self.cooldown)
+                    if not retry:
+                        raise
+                    continue
+
+                if response.status_code in RETRY_STATUS_CODES:
+                    last_error = RPCEndpointError(f"{endpoint.url} returned HTTP {response.status_code}")
+                    with self._lock:
+                        endpoint.record_failure(self.cooldown)
+                    if not retry:
+                        raise last_error
+                    continue
+
+                response.raise_for_status()
+                with self._lock:
+                    endpoint.record_success(time.monotonic() - started)
+                return response.content
+        raise RPCEndpointError(f"All RPC endpoints failed: {last_error}")
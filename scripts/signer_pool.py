@@ -0,0 +1,174 @@
+"""
+Pool of operator hot wallets for backend transactions
+Each operator key has its own nonce stream, so a stuck transaction only
+holds up the orders sent from that key while the others keep going
+"""
+
+import threading
+import time
+
+from scripts.nonce_manager import NonceManager
+
+
+class NoSignerAvailable(Exception):
+    """Raised when every operator is cooling down after failed sends"""
+
+
+class Signer:
+    """
+    One operator key with its nonce stream and health state
+
+    backlog is the number of transactions sent but not yet mined, as of
+    the last refresh plus every send since.
+    """
+
+    def __init__(self, w3, private_key: str, nonce_store: str = None):
+        self.account = w3.eth.account.from_key(private_key)
+        self.address = self.account.address
+        self.nonce_manager = NonceManager(w3, self.address, nonce_store)
+        self.mined_nonce = w3.eth.get_transaction_count(self.address, 'latest')
+        self.last_progress = time.monotonic()
+        self.cooldown_until = 0.0
+        self.sent = 0
+        self.failures = 0
+
+    @property
+    def backlog(self) -> int:
+        return max(0, self.nonce_manager.peek() - self.mined_nonce)
+
+    def stuck(self, stuck_after: float) -> bool:
+        """Unmined transactions and no nonce mined for stuck_after seconds"""
+        return self.backlog > 0 and time.monotonic() - self.last_progress > stuck_after
+
+    def cooling_down(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+
+class SignerPool:
+    """
+    Spread transactions over several operator accounts
+
+    send() picks the healthy operator with the fewest unmined transactions.
+    An operator is unhealthy while cooling down after a failed send, or
+    while stuck: it has unmined transactions and its mined nonce has not
+    moved for stuck_after seconds. Stuck operators are only used when no
+    healthy one is left.
+
+    Args:
+        w3: Web3 instance
+        private_keys: Operator keys (see LoyaltyManager.setOperator)
+        chain_id: Chain id for every transaction
+        fees: callable() -> fee fields to merge into each transaction
+        stuck_after: Seconds without a mined nonce before an operator is skipped
+        cooldown: Seconds an operator is skipped after a failed send
+        refresh_interval: Seconds between mined nonce polls in the background thread
+        nonce_store: SQLite file for the nonce sequences, shared by every
+            worker process using the same keys (see NonceManager)
+    """
+
+    def __init__(self, w3, private_keys, chain_id: int, fees, stuck_after: float = 60.0,
+                 cooldown: float = 15.0, refresh_interval: float = 5.0, nonce_store: str = None):
+        if not private_keys:
+            raise ValueError("At least one operator key is required")
+        self.w3 = w3
+        self.chain_id = chain_id
+        self.fees = fees
+        self.stuck_after = stuck_after
+        self.cooldown = cooldown
+        self.refresh_interval = refresh_interval
+        self.signers = [Signer(w3, key, nonce_store) for key in private_keys]
+        self._lock = threading.Lock()
+        self._next = 0  # round-robin start, so ties are spread evenly
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def addresses(self) -> list:
+        return [signer.address for signer in self.signers]
+
+    def start(self):
+        """Keep mined nonces current in a daemon thread"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def refresh(self):
+        """Poll each operator's mined nonce"""
+        for signer in self.signers:
+            mined = self.w3.eth.get_transaction_count(signer.address, 'latest')
+            with self._lock:
+                if mined > signer.mined_nonce or signer.backlog == 0:
+                    signer.last_progress = time.monotonic()
+                signer.mined_nonce = max(signer.mined_nonce, mined)
+
+    def pick(self) -> Signer:
+        """
+        Operator for the next transaction
+
+        Raises:
+            NoSignerAvailable: If every operator is cooling down
+        """
+        with self._lock:
+            count = len(self.signers)
+            ordered = [self.signers[(self._next + i) % count] for i in range(count)]
+            self._next = (self._next + 1) % count
+            ready = [s for s in ordered if not s.cooling_down()]
+            if not ready:
+                raise NoSignerAvailable("Every operator is cooling down after failed sends")
+            healthy = [s for s in ready if not s.stuck(self.stuck_after)] or ready
+            return min(healthy, key=lambda s: s.backlog)
+
+    def send(self, contract_call, gas: int) -> bytes:
+        """
+        Build, sign and send a contract call from the next operator
+
+        Returns:
+            Transaction hash
+        """
+        signer = self.pick()
+        try:
+            with signer.nonce_manager.reserve() as nonce:
+                tx = contract_call.build_transaction({
+                    'from': signer.address,
+                    'nonce': nonce,
+                    'chainId': self.chain_id,
+                    'gas': gas,
+                    **self.fees()
+                })
+                signed_tx = signer.account.sign_transaction(tx)
+                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception:
+            with self._lock:
+                signer.failures += 1
+                signer.cooldown_until = time.monotonic() + self.cooldown
+            raise
+        with self._lock:
+            signer.sent += 1
+        return tx_hash
+
+    def stats(self) -> list:
+        """Per operator: address, backlog, sent, failures and health"""
+        with self._lock:
+            return [
+                {
+                    "address": signer.address,
+                    "backlog": signer.backlog,
+                    "sent": signer.sent,
+                    "failures": signer.failures,
+                    "stuck": signer.stuck(self.stuck_after),
+                    "cooling_down": signer.cooling_down(),
+                }
+                for signer in self.signers
+            ]
+
+    def _run(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep the last known nonces until the provider recovers
+                pass
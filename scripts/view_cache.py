@@ -0,0 +1,194 @@
+"""
+Read-through cache for LoyaltyManager / LoyaltyToken view calls
+Entries live in a bounded LRU with per-function TTLs and are evicted
+precisely when a contract event changes the underlying storage
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from eth_utils import to_checksum_address
+
+from scripts.event_indexer import decode_log
+
+
+def _reward_key(function):
+    return lambda args: [(function, (args["reward_id"],))]
+
+
+# event name -> callable(args) -> list of (function, args) cache keys to evict
+EVENT_EVICTIONS = {
+    "Transfer": lambda args: [("balanceOf", (args["from"],)), ("balanceOf", (args["to"],))],
+    "CustomerRegistered": lambda args: [("isCustomerRegistered", (args["customer"],))],
+    "RewardCreated": _reward_key("getRewardCost"),
+    "RewardUpdated": _reward_key("getRewardCost"),
+    "RewardRemoved": _reward_key("getRewardCost"),
+    "RewardMetadataSet": _reward_key("getRewardMetadata"),
+    "RewardImageSet": _reward_key("getRewardImage"),
+    "CertificateIssued": lambda args: [("getCertificateCount", (args["customer"],))],
+}
+
+
+class ViewCache:
+    """
+    Bounded LRU of view call results
+
+    Args:
+        maxsize: Maximum number of cached entries
+        ttls: {function name: seconds} overrides
+        default_ttl: TTL for functions not listed in ttls
+    """
+
+    def __init__(self, maxsize: int = 10000, ttls: dict = None, default_ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (function, args) -> (expires_at, value)
+        self._epoch = 0  # bumped on every invalidation
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, function: str, args: tuple, loader):
+        """
+        Return the cached result of function(*args), calling loader() on a miss
+
+        A result loaded while an invalidation happened is returned but not
+        cached, so an event racing the read cannot pin a stale value.
+        """
+        key = (function, tuple(args))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            epoch = self._epoch
+
+        value = loader()
+
+        with self._lock:
+            if epoch == self._epoch:
+                ttl = self.ttls.get(function, self.default_ttl)
+                self._entries[key] = (time.monotonic() + ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, function: str, args: tuple) -> bool:
+        """Drop one entry; returns True if it was cached"""
+        with self._lock:
+            self._epoch += 1
+            removed = self._entries.pop((function, tuple(args)), None) is not None
+            if removed:
+                self._stats["invalidations"] += 1
+            return removed
+
+    def apply_event(self, name: str, args: dict) -> int:
+        """
+        Evict the entries a decoded contract event makes stale
+
+        Returns:
+            Number of entries removed
+        """
+        evictions = EVENT_EVICTIONS.get(name)
+        if evictions is None:
+            return 0
+        return sum(self.invalidate(function, key_args) for function, key_args in evictions(args))
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), maxsize=self.maxsize)
+
+
+class CacheInvalidator:
+    """
+    Polls contract logs and applies them to a ViewCache
+
+    Args:
+        w3: Web3 instance
+        cache: ViewCache to invalidate
+        addresses: Contract addresses to follow
+        poll_interval: Seconds between eth_getLogs polls
+        max_block_span: Most blocks requested by one eth_getLogs call, within
+            provider range limits
+        max_gap: Blocks behind the head (e.g. after an RPC outage) beyond
+            which the whole cache is cleared instead of catching up
+    """
+
+    def __init__(self, w3, cache: ViewCache, addresses: list, poll_interval: float = 2.0,
+                 max_block_span: int = 1000, max_gap: int = 10000):
+        self.w3 = w3
+        self.cache = cache
+        self.addresses = [to_checksum_address(a) for a in addresses]
+        self.poll_interval = poll_interval
+        self.max_block_span = max_block_span
+        self.max_gap = max_gap
+        self.last_block = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.last_block = self.w3.eth.block_number
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def poll(self) -> int:
+        """
+        Apply logs from blocks mined since the last poll
+
+        Returns:
+            Number of cache entries evicted
+        """
+        head = self.w3.eth.block_number
+        if self.last_block is None:
+            self.last_block = head
+            return 0
+        if head <= self.last_block:
+            return 0
+        if head - self.last_block > self.max_gap:
+            # Too far behind to replay: start over from the head
+            evicted = self.cache.stats()["size"]
+            self.cache.clear()
+            self.last_block = head
+            return evicted
+
+        # Catch up one bounded span per poll
+        to_block = min(head, self.last_block + self.max_block_span)
+        logs = self.w3.eth.get_logs({
+            "fromBlock": self.last_block + 1,
+            "toBlock": to_block,
+            "address": self.addresses,
+        })
+        evicted = 0
+        for log in logs:
+            decoded = decode_log(log)
+            if decoded is not None:
+                evicted += self.cache.apply_event(*decoded)
+        self.last_block = to_block
+        return evicted
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception:
+                # Missed events are bounded by the per-function TTLs
+                pass
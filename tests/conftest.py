@@ -1,9 +1,20 @@
 import json
 import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 import pytest
 from ape import project, accounts, networks
 
+# Make the backend helpers in scripts/ importable from the tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.ipfs_cid import cid_of_bytes, json_bytes  # noqa: E402
+
 
 DEPLOY_FILE = Path("deployments/sepolia.json")
 
@@ -63,3 +74,110 @@ def manager(owner, token):
     return m
 
 
+@pytest.fixture(scope="session")
+def multicall(owner):
+    return owner.deploy(project.Multicall)
+
+
+class StubPinata:
+    """
+    Local Pinata-compatible pinning API and gateway
+
+    Pins are addressed by locally computed CIDs. Set fail_next to a list of
+    (status, headers) to answer the next requests with errors.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.pinned = {}  # cid -> (name, content)
+        self.fail_next = []
+        self.requests = []  # (method, path, time)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with stub.track("POST", self.path) as failure:
+                    if failure:
+                        return self._reply(*failure, {"error": "unavailable"})
+                    if self.path == "/pinning/pinJSONToIPFS":
+                        payload = json.loads(body)
+                        name = payload["pinataMetadata"]["name"]
+                        options = payload.get("pinataOptions", {})
+                        content = json_bytes(payload["pinataContent"])
+                    else:
+                        message = BytesParser().parsebytes(
+                            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+                        )
+                        parts = {p.get_param("name", header="content-disposition"): p for p in message.get_payload()}
+                        content = parts["file"].get_payload(decode=True)
+                        name = json.loads(parts["pinataMetadata"].get_payload(decode=True))["name"]
+                        options = json.loads(parts["pinataOptions"].get_payload(decode=True))
+                    cid = cid_of_bytes(content, options.get("cidVersion", 0))
+                    stub.pinned[cid] = (name, content)
+                    self._reply(200, {}, {"IpfsHash": cid, "PinSize": len(content)})
+
+            def do_GET(self):
+                with stub.track("GET", self.path) as failure:
+                    if failure:
+                        return self._reply(*failure, {"error": "unavailable"})
+                    cid = self.path.rsplit("/", 1)[-1]
+                    if cid not in stub.pinned:
+                        return self._reply(404, {}, {"error": "not found"})
+                    self._reply(200, {}, stub.pinned[cid][1])
+
+            def _reply(self, status, headers, body):
+                data = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @contextmanager
+    def track(self, method, path):
+        """Record a request and yield the failure to answer it with, if any"""
+        with self._lock:
+            self.requests.append((method, path, time.monotonic()))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            failure = self.fail_next.pop(0) if self.fail_next else None
+        try:
+            time.sleep(self.delay)
+            yield failure
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def make_pinata_stub():
+    """Factory for extra stubs (e.g. several gateways), all stopped at teardown"""
+    stubs = []
+
+    def make(delay=0.0):
+        stubs.append(StubPinata(delay=delay))
+        return stubs[-1]
+
+    yield make
+    for stub in stubs:
+        stub.server.shutdown()
+        stub.server.server_close()
+
+
+@pytest.fixture
+def pinata_stub(make_pinata_stub):
+    return make_pinata_stub()
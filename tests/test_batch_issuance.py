@@ -0,0 +1,49 @@
+from ape import networks
+from eth_utils import keccak, to_checksum_address
+
+from scripts.batch_issuance import issue_batch
+
+
+def _new_customers(count, salt):
+    return [to_checksum_address(keccak(text=f"{salt}-{i}")[-20:]) for i in range(count)]
+
+
+def test_mixed_batch_routes_unknown_customers(owner, accounts, token, manager):
+    w3 = networks.provider.web3
+    registered = [accounts[7].address, accounts[8].address, accounts[9].address]
+    for customer in registered:
+        if not manager.isCustomerRegistered(customer):
+            manager.registerCustomer(customer, sender=owner)
+    new, failing = _new_customers(2, "batch-mixed")
+    customers = [registered[0], new, registered[1], failing, registered[2]]
+    orders = [(f"order-{i}", customer, (i + 1) * 10**18) for i, customer in enumerate(customers)]
+    before = {customer: token.balanceOf(customer) for customer in customers}
+
+    def send_new(customer, amount):
+        if customer == failing:
+            raise ConnectionError("RPC down")
+        return manager.registerAndIssueTokens(customer, amount, sender=owner).txn_hash
+
+    mined = []
+    results = issue_batch(
+        orders, 2, manager.isCustomerRegistered,
+        lambda batch, amounts: manager.issueTokensBatch(batch, amounts, sender=owner).txn_hash,
+        send_new, w3.eth.get_transaction_receipt,
+        on_mined=lambda function, shape, batch, receipt: mined.append((function, shape, batch))
+    )
+
+    assert [r["order_id"] for r in results] == [order_id for order_id, _, _ in orders]
+    assert [r["status"] for r in results] == ["success", "success", "success", "error", "success"]
+    assert "RPC down" in results[3]["message"]
+    for (_, customer, amount), result in zip(orders, results):
+        if result["status"] == "success":
+            assert token.balanceOf(customer) == before[customer] + amount
+            log = next(log for log in w3.eth.get_transaction_receipt(result["tx_hash"])["logs"]
+                       if log["logIndex"] == result["log_index"])
+            assert to_checksum_address(log["topics"][2][-20:]) == customer
+    assert manager.isCustomerRegistered(new) and not manager.isCustomerRegistered(failing)
+    assert mined == [
+        ("issueTokensBatch", 2, registered[:2]),
+        ("issueTokensBatch", 1, registered[2:]),
+        ("registerAndIssueTokens", None, [new]),
+    ]
@@ -0,0 +1,95 @@
+import hashlib
+
+from scripts.certificate_pipeline import CertificatePipeline
+from scripts.generate_certificate import CertificateGenerator
+from scripts.ipfs_cid import bytes32_to_cid, cid_to_bytes32
+from scripts.ipfs_demo import PinataIPFS
+
+
+def _redemption(address, i):
+    return {
+        "customer_address": address,
+        "customer_name": f"Customer {i}",
+        "reward_name": "Voucher giảm giá 10%",
+        "reward_description": "Giảm 10% cho đơn hàng tiếp theo",
+        "token_cost": 100 + i,
+        "redemption_date": "2025-11-24 10:30:00",
+    }
+
+
+def test_pipeline_pins_in_memory_and_issues(owner, accounts, manager, pinata_stub, tmp_path, monkeypatch):
+    stub = pinata_stub
+    # Any PDF written to a relative path would land here
+    monkeypatch.chdir(tmp_path)
+    customers = [accounts[7], accounts[8]]
+    for customer in customers:
+        manager.registerCustomer(customer.address, sender=owner)
+
+    def issue(customer, cid):
+        return manager.issueCertificate(customer, cid_to_bytes32(cid), sender=owner).txn_hash
+
+    pipeline = CertificatePipeline(
+        CertificateGenerator(),
+        PinataIPFS("key", "secret", base_url=stub.url),
+        issue,
+        upload_workers=2,
+        max_pending=2
+    )
+    records = [_redemption(customers[i % 2].address, i) for i in range(5)]
+    results = []
+    counts = pipeline.run(records, on_result=results.append)
+
+    assert counts == {"completed": 5, "failed": 0}
+    assert [r["index"] for r in results] == list(range(5))
+    for result in results:
+        name, content = stub.pinned[result["cid"]]
+        assert content.startswith(b"%PDF-")
+        assert hashlib.sha256(content).hexdigest() == result["content_hash"]
+        assert name == f"certificate_{result['voucher_code']}.pdf"
+        assert result["file_path"] is None
+        assert result["tx_hash"]
+    assert list(tmp_path.iterdir()) == []
+
+    for offset, customer in enumerate(customers):
+        stored = [bytes32_to_cid(digest) for digest in manager.getCustomerCertificates(customer.address)]
+        assert stored == [r["cid"] for r in results[offset::2]]
+
+
+def test_pipeline_keeps_failures_in_order(pinata_stub, tmp_path):
+    stub = pinata_stub
+    pipeline = CertificatePipeline(
+        CertificateGenerator(),
+        PinataIPFS("key", "secret", base_url=stub.url),
+        output_dir=str(tmp_path / "pdfs")
+    )
+    records = [_redemption(f"0x{i:040x}", i) for i in range(3)]
+    del records[1]["reward_name"]
+    results = []
+    counts = pipeline.run(records, on_result=results.append)
+
+    assert counts == {"completed": 2, "failed": 1}
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert "error" in results[1] and "cid" not in results[1]
+    assert sorted(p.name for p in (tmp_path / "pdfs").iterdir()) == [
+        "certificate_00000000.pdf", "certificate_00000002.pdf"
+    ]
+
+
+def test_pipeline_survives_a_failing_result_callback(pinata_stub):
+    """A manifest write error neither kills the issuer nor hangs run()"""
+    pipeline = CertificatePipeline(
+        CertificateGenerator(),
+        PinataIPFS("key", "secret", base_url=pinata_stub.url),
+        max_pending=1
+    )
+    written = []
+
+    def on_result(result):
+        if result["index"] == 0:
+            raise OSError("No space left on device")
+        written.append(result["index"])
+
+    counts = pipeline.run([_redemption(f"0x{i:040x}", i) for i in range(4)], on_result=on_result)
+
+    assert counts == {"completed": 3, "failed": 1}
+    assert written == [1, 2, 3]
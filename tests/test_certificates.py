@@ -0,0 +1,95 @@
+import json
+
+from scripts.generate_certificate import generate_many, read_redemptions
+
+
+def _redemption(i):
+    return {
+        "customer_address": f"0x{i:040x}",
+        "customer_name": f"Customer {i}",
+        "reward_name": "Voucher giảm giá 10%",
+        "reward_description": "Giảm 10% cho đơn hàng tiếp theo",
+        "token_cost": 100 + i,
+        "redemption_date": "2025-11-24 10:30:00",
+    }
+
+
+def _stable_text(page):
+    """Page text without the random voucher code and hash"""
+    return [line for line in page.extract_text().splitlines() if "VOUCHER" not in line and "Hash" not in line]
+
+
+def test_generate_many_writes_ordered_manifest(tmp_path):
+    input_path = tmp_path / "redemptions.jsonl"
+    input_path.write_text("\n".join(json.dumps(_redemption(i)) for i in range(7)) + "\n")
+    manifest = tmp_path / "manifest.jsonl"
+
+    counts = generate_many(
+        read_redemptions(str(input_path)),
+        output_dir=str(tmp_path / "pdfs"),
+        manifest_path=str(manifest),
+        workers=2,
+        chunk_size=2,
+        max_pending=2
+    )
+
+    entries = [json.loads(line) for line in manifest.read_text().splitlines()]
+    assert counts == {"rendered": 7, "failed": 0}
+    assert [e["index"] for e in entries] == list(range(7))
+    assert [e["token_cost"] for e in entries] == [100 + i for i in range(7)]
+    for entry in entries:
+        with open(entry["file_path"], "rb") as f:
+            assert f.read(5) == b"%PDF-"
+
+
+def test_generate_many_records_bad_records_as_failed(tmp_path):
+    records = [_redemption(i) for i in range(4)]
+    del records[1]["reward_name"]
+    records[2]["token_cost"] = "12.5"
+    manifest = tmp_path / "manifest.jsonl"
+
+    counts = generate_many(records, output_dir=str(tmp_path / "pdfs"), manifest_path=str(manifest),
+                           workers=1, chunk_size=4)
+
+    entries = [json.loads(line) for line in manifest.read_text().splitlines()]
+    assert counts == {"rendered": 2, "failed": 2}
+    assert [e["index"] for e in entries] == list(range(4))
+    assert "reward_name" in entries[1]["error"]
+    assert "12.5" in entries[2]["error"]
+    assert entries[2]["customer_address"] == records[2]["customer_address"]
+    assert "error" not in entries[0] and "error" not in entries[3]
+
+
+def test_read_redemptions_from_csv(tmp_path):
+    path = tmp_path / "redemptions.csv"
+    rows = [_redemption(i) for i in range(3)]
+    header = list(rows[0])
+    path.write_text(
+        ",".join(header) + "\n" + "\n".join(",".join(str(r[h]) for h in header) for r in rows) + "\n",
+        encoding="utf-8"
+    )
+
+    records = list(read_redemptions(str(path)))
+    assert [r["customer_name"] for r in records] == ["Customer 0", "Customer 1", "Customer 2"]
+
+
+def test_vector_qr_embeds_no_image(tmp_path):
+    """The vector QR code draws the same modules without a raster XObject"""
+    from pypdf import PdfReader
+
+    from scripts.generate_certificate import CertificateGenerator
+
+    vector_path, png_path = tmp_path / "vector.pdf", tmp_path / "png.pdf"
+    CertificateGenerator(vector_qr=True).generate_certificate(output_path=str(vector_path), **_redemption(2))
+    CertificateGenerator(vector_qr=False).generate_certificate(output_path=str(png_path), **_redemption(2))
+
+    vector_page, png_page = PdfReader(str(vector_path)).pages[0], PdfReader(str(png_path)).pages[0]
+    assert "/XObject" not in vector_page["/Resources"]
+    assert "/XObject" in png_page["/Resources"]
+    assert _stable_text(vector_page) == _stable_text(png_page)
+    assert vector_path.stat().st_size < png_path.stat().st_size
+
+    generator = CertificateGenerator(qr_mask_pattern=3)
+    matrix = generator.qr_matrix("0xabc")
+    assert len(matrix) == len(matrix[0]) == 21 + 8  # version 1 plus the quiet zone
+    assert matrix == CertificateGenerator(qr_mask_pattern=3).qr_matrix("0xabc")
@@ -0,0 +1,78 @@
+import pytest
+from ape import chain, networks
+
+from scripts.event_indexer import EventIndexer
+from scripts.ipfs_cid import cid_to_bytes32
+
+
+@pytest.fixture
+def indexer(tmp_path, token, manager):
+    w3 = networks.provider.web3
+    return EventIndexer(w3, str(tmp_path / "index.db"), token.address, manager.address, chunk_size=2)
+
+
+def test_indexes_contract_events(owner, accounts, token, manager, indexer):
+    customer = accounts[7]
+    if not manager.isCustomerRegistered(customer.address):
+        manager.registerCustomer(customer.address, sender=owner)
+    manager.issueTokens(customer.address, 300 * 10**18, sender=owner)
+    manager.setRewardCost(20, 5 * 10**18, sender=owner)
+    manager.setRewardCost(20, 7 * 10**18, sender=owner)
+    manager.setRewardMetadata(20, "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG", sender=owner)
+    token.approve(manager.address, 7 * 10**18, sender=customer)
+    manager.redeemReward(20, sender=customer)
+    manager.issueCertificate(customer.address, cid_to_bytes32("QmS4ustL54uo8FzR9455qaxZwuMiUhyvMcX9Ba8nUH4uVv"), sender=owner)
+
+    assert indexer.sync() > 0
+    assert indexer.last_block == chain.blocks.head.number
+
+    assert indexer.is_registered(customer.address)
+    assert indexer.balance_of(customer.address) == token.balanceOf(customer.address)
+    assert indexer.certificates_of(customer.address)[-1] == "QmS4ustL54uo8FzR9455qaxZwuMiUhyvMcX9Ba8nUH4uVv"
+    assert indexer.redemptions_of(customer.address)[-1]["cost"] == 7 * 10**18
+    assert [e["event"] for e in indexer.reward_history(20)][-3:] == [
+        "RewardCreated", "RewardUpdated", "RewardMetadataSet"]
+
+    # Nothing new: a second sync is a no-op
+    assert indexer.sync() == 0
+
+
+def test_rolls_back_on_reorg(owner, accounts, token, manager, indexer):
+    customer = accounts[8]
+    if not manager.isCustomerRegistered(customer.address):
+        manager.registerCustomer(customer.address, sender=owner)
+    indexer.sync()
+    balance = indexer.balance_of(customer.address)
+
+    snapshot = chain.snapshot()
+    manager.issueTokens(customer.address, 10**18, sender=owner)
+    indexer.sync()
+    assert indexer.balance_of(customer.address) == balance + 10**18
+
+    # Replace the mint with a different history of the same height
+    chain.restore(snapshot)
+    manager.issueTokens(customer.address, 2 * 10**18, sender=owner)
+    indexer.sync()
+
+    assert indexer.balance_of(customer.address) == balance + 2 * 10**18
+    assert indexer.balance_of(customer.address) == token.balanceOf(customer.address)
+
+
+def test_rpc_error_during_reorg_check_does_not_roll_back(owner, manager, indexer, monkeypatch):
+    manager.setRewardCost(21, 10**18, sender=owner)
+    indexer.sync()
+    last_block = indexer.last_block
+
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("RPC down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(indexer.w3.eth, "get_block", unavailable)
+        with pytest.raises(ConnectionError):
+            indexer.sync()
+    assert indexer.rollbacks == 0
+    assert indexer.last_block == last_block
+
+    # Retried on the next sync once the provider is back
+    assert indexer.sync() == 0
+    assert indexer.rollbacks == 0
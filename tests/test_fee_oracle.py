@@ -0,0 +1,89 @@
+from ape import networks
+
+from scripts.fee_oracle import FeeOracle
+
+
+class _FakeEth:
+    def __init__(self):
+        self.block_number = 100
+        self.calls = 0
+
+    def fee_history(self, blocks, newest, percentiles):
+        self.calls += 1
+        return {
+            'baseFeePerGas': [10 * 10**9] * blocks + [12 * 10**9],
+            'reward': [[1 * 10**9], [2 * 10**9], [3 * 10**9], [0]],
+        }
+
+
+class _FakeWeb3:
+    def __init__(self):
+        self.eth = _FakeEth()
+
+
+def test_fees_from_fee_history():
+    """maxFee = next base fee * multiplier + percentile priority fee"""
+    w3 = _FakeWeb3()
+    oracle = FeeOracle(w3, history_blocks=4, base_fee_multiplier=2)
+
+    fees = oracle.fees()
+
+    assert fees['maxPriorityFeePerGas'] == 2 * 10**9
+    assert fees['maxFeePerGas'] == 2 * 12 * 10**9 + 2 * 10**9
+
+
+def test_fees_are_cached_per_block():
+    w3 = _FakeWeb3()
+    oracle = FeeOracle(w3)
+    oracle.fees()
+
+    assert oracle.refresh() is False
+    oracle.fees()
+    assert w3.eth.calls == 1
+
+    w3.eth.block_number += 1
+    assert oracle.refresh() is True
+    assert w3.eth.calls == 2
+
+
+class _FakeBatchProvider:
+    def __init__(self):
+        self.batches = []
+
+    def batch(self, calls):
+        self.batches.append([method for method, _ in calls])
+        return ["0x64", {'baseFeePerGas': [hex(10 * 10**9)] * 4 + [hex(12 * 10**9)], 'reward': [[hex(2 * 10**9)]]}]
+
+
+def test_batching_provider_reads_head_and_history_in_one_request():
+    w3 = _FakeWeb3()
+    w3.provider = _FakeBatchProvider()
+    oracle = FeeOracle(w3, history_blocks=4, base_fee_multiplier=2)
+
+    assert oracle.fees() == {'maxFeePerGas': 2 * 12 * 10**9 + 2 * 10**9, 'maxPriorityFeePerGas': 2 * 10**9}
+    assert oracle.refresh() is False
+    assert w3.provider.batches == [["eth_blockNumber", "eth_feeHistory"]] * 2
+    assert w3.eth.calls == 0
+
+
+def test_fees_on_local_chain(owner, user):
+    """Falls back to the latest base fee when eth_feeHistory is empty"""
+    w3 = networks.provider.web3
+    oracle = FeeOracle(w3)
+    fees = oracle.fees()
+
+    base_fee = w3.eth.get_block('latest')['baseFeePerGas']
+    assert fees['maxFeePerGas'] >= base_fee + fees['maxPriorityFeePerGas']
+
+    # The cached fees are accepted by the node
+    tx = {
+        'to': user.address,
+        'value': 1,
+        'gas': 21000,
+        'nonce': w3.eth.get_transaction_count(owner.address, 'pending'),
+        'chainId': w3.eth.chain_id,
+        **fees,
+    }
+    signed_tx = w3.eth.account.sign_transaction(tx, private_key=owner.private_key)
+    receipt = w3.eth.wait_for_transaction_receipt(w3.eth.send_raw_transaction(signed_tx.raw_transaction))
+    assert receipt['status'] == 1
@@ -0,0 +1,265 @@
+"""
+Gas benchmarks for every LoyaltyToken and LoyaltyManager entry point
+Each case is compared with tests/gas_baseline.json and fails when it uses
+more than GAS_TOLERANCE (default 1%) above the baseline
+
+Refresh the baseline after an intended change:
+    UPDATE_GAS_BASELINE=1 ape test tests/test_gas_benchmarks.py
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from ape import compilers, project
+from ape import chain
+from eth_utils import keccak, to_checksum_address
+
+from scripts.ipfs_cid import cid_to_bytes32
+from scripts.merkle_campaign import ProofStore, build_campaign
+from scripts.redemption import cart_total, permit_deadline, permit_typed_data, sign_permit
+
+BASELINE_FILE = Path(__file__).with_name("gas_baseline.json")
+TOLERANCE = float(os.getenv("GAS_TOLERANCE", "0.01"))
+UPDATE = os.getenv("UPDATE_GAS_BASELINE", "0") == "1"
+
+SAMPLE_CID = "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG"
+CERTIFICATE_COUNTS = (1, 10, 50)
+CART_SIZES = (1, 5, 20)
+CAMPAIGN_SIZE = 2**15  # depth 15 proofs
+TOKENS = 10**18
+
+# issueCertificate as it was when CIDs were appended to a String[100] DynArray
+STRING_CID_MANAGER = """
+# @version 0.3.10
+
+owner: public(address)
+registered_customers: public(HashMap[address, bool])
+customer_certificates: public(HashMap[address, DynArray[String[100], 50]])
+
+event CertificateIssued:
+    customer: indexed(address)
+    certificate_cid: String[100]
+
+@external
+def __init__():
+    self.owner = msg.sender
+
+@external
+def registerCustomer(_customer: address):
+    assert msg.sender == self.owner, "Only owner"
+    self.registered_customers[_customer] = True
+
+@external
+def issueCertificate(_customer: address, _certificate_cid: String[100]):
+    assert msg.sender == self.owner, "Only owner"
+    assert self.registered_customers[_customer], "Customer not registered"
+    self.customer_certificates[_customer].append(_certificate_cid)
+    log CertificateIssued(_customer, _certificate_cid)
+"""
+
+
+def fresh_address(salt: str) -> str:
+    """Deterministic address that has never been touched"""
+    return to_checksum_address(keccak(text=salt)[-20:])
+
+
+@pytest.fixture(scope="module")
+def gas_report():
+    """Measurements of this run, written back to the baseline in update mode"""
+    report = {}
+    yield report
+    if UPDATE and report:
+        baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+        baseline.update(report)
+        BASELINE_FILE.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
+    for key, gas in sorted(report.items()):
+        print(f"  {key:<36} {gas:>10,}")
+
+
+@pytest.fixture
+def check_gas(gas_report):
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+
+    def check(key: str, receipt) -> int:
+        gas = receipt.gas_used
+        gas_report[key] = gas
+        if UPDATE:
+            return gas
+        assert key in baseline, f"No baseline for {key}; run with UPDATE_GAS_BASELINE=1"
+        limit = baseline[key] * (1 + TOLERANCE)
+        assert gas <= limit, f"{key} used {gas:,} gas, baseline {baseline[key]:,} (+{TOLERANCE:.0%} allowed)"
+        return gas
+
+    return check
+
+
+@pytest.fixture
+def own_token(owner):
+    """Token still owned by the test account, so mint can be called directly"""
+    return owner.deploy(project.LoyaltyToken, "Loyalty Token", "LTT", 18)
+
+
+def test_token_mint(owner, own_token, check_gas):
+    own_token.mint(fresh_address("supply"), TOKENS, sender=owner)  # totalSupply is non-zero from here on
+    recipient = fresh_address("mint")
+    check_gas("mint:cold", own_token.mint(recipient, TOKENS, sender=owner))
+    check_gas("mint:warm", own_token.mint(recipient, TOKENS, sender=owner))
+
+
+def test_token_transfer(owner, own_token, check_gas):
+    own_token.mint(owner.address, 10 * TOKENS, sender=owner)
+    recipient = fresh_address("transfer")
+    check_gas("transfer:cold", own_token.transfer(recipient, TOKENS, sender=owner))
+    check_gas("transfer:warm", own_token.transfer(recipient, TOKENS, sender=owner))
+    check_gas("transfer:drain", own_token.transfer(recipient, 8 * TOKENS, sender=owner))
+
+
+def test_token_approve(owner, user, own_token, check_gas):
+    check_gas("approve:cold", own_token.approve(user.address, TOKENS, sender=owner))
+    check_gas("approve:warm", own_token.approve(user.address, 2 * TOKENS, sender=owner))
+    check_gas("approve:clear", own_token.approve(user.address, 0, sender=owner))
+
+
+def test_token_transfer_from(owner, user, own_token, check_gas):
+    own_token.mint(owner.address, 10 * TOKENS, sender=owner)
+    own_token.approve(user.address, 3 * TOKENS, sender=owner)
+    recipient = fresh_address("transferFrom")
+    check_gas("transferFrom:cold", own_token.transferFrom(owner.address, recipient, TOKENS, sender=user))
+    check_gas("transferFrom:warm", own_token.transferFrom(owner.address, recipient, TOKENS, sender=user))
+    check_gas("transferFrom:last_allowance", own_token.transferFrom(owner.address, recipient, TOKENS, sender=user))
+
+
+def test_manager_register_and_issue(owner, accounts, manager, check_gas):
+    customer = accounts[7]
+    check_gas("registerCustomer", manager.registerCustomer(customer.address, sender=owner))
+    check_gas("issueTokens:first", manager.issueTokens(customer.address, 100 * TOKENS, sender=owner))
+    check_gas("issueTokens:repeat", manager.issueTokens(customer.address, 100 * TOKENS, sender=owner))
+
+    # First purchase in one tx instead of registerCustomer + issueTokens:first
+    check_gas("registerAndIssueTokens:new", manager.registerAndIssueTokens(
+        fresh_address("first-purchase"), 100 * TOKENS, sender=owner))
+    check_gas("registerAndIssueTokens:registered", manager.registerAndIssueTokens(
+        customer.address, 100 * TOKENS, sender=owner))
+
+
+def test_manager_register_customers(owner, manager, check_gas):
+    batch = [fresh_address(f"register-{i}") for i in range(10)]
+    check_gas("registerCustomers:10", manager.registerCustomers(batch, sender=owner))
+    # A resent chunk only pays for the registration checks
+    check_gas("registerCustomers:10_registered", manager.registerCustomers(batch, sender=owner))
+
+
+def test_manager_redeem(owner, accounts, token, manager, check_gas):
+    customer = accounts[7]
+    manager.registerCustomer(customer.address, sender=owner)
+    cost = manager.getRewardCost(1)
+    manager.issueTokens(customer.address, 3 * cost, sender=owner)
+    token.approve(manager.address, 3 * cost, sender=customer)
+    check_gas("redeemReward:first", manager.redeemReward(1, sender=customer))
+    check_gas("redeemReward:repeat", manager.redeemReward(1, sender=customer))
+    check_gas("redeemReward:last_tokens", manager.redeemReward(1, sender=customer))
+
+
+def test_manager_redeem_with_permit(owner, accounts, token, manager, check_gas):
+    customer = accounts[7]
+    manager.registerCustomer(customer.address, sender=owner)
+    cost = manager.getRewardCost(1)
+    manager.issueTokens(customer.address, 2 * cost, sender=owner)
+
+    def redeem(key):
+        deadline = permit_deadline()
+        typed_data = permit_typed_data(
+            token.name(), token.address, chain.chain_id, customer.address, manager.address,
+            cost, token.nonces(customer.address), deadline
+        )
+        v, r, s = sign_permit(customer.private_key, typed_data)
+        check_gas(key, manager.redeemRewardWithPermit(1, deadline, v, r, s, sender=customer))
+
+    redeem("redeemRewardWithPermit:first")
+    redeem("redeemRewardWithPermit:last_tokens")
+
+
+def test_manager_redeem_cart(owner, accounts, token, manager, check_gas):
+    """Gas per reward falls as the cart grows, below one redeemReward each"""
+    customer = accounts[7]
+    manager.registerCustomer(customer.address, sender=owner)
+    reward_ids = list(range(100, 100 + max(CART_SIZES)))
+    for reward_id in reward_ids:
+        manager.setRewardCost(reward_id, TOKENS, sender=owner)
+    # Keep a balance behind so every cart pays for a warm, non-zero transfer
+    manager.issueTokens(customer.address, 2 * sum(CART_SIZES) * TOKENS, sender=owner)
+    token.approve(manager.address, 2 * sum(CART_SIZES) * TOKENS, sender=customer)
+
+    single = manager.redeemReward(reward_ids[0], sender=customer).gas_used
+    per_item = []
+    for size in CART_SIZES:
+        cart, quantities = reward_ids[:size], [1] * size
+        assert cart_total(cart, quantities, manager.getRewardCost) == size * TOKENS
+        gas = check_gas(f"redeemRewards:{size}", manager.redeemRewards(cart, quantities, sender=customer))
+        per_item.append(gas / size)
+
+    assert per_item == sorted(per_item, reverse=True) and len(set(per_item)) == len(per_item)
+    assert per_item[-1] < single / 2
+
+
+def test_manager_campaign_claim(owner, manager, check_gas, tmp_path):
+    """Posting costs the same for any campaign size; a claim grows with log2(size)"""
+    customers = [fresh_address(f"claim-{i}") for i in range(CAMPAIGN_SIZE)]
+    summary = build_campaign(9, ((c, TOKENS) for c in customers), str(tmp_path))
+    store = ProofStore(str(tmp_path))
+    check_gas("setCampaignRoot", manager.setCampaignRoot(9, summary["merkle_root"], sender=owner))
+
+    def claim(key, customer):
+        args = store.claim(customer)
+        receipt = manager.claim(9, args["index"], customer, args["amount"], args["proof"], sender=owner)
+        check_gas(key, receipt)
+
+    claim("claim:first", customers[0])
+    claim("claim:same_word", customers[1])  # bitmap word already written
+    store.close()
+
+
+def test_manager_reward_admin(owner, manager, check_gas):
+    check_gas("setRewardCost:create", manager.setRewardCost(50, 5 * TOKENS, sender=owner))
+    check_gas("setRewardCost:update", manager.setRewardCost(50, 6 * TOKENS, sender=owner))
+    check_gas("setRewardMetadata:first", manager.setRewardMetadata(50, SAMPLE_CID, sender=owner))
+    check_gas("setRewardMetadata:repeat", manager.setRewardMetadata(50, SAMPLE_CID, sender=owner))
+    check_gas("setRewardImage:first", manager.setRewardImage(50, SAMPLE_CID, sender=owner))
+    check_gas("removeReward", manager.removeReward(50, sender=owner))
+
+
+def test_manager_issue_certificate_scaling(owner, accounts, manager, check_gas):
+    """issueCertificate must not get more expensive as a customer's list grows"""
+    customer = accounts[8]
+    manager.registerCustomer(customer.address, sender=owner)
+    certificate = cid_to_bytes32(SAMPLE_CID)
+
+    check_gas("issueCertificate:first", manager.issueCertificate(customer.address, certificate, sender=owner))
+    issued = 1
+    measured = []
+    for count in CERTIFICATE_COUNTS:
+        while issued < count:
+            manager.issueCertificate(customer.address, certificate, sender=owner)
+            issued += 1
+        receipt = manager.issueCertificate(customer.address, certificate, sender=owner)
+        measured.append(check_gas(f"issueCertificate:after_{count}", receipt))
+        issued += 1
+    assert len(set(measured)) == 1
+
+
+def test_issue_certificate_cheaper_than_string_storage(owner, manager):
+    """bytes32 digests must cost less than the String[100] layout they replaced"""
+    string_manager = compilers.compile_source(
+        "vyper", STRING_CID_MANAGER, contractName="StringCidManager"
+    ).deploy(sender=owner)
+    # A customer with no certificates in either layout
+    customer = fresh_address("string-cid-comparison")
+    string_manager.registerCustomer(customer, sender=owner)
+    manager.registerCustomer(customer, sender=owner)
+
+    for label in ("first", "repeat"):
+        old = string_manager.issueCertificate(customer, SAMPLE_CID, sender=owner).gas_used
+        new = manager.issueCertificate(customer, cid_to_bytes32(SAMPLE_CID), sender=owner).gas_used
+        assert new < old, f"issueCertificate:{label} costs {new} with bytes32, {old} with String[100]"
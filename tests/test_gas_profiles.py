@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from scripts.gas_profiles import GasProfiles
+
+
+def test_gas_limit_applies_margin_and_skips_estimate():
+    profiles = GasProfiles(margin=1.5)
+    profiles.record("issueTokens", "repeat", 40000)
+
+    def estimate():
+        raise AssertionError("estimate_gas should not be called")
+
+    assert profiles.gas_limit("issueTokens", "repeat", estimate=estimate) == 60000
+
+
+def test_missing_profile_falls_back_to_estimate_once():
+    profiles = GasProfiles(margin=1.0)
+    calls = []
+
+    def estimate():
+        calls.append(1)
+        return 50000
+
+    assert profiles.gas_limit("issueTokens", "first", estimate=estimate) == 50000
+    assert profiles.gas_limit("issueTokens", "first", estimate=estimate) == 50000
+    assert len(calls) == 1
+    with pytest.raises(KeyError):
+        profiles.gas_limit("registerCustomer")
+
+
+def test_record_keeps_maximum():
+    profiles = GasProfiles()
+    assert profiles.record("issueTokens", "first", 80000) is True
+    assert profiles.record("issueTokens", "first", 70000) is False
+    assert profiles.lookup("issueTokens", "first") == 80000
+
+
+def test_batch_sizes_are_extrapolated_and_bounded():
+    profiles = GasProfiles(margin=1.0)
+    profiles.record("issueTokensBatch", 1, 60000)
+    profiles.record("issueTokensBatch", 11, 340000)
+
+    # 28k per item between the two measurements
+    assert profiles.lookup("issueTokensBatch", 21) == 620000
+    assert profiles.max_batch_size("issueTokensBatch", 1_000_000, 200) == 34
+    assert profiles.max_batch_size("issueTokensBatch", 100_000_000, 200) == 200
+    assert profiles.max_batch_size("registerCustomers", 1_000_000, 200) is None
+
+
+def test_profiles_round_trip_through_file(tmp_path):
+    path = tmp_path / "profiles.json"
+    profiles = GasProfiles(str(path))
+    profiles.record("issueTokens", "first", 79449)
+    profiles.save()
+
+    assert json.loads(path.read_text()) == {"issueTokens:first": 79449}
+    assert GasProfiles(str(path)).lookup("issueTokens", "first") == 79449
+
+
+def test_shipped_profile_covers_issue_tokens(owner, user, manager):
+    """The checked-in profile, with its margin, covers a real mint"""
+    profiles = GasProfiles("deployments/gas_profiles.json")
+    if not manager.isCustomerRegistered(user.address):
+        manager.registerCustomer(user.address, sender=owner)
+
+    receipt = manager.issueTokens(user.address, 10**18, sender=owner)
+    assert receipt.gas_used <= profiles.gas_limit("issueTokens", "first")
+    receipt = manager.issueTokens(user.address, 10**18, sender=owner)
+    assert receipt.gas_used <= profiles.gas_limit("issueTokens", "repeat")
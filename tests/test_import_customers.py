@@ -0,0 +1,80 @@
+import pytest
+from eth_utils import keccak, to_checksum_address
+
+from scripts.import_customers import MINED, CustomerImporter, ImportCheckpoint, read_addresses
+
+
+def _addresses(count, salt="member"):
+    return [to_checksum_address(keccak(text=f"{salt}-{i}")[-20:]) for i in range(count)]
+
+
+def _sender(owner, manager, sent, receipts, fail_after=None):
+    def send_chunk(addresses):
+        if fail_after is not None and len(sent) >= fail_after:
+            raise ConnectionError("RPC down")
+        sent.append(list(addresses))
+        receipt = manager.registerCustomers(addresses, sender=owner)
+        receipts[receipt.txn_hash] = receipt
+        return receipt.txn_hash
+
+    return send_chunk, lambda tx_hash: receipts[tx_hash].status == 1
+
+
+def test_register_customers_skips_registered(owner, manager):
+    first, second = _addresses(2, "batch")
+    manager.registerCustomer(first, sender=owner)
+    receipt = manager.registerCustomers([first, second, second], sender=owner)
+    assert [log.customer for log in receipt.decode_logs(manager.CustomerRegistered)] == [second]
+    assert manager.isCustomerRegistered(second)
+
+
+def test_read_addresses_formats(tmp_path):
+    members = _addresses(2)
+    csv_file = tmp_path / "members.csv"
+    csv_file.write_text(f"name,wallet\nAn,{members[0]}\nBinh,{members[1]}\n")
+    rows = list(read_addresses(str(csv_file)))
+    assert [raw for raw, _ in rows] == members
+    assert [raw for raw, _ in read_addresses(str(csv_file), rows[0][1])] == members[1:]
+
+    bare = tmp_path / "bare.csv"
+    bare.write_text("\n".join(members) + "\n")
+    assert [raw for raw, _ in read_addresses(str(bare))] == members
+
+    jsonl = tmp_path / "members.jsonl"
+    jsonl.write_text(f'{{"address": "{members[0]}"}}\n\n"{members[1]}"\n')
+    assert [raw for raw, _ in read_addresses(str(jsonl))] == members
+
+    # Malformed lines come through as empty addresses instead of aborting the import
+    messy = tmp_path / "messy.jsonl"
+    messy.write_text(f'{{"address": "{members[0]}"\n42\n[1, 2]\n{{"wallet": 7}}\n"{members[1]}"\n')
+    assert [raw for raw, _ in read_addresses(str(messy))] == ["", "", "", "", members[1]]
+
+
+def test_import_dedupes_and_resumes(owner, manager, tmp_path):
+    members = _addresses(10)
+    source = tmp_path / "members.csv"
+    lines = ["address"] + members[:6] + [members[0].lower(), "not-an-address"] + members[6:]
+    source.write_text("\n".join(lines) + "\n")
+    checkpoint = ImportCheckpoint(str(tmp_path / "import.db"))
+
+    sent, receipts = [], {}
+    send, check = _sender(owner, manager, sent, receipts, fail_after=2)
+    importer = CustomerImporter(checkpoint, send, check, chunk_size=3, poll_interval=0)
+    with pytest.raises(ConnectionError):
+        importer.run(str(source))
+    assert sent == [members[0:3], members[3:6]]
+
+    # The crashed run left chunk 3 pending; it is sent first, then the rest of the file
+    send, check = _sender(owner, manager, sent, receipts)
+    result = CustomerImporter(checkpoint, send, check, chunk_size=3, poll_interval=0).run(str(source))
+    assert sent[2:] == [members[6:9], members[9:]]
+    assert result[MINED] == 10
+    assert result["invalid"] == 0 and result["duplicates"] == 0  # only lines after the checkpoint are read
+    assert all(manager.isCustomerRegistered(member) for member in members)
+
+    # A finished import has nothing left to send
+    assert CustomerImporter(checkpoint, send, check).run(str(source))[MINED] == 10
+    assert len(sent) == 4
+    with pytest.raises(ValueError):
+        CustomerImporter(checkpoint, send, check).run(str(tmp_path / "other.csv"))
+    checkpoint.close()
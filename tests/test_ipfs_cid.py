@@ -0,0 +1,59 @@
+import pytest
+
+from scripts.ipfs_cid import CHUNK_SIZE, PinIndex, b58decode, b58encode, cid_of_bytes, cid_of_file, cid_of_json
+from scripts.ipfs_demo import PinataIPFS
+
+
+@pytest.mark.parametrize("content,v0,v1", [
+    (b"", "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH",
+     "bafkreihdwdcefgh4dqkjv67uzcmw7ojee6xedzdetojuzjevtenxquvyku"),
+    (b"hello world", "Qmf412jQZiuVUtdgnB36FXFX7xg5V6KEbSJ4dpQuhkLyfD", None),
+    (b"hello world\n", "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o",
+     "bafkreifjjcie6lypi6ny7amxnfftagclbuxndqonfipmb64f2km2devei4"),
+])
+def test_known_cids(content, v0, v1):
+    assert cid_of_bytes(content) == v0
+    if v1:
+        assert cid_of_bytes(content, version=1) == v1
+    assert b58encode(b58decode(v0)) == v0
+
+
+def test_chunked_file_matches_bytes(tmp_path):
+    content = bytes(range(256)) * (CHUNK_SIZE // 256 * 3 + 7)  # four chunks
+    path = tmp_path / "image.png"
+    path.write_bytes(content)
+
+    assert cid_of_file(str(path)) == cid_of_bytes(content)
+    assert cid_of_file(str(path), version=1) == cid_of_bytes(content, version=1)
+    assert cid_of_bytes(content).startswith("Qm")
+    assert cid_of_bytes(content, version=1).startswith("bafybei")  # dag-pb root over raw leaves
+    assert cid_of_bytes(content) != cid_of_bytes(content[:-1])
+
+
+def test_json_serialized_like_pinata():
+    metadata = {"name": "Voucher giảm giá 10%", "token_cost": 100}
+    assert cid_of_json(metadata) == cid_of_bytes('{"name":"Voucher giảm giá 10%","token_cost":100}'.encode())
+
+
+def test_pin_index_skips_known_content(pinata_stub, tmp_path):
+    index_path = str(tmp_path / "pins.db")
+    image = tmp_path / "reward.png"
+    image.write_bytes(b"png" * 1000)
+    metadata = {"name": "Túi tote cao cấp", "token_cost": 500}
+
+    client = PinataIPFS("key", "secret", base_url=pinata_stub.url, pin_index=PinIndex(index_path))
+    cids = [client.upload_json(metadata, "meta"), client.upload_file(str(image), "image"),
+            client.upload_bytes(b"pdf", "certificate")]
+    assert cids == [cid_of_json(metadata), cid_of_file(str(image)), cid_of_bytes(b"pdf")]
+    assert len(pinata_stub.requests) == 3
+
+    # A new process with the same index uploads nothing
+    client = PinataIPFS("key", "secret", base_url=pinata_stub.url, pin_index=PinIndex(index_path))
+    assert [client.upload_json(metadata, "meta"), client.upload_file(str(image), "image"),
+            client.upload_bytes(b"pdf", "certificate")] == cids
+    assert len(pinata_stub.requests) == 3
+    assert client.stats()["skipped"] == 3
+
+    v1 = PinataIPFS("key", "secret", base_url=pinata_stub.url, cid_version=1, pin_index=PinIndex(index_path))
+    assert v1.upload_bytes(b"pdf", "certificate") == cid_of_bytes(b"pdf", version=1)
+    assert len(pinata_stub.requests) == 4
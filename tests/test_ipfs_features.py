@@ -1,5 +1,7 @@
 from ape import reverts
 
+from scripts.ipfs_cid import bytes32_to_cid, cid_to_bytes32
+
 
 def test_set_reward_metadata(owner, manager):
     """Test setting IPFS metadata for a reward"""
@@ -58,11 +60,11 @@ def test_issue_certificate_to_customer(owner, user, manager):
     certificate_cid = "QmS4ustL54uo8FzR9455qaxZwuMiUhyvMcX9Ba8nUH4uVv"
     
     # Issue certificate
-    tx = manager.issueCertificate(user.address, certificate_cid, sender=owner)
+    tx = manager.issueCertificate(user.address, cid_to_bytes32(certificate_cid), sender=owner)
     assert tx is not None
     
     # Verify certificate was issued
-    certificates = manager.getCustomerCertificates(user.address)
+    certificates = [bytes32_to_cid(c) for c in manager.getCustomerCertificates(user.address)]
     assert certificate_cid in certificates
     assert manager.getCertificateCount(user.address) >= 1
 
@@ -83,7 +85,7 @@ def test_issue_multiple_certificates(owner, user, manager):
     
     # Issue multiple certificates
     for cert_cid in certs:
-        manager.issueCertificate(user.address, cert_cid, sender=owner)
+        manager.issueCertificate(user.address, cid_to_bytes32(cert_cid), sender=owner)
     
     # Verify all certificates were added
     final_count = manager.getCertificateCount(user.address)
@@ -97,7 +99,7 @@ def test_issue_certificate_to_unregistered_customer_fails(owner, accounts, manag
     
     # Should revert if customer not registered
     with reverts():
-        manager.issueCertificate(unregistered_user.address, certificate_cid, sender=owner)
+        manager.issueCertificate(unregistered_user.address, cid_to_bytes32(certificate_cid), sender=owner)
 
 
 def test_complete_reward_with_metadata_workflow(owner, user, token, manager):
@@ -129,10 +131,10 @@ def test_complete_reward_with_metadata_workflow(owner, user, token, manager):
     manager.redeemReward(reward_id, sender=user)
     
     # 6. Issue certificate after redemption
-    manager.issueCertificate(user.address, certificate_cid, sender=owner)
+    manager.issueCertificate(user.address, cid_to_bytes32(certificate_cid), sender=owner)
     
     # Verify certificate
-    assert certificate_cid in manager.getCustomerCertificates(user.address)
+    assert cid_to_bytes32(certificate_cid) in manager.getCustomerCertificates(user.address)
 
 
 def test_get_empty_certificates_for_new_customer(owner, accounts, manager):
@@ -146,3 +148,18 @@ def test_get_empty_certificates_for_new_customer(owner, accounts, manager):
     assert manager.getCertificateCount(new_customer.address) == 0
     assert len(manager.getCustomerCertificates(new_customer.address)) == 0
 
+
+def test_certificates_are_paginated_without_cap(owner, accounts, manager):
+    """Test that certificates are not capped and can be read page by page"""
+    customer = accounts[9]
+    manager.registerCustomer(customer.address, sender=owner)
+    digests = [(i + 1).to_bytes(32, "big") for i in range(120)]
+    for digest in digests:
+        manager.issueCertificate(customer.address, digest, sender=owner)
+    
+    assert manager.getCertificateCount(customer.address) == 120
+    # Default page is the first MAX_PAGE_SIZE (100) certificates
+    assert manager.getCustomerCertificates(customer.address) == digests[:100]
+    assert manager.getCustomerCertificates(customer.address, 100) == digests[100:]
+    assert manager.getCustomerCertificates(customer.address, 10, 5) == digests[10:15]
+    assert manager.getCustomerCertificates(customer.address, 200, 5) == []
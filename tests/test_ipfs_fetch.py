@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+
+from scripts.ipfs_cid import cid_of_bytes
+from scripts.ipfs_fetch import ContentCache, ContentNotFound, GatewayFetcher
+
+
+def _gateway(make_stub, content: bytes, served: bytes = None, delay=0.0):
+    """Stub gateway serving `served` (default: the real content) under its CID"""
+    stub = make_stub(delay=delay)
+    cid = cid_of_bytes(content)
+    stub.pinned[cid] = ("content", content if served is None else served)
+    return stub, cid
+
+
+def test_hedged_fetch_takes_first_valid_response(make_pinata_stub, tmp_path):
+    content = b"reward metadata" * 100
+    slow, cid = _gateway(make_pinata_stub, content, delay=1.0)
+    fast, _ = _gateway(make_pinata_stub, content)
+    fetcher = GatewayFetcher(ContentCache(str(tmp_path)), gateways=[slow.url, fast.url], hedge_delay=0.05)
+
+    started = time.monotonic()
+    assert bytes(fetcher.fetch(cid)) == content
+    assert time.monotonic() - started < 0.8
+    assert fetcher.gateway_stats() == {slow.url: 0, fast.url: 1}
+
+    # Immutable by CID: served from the cache afterwards
+    requests_before = len(slow.requests) + len(fast.requests)
+    hits_before = fetcher.cache.stats()["hits"]
+    assert bytes(fetcher.fetch(cid)) == content
+    assert len(slow.requests) + len(fast.requests) == requests_before
+    assert fetcher.cache.stats()["hits"] == hits_before + 1
+    time.sleep(1.0)
+    assert sorted(os.listdir(tmp_path)) == [cid]  # the slow copy was discarded
+
+
+def test_rejects_content_not_matching_cid(make_pinata_stub, tmp_path):
+    content = b'{"name":"Voucher"}'
+    lying, cid = _gateway(make_pinata_stub, content, served=b'{"name":"Tampered"}')
+    honest, _ = _gateway(make_pinata_stub, content)
+    fetcher = GatewayFetcher(ContentCache(str(tmp_path)), gateways=[lying.url, honest.url], hedge_delay=5)
+
+    assert bytes(fetcher.fetch(cid)) == content
+    assert fetcher.gateway_stats()[honest.url] == 1
+
+    other = cid_of_bytes(b"never pinned")
+    with pytest.raises(ContentNotFound):
+        GatewayFetcher(ContentCache(str(tmp_path / "b")), gateways=[lying.url]).fetch(other)
+    with pytest.raises(ValueError):
+        fetcher.fetch("../../etc/passwd")
+
+
+def test_cache_evicts_least_recently_used(pinata_stub, tmp_path):
+    blobs = [bytes([i]) * 1000 for i in range(4)]
+    cids = [cid_of_bytes(blob) for blob in blobs]
+    stub = pinata_stub
+    for cid, blob in zip(cids, blobs):
+        stub.pinned[cid] = ("blob", blob)
+    fetcher = GatewayFetcher(ContentCache(str(tmp_path), max_bytes=3000), gateways=[stub.url])
+
+    fetcher.fetch_many(cids[:3])
+    fetcher.fetch(cids[0])  # now most recent
+    fetcher.fetch(cids[3])
+
+    cache = ContentCache(str(tmp_path), max_bytes=3000)
+    assert cids[0] in cache and cids[3] in cache
+    assert sum(cid in cache for cid in cids[1:3]) == 1
+    assert cache.stats()["bytes"] == 3000
+    assert bytes(cache.get(cids[0])) == blobs[0]
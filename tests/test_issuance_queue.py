@@ -0,0 +1,148 @@
+import sqlite3
+import time
+
+from scripts.issuance_queue import IssuanceQueue, QueueSubmitter
+
+
+CUSTOMER = "0x742d35Cc6634C0532925a3b844Bc9e7595f0bEb0"
+
+
+def test_enqueue_is_durable(tmp_path):
+    """Jobs survive reopening the queue file"""
+    path = str(tmp_path / "queue.db")
+    queue = IssuanceQueue(path)
+    job_id = queue.enqueue(CUSTOMER, 5 * 10**18)
+    queue.close()
+
+    job = IssuanceQueue(path).get(job_id)
+    assert job["status"] == "queued"
+    assert job["customer"] == CUSTOMER
+    assert job["amount"] == 5 * 10**18
+
+
+def test_claim_hands_out_each_job_once(tmp_path):
+    queue = IssuanceQueue(str(tmp_path / "queue.db"))
+    ids = [queue.enqueue(CUSTOMER, i) for i in range(5)]
+
+    first = queue.claim(limit=3)
+    second = queue.claim(limit=3)
+
+    assert [j["id"] for j in first] == ids[:3]
+    assert [j["id"] for j in second] == ids[3:]
+    assert queue.claim(limit=3) == []
+
+
+def test_submitter_moves_jobs_to_mined_and_failed(tmp_path):
+    queue = IssuanceQueue(str(tmp_path / "queue.db"))
+    ok = queue.enqueue(CUSTOMER, 1)
+    reverted = queue.enqueue(CUSTOMER, 2)
+    rejected = queue.enqueue(CUSTOMER, 3)
+
+    def submit(job):
+        if job["amount"] == 3:
+            raise ValueError("insufficient funds")
+        return f"0x{job['amount']:064x}"
+
+    def check(tx_hash):
+        return int(tx_hash, 16) == 1
+
+    submitter = QueueSubmitter(queue, submit, check, rate=100)
+    submitter.submit_pending()
+    assert queue.get(ok)["status"] == "sent"
+    submitter.confirm_sent()
+
+    assert queue.get(ok)["status"] == "mined"
+    assert queue.get(ok)["tx_hash"] == f"0x{1:064x}"
+    assert queue.get(reverted)["status"] == "failed"
+    assert queue.get(rejected)["status"] == "failed"
+    assert "insufficient funds" in queue.get(rejected)["error"]
+
+
+def test_submitter_thread_drains_queue(tmp_path):
+    queue = IssuanceQueue(str(tmp_path / "queue.db"))
+    ids = [queue.enqueue(CUSTOMER, i + 1) for i in range(4)]
+    submitter = QueueSubmitter(queue, lambda job: "0xabc", lambda tx: True, rate=50, poll_interval=0.01)
+    submitter.start()
+    try:
+        deadline = time.time() + 5
+        while time.time() < deadline and any(queue.get(i)["status"] != "mined" for i in ids):
+            time.sleep(0.02)
+    finally:
+        submitter.stop()
+        submitter.join()
+
+    assert all(queue.get(i)["status"] == "mined" for i in ids)
+
+
+def test_interrupted_submission_is_not_retried(tmp_path):
+    """A job claimed before a crash is failed, never resubmitted"""
+    queue = IssuanceQueue(str(tmp_path / "queue.db"))
+    job_id = queue.enqueue(CUSTOMER, 1)
+    queue.claim()
+
+    assert queue.fail_interrupted(older_than=0) == 1
+    assert queue.get(job_id)["status"] == "failed"
+    assert queue.claim() == []
+
+
+def test_job_interrupted_just_before_restart_is_failed_later(tmp_path):
+    """A job claimed inside the interrupted window is failed once the window passes"""
+    queue = IssuanceQueue(str(tmp_path / "queue.db"))
+    job_id = queue.enqueue(CUSTOMER, 1)
+    queue.claim()  # the previous process crashed right after this
+
+    submitter = QueueSubmitter(queue, lambda job: "0xabc", lambda tx: True,
+                               poll_interval=0.01, interrupted_after=0.2)
+    submitter.start()
+    try:
+        assert queue.get(job_id)["status"] == "queued"
+        deadline = time.time() + 5
+        while time.time() < deadline and queue.get(job_id)["status"] != "failed":
+            time.sleep(0.02)
+    finally:
+        submitter.stop()
+        submitter.join()
+
+    assert queue.get(job_id)["status"] == "failed"
+    assert queue.get(job_id)["error"] == "Interrupted during submission"
+
+
+def test_confirm_sent_rotates_past_jobs_without_receipts(tmp_path):
+    """More than one page of dropped transactions does not starve newer jobs"""
+    queue = IssuanceQueue(str(tmp_path / "queue.db"))
+    dropped = [queue.enqueue(CUSTOMER, 1) for _ in range(3)]
+    newer = queue.enqueue(CUSTOMER, 2)
+    submitter = QueueSubmitter(queue, lambda job: f"0x{job['amount']:064x}", lambda tx: int(tx, 16) == 2 or None,
+                               rate=100)
+    submitter.submit_pending()
+
+    submitter.confirm_sent(limit=2)
+    assert queue.get(newer)["status"] == "sent"
+    submitter.confirm_sent(limit=2)
+    assert queue.get(newer)["status"] == "mined"
+    assert all(queue.get(job_id)["status"] == "sent" for job_id in dropped)
+
+
+def test_submitter_survives_a_failed_pass(tmp_path):
+    queue = IssuanceQueue(str(tmp_path / "queue.db"))
+    job_id = queue.enqueue(CUSTOMER, 1)
+    submitter = QueueSubmitter(queue, lambda job: "0xabc", lambda tx: True, rate=50, poll_interval=0.01)
+    fail_interrupted = queue.fail_interrupted
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky(older_than):
+        if failures:
+            raise failures.pop()
+        return fail_interrupted(older_than)
+
+    queue.fail_interrupted = flaky
+    submitter.start()
+    try:
+        deadline = time.time() + 5
+        while time.time() < deadline and queue.get(job_id)["status"] != "mined":
+            time.sleep(0.02)
+    finally:
+        submitter.stop()
+        submitter.join()
+
+    assert queue.get(job_id)["status"] == "mined"
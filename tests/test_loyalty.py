@@ -38,3 +38,50 @@ def test_redeem_requires_balance_and_allowance(owner, user, token, manager):
     assert token.balanceOf(user.address) == balance - cost
 
 
+def test_issue_tokens_batch(owner, accounts, token, manager):
+    customers = [accounts[7], accounts[8], accounts[9]]
+    amounts = [10 * 10**18, 20 * 10**18, 30 * 10**18]
+    for c in customers:
+        if not manager.isCustomerRegistered(c.address):
+            manager.registerCustomer(c.address, sender=owner)
+    before = [token.balanceOf(c.address) for c in customers]
+
+    tx = manager.issueTokensBatch([c.address for c in customers], amounts, sender=owner)
+
+    for c, b, a in zip(customers, before, amounts):
+        assert token.balanceOf(c.address) == b + a
+    # One Transfer log per order, in order
+    transfers = [log for log in tx.decode_logs(token.Transfer)]
+    assert [log._to for log in transfers] == [c.address for c in customers]
+
+
+def test_issue_tokens_batch_rejects_bad_input(owner, user, accounts, manager):
+    if not manager.isCustomerRegistered(user.address):
+        manager.registerCustomer(user.address, sender=owner)
+
+    # Mismatched lengths
+    with reverts():
+        manager.issueTokensBatch([user.address], [1, 2], sender=owner)
+    # Any unregistered customer reverts the whole batch
+    with reverts():
+        manager.issueTokensBatch([user.address, accounts[5].address], [1, 1], sender=owner)
+    # Only owner
+    with reverts():
+        manager.issueTokensBatch([user.address], [1], sender=user)
+
+
+def test_register_and_issue_tokens_in_one_call(owner, user, accounts, token, manager):
+    customer = accounts[7]
+    tx = manager.registerAndIssueTokens(customer.address, 10 * 10**18, sender=owner)
+    assert manager.isCustomerRegistered(customer.address) is True
+    assert token.balanceOf(customer.address) == 10 * 10**18
+    assert [log.customer for log in tx.decode_logs(manager.CustomerRegistered)] == [customer.address]
+
+    # Already registered: only mints
+    tx = manager.registerAndIssueTokens(customer.address, 5 * 10**18, sender=owner)
+    assert list(tx.decode_logs(manager.CustomerRegistered)) == []
+    assert token.balanceOf(customer.address) == 15 * 10**18
+
+    # Only owner
+    with reverts():
+        manager.registerAndIssueTokens(accounts[8].address, 1, sender=user)
@@ -0,0 +1,69 @@
+import pytest
+from ape import reverts
+from eth_utils import keccak, to_checksum_address
+
+from scripts.merkle_campaign import ProofStore, build_campaign, leaf_hash, read_allocations, verify_proof
+
+
+def _customer(i):
+    return to_checksum_address(keccak(text=f"campaign-{i}")[-20:])
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 300])
+def test_every_proof_verifies(tmp_path, monkeypatch, count):
+    # Small reads so levels are built across several blocks
+    monkeypatch.setattr("scripts.merkle_campaign.NODES_PER_READ", 8)
+    allocations = [(_customer(i), (i + 1) * 10**18) for i in range(count)]
+    summary = build_campaign(7, iter(allocations), str(tmp_path))
+    store = ProofStore(str(tmp_path))
+    root = bytes.fromhex(summary["merkle_root"][2:])
+    assert store.leaf_count == summary["claims"] == count
+
+    for i, (customer, amount) in enumerate(allocations):
+        claim = store.claim(customer)
+        assert (claim["index"], claim["amount"]) == (i, amount)
+        proof = [bytes.fromhex(node[2:]) for node in claim["proof"]]
+        assert len(proof) <= summary["depth"]
+        assert verify_proof(root, leaf_hash(7, i, customer, amount), proof)
+    assert store.claim(_customer(count)) is None
+    store.close()
+
+
+def test_allocations_are_merged(tmp_path):
+    source = tmp_path / "allocations.csv"
+    source.write_text(f"address,amount\n{_customer(0)},5\n{_customer(1)},7\n{_customer(0).lower()},3\n")
+    summary = build_campaign(1, read_allocations(str(source)), str(tmp_path / "out"))
+    assert (summary["claims"], summary["total_amount"]) == (2, "15")
+    assert ProofStore(str(tmp_path / "out")).claim(_customer(0))["amount"] == 8
+
+    source.write_text(f"address,amount\n{_customer(0)},0\n")
+    with pytest.raises(ValueError):
+        build_campaign(1, read_allocations(str(source)), str(tmp_path / "bad"))
+
+
+def test_claim_against_campaign_root(owner, user, accounts, token, manager, tmp_path):
+    customers = [accounts[7].address, accounts[8].address, accounts[9].address]
+    summary = build_campaign(3, [(c, (i + 1) * 10**18) for i, c in enumerate(customers)], str(tmp_path))
+    store = ProofStore(str(tmp_path))
+
+    with reverts("Only owner"):
+        manager.setCampaignRoot(3, summary["merkle_root"], sender=user)
+    manager.setCampaignRoot(3, summary["merkle_root"], sender=owner)
+    with reverts("Campaign exists"):
+        manager.setCampaignRoot(3, summary["merkle_root"], sender=owner)
+
+    claim = store.claim(customers[1])
+    # Anyone can relay the claim; the tokens go to the customer
+    tx = manager.claim(3, claim["index"], claim["customer"], claim["amount"], claim["proof"], sender=user)
+    assert token.balanceOf(customers[1]) == 2 * 10**18
+    assert manager.isClaimed(3, 1) and not manager.isClaimed(3, 0)
+    assert [log.index for log in tx.decode_logs(manager.Claimed)] == [1]
+
+    with reverts("Already claimed"):
+        manager.claim(3, claim["index"], claim["customer"], claim["amount"], claim["proof"], sender=user)
+    other = store.claim(customers[2])
+    with reverts("Invalid proof"):
+        manager.claim(3, other["index"], other["customer"], 100 * 10**18, other["proof"], sender=user)
+    with reverts("Unknown campaign"):
+        manager.claim(4, other["index"], other["customer"], other["amount"], other["proof"], sender=user)
+    store.close()
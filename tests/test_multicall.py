@@ -0,0 +1,65 @@
+from ape import networks
+from eth_utils import keccak, to_checksum_address
+
+from scripts.ipfs_cid import cid_to_bytes32
+from scripts.multicall import MulticallReader
+
+
+def _reader(multicall, token, manager, **kwargs):
+    return MulticallReader(networks.provider.web3, multicall.address, token.address, manager.address, **kwargs)
+
+
+def _count_calls(reader):
+    """Record the number of calls sent in each aggregate eth_call"""
+    calls = []
+    original = reader.aggregate
+
+    def counting_aggregate(batch, block_identifier="latest"):
+        calls.append(len(batch))
+        return original(batch, block_identifier)
+
+    reader.aggregate = counting_aggregate
+    return calls
+
+
+def test_customer_snapshot_matches_view_calls(owner, accounts, token, manager, multicall):
+    registered = accounts[7]
+    if not manager.isCustomerRegistered(registered.address):
+        manager.registerCustomer(registered.address, sender=owner)
+    manager.issueTokens(registered.address, 42 * 10**18, sender=owner)
+    manager.issueCertificate(registered.address, cid_to_bytes32("QmS4ustL54uo8FzR9455qaxZwuMiUhyvMcX9Ba8nUH4uVv"), sender=owner)
+    customers = [registered, accounts[5], accounts[8]]
+
+    snapshot = _reader(multicall, token, manager).customer_snapshot([c.address for c in customers])
+
+    for c in customers:
+        assert snapshot[c.address] == {
+            "balance": token.balanceOf(c.address),
+            "registered": manager.isCustomerRegistered(c.address),
+            "certificate_count": manager.getCertificateCount(c.address),
+        }
+    assert snapshot[registered.address]["registered"] is True
+    assert snapshot[accounts[5].address]["registered"] is False
+
+
+def test_large_requests_are_split_into_chunks(owner, accounts, token, manager, multicall):
+    reader = _reader(multicall, token, manager, max_calls=6)
+    calls = _count_calls(reader)
+    addresses = [a.address for a in accounts[:5]]
+    snapshot = reader.customer_snapshot(addresses)
+
+    assert calls == [6, 6, 3]
+    assert list(snapshot) == addresses
+    assert snapshot[addresses[0]]["balance"] == token.balanceOf(addresses[0])
+
+
+def test_500_customers_in_one_call(token, manager, multicall):
+    reader = _reader(multicall, token, manager)
+    calls = _count_calls(reader)
+    addresses = [to_checksum_address(keccak(text=f"customer-{i}")[-20:]) for i in range(500)]
+
+    snapshot = reader.customer_snapshot(addresses)
+
+    assert calls == [1500]
+    assert len(snapshot) == 500
+    assert not any(v["registered"] for v in snapshot.values())
@@ -0,0 +1,128 @@
+import threading
+
+import pytest
+from ape import networks
+
+from scripts.nonce_manager import NonceManager
+
+
+@pytest.fixture
+def w3():
+    return networks.provider.web3
+
+
+def _send_value(w3, sender, recipient, nonce, gas=21000):
+    tx = {
+        'to': recipient.address,
+        'value': 1,
+        'gas': gas,
+        'gasPrice': w3.eth.gas_price,
+        'nonce': nonce,
+        'chainId': w3.eth.chain_id,
+    }
+    signed_tx = w3.eth.account.sign_transaction(tx, private_key=sender.private_key)
+    return w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+
+
+def test_concurrent_allocations_are_unique(owner, w3):
+    """Nonces handed out from many threads are distinct and contiguous"""
+    nm = NonceManager(w3, owner.address)
+    start = nm.sync()
+    allocated = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(25):
+            nonce = nm.allocate()
+            with lock:
+                allocated.append(nonce)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(allocated) == list(range(start, start + 200))
+
+
+def test_released_nonce_is_reused_first(owner, w3):
+    """A rejected nonce fills the gap before the counter advances"""
+    nm = NonceManager(w3, owner.address)
+    first = nm.allocate()
+    second = nm.allocate()
+    nm.release(first)
+
+    assert nm.allocate() == first
+    assert nm.allocate() == second + 1
+
+
+def test_reserve_sends_with_local_nonces(owner, user, w3):
+    """Back-to-back sends use increasing nonces without re-querying"""
+    nm = NonceManager(w3, owner.address)
+    start = nm.sync()
+
+    for _ in range(3):
+        with nm.reserve() as nonce:
+            _send_value(w3, owner, user, nonce)
+
+    assert w3.eth.get_transaction_count(owner.address, 'pending') == start + 3
+    assert nm.allocate() == start + 3
+
+
+def test_failed_send_resyncs_and_recovers_gap(owner, user, w3):
+    """A send rejected by the node does not leave a hole in the sequence"""
+    nm = NonceManager(w3, owner.address)
+    start = nm.sync()
+
+    with pytest.raises(Exception):
+        with nm.reserve() as nonce:
+            # Below intrinsic gas: the node rejects it
+            _send_value(w3, owner, user, nonce, gas=100)
+
+    with nm.reserve() as nonce:
+        assert nonce == start
+        _send_value(w3, owner, user, nonce)
+
+    assert w3.eth.get_transaction_count(owner.address, 'pending') == start + 1
+
+
+def test_sync_never_moves_back_behind_a_lagging_node(owner, user, w3, monkeypatch):
+    """A stale pending count does not reissue nonces already in the mempool"""
+    nm = NonceManager(w3, owner.address)
+    start = nm.sync()
+    for _ in range(2):
+        with nm.reserve() as nonce:
+            _send_value(w3, owner, user, nonce)
+
+    # A node behind the pool still reports the old pending nonce
+    monkeypatch.setattr(w3.eth, 'get_transaction_count', lambda address, block: start)
+    assert nm.sync() == start + 2
+    assert nm.reset() == start
+
+
+def test_workers_sharing_a_store_never_reuse_nonces(owner, w3, tmp_path):
+    """Managers on one SQLite file (one per worker process) share the sequence"""
+    path = str(tmp_path / "nonces.db")
+    workers = [NonceManager(w3, owner.address, path) for _ in range(4)]
+    start = workers[0].peek()
+    allocated = []
+    lock = threading.Lock()
+
+    def worker(nm):
+        for _ in range(25):
+            nonce = nm.allocate()
+            with lock:
+                allocated.append(nonce)
+
+    threads = [threading.Thread(target=worker, args=(nm,)) for nm in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(allocated) == list(range(start, start + 100))
+    # A nonce released by one worker is reused by another
+    nonce = workers[1].allocate()
+    workers[1].release(nonce)
+    assert workers[2].allocate() == nonce
@@ -0,0 +1,53 @@
+from ape import chain, reverts
+
+from scripts.redemption import permit_deadline, permit_typed_data, sign_permit
+
+
+def _permit(token, customer, spender, value, deadline=None):
+    typed_data = permit_typed_data(
+        token.name(), token.address, chain.chain_id, customer.address, spender,
+        value, token.nonces(customer.address), deadline or permit_deadline()
+    )
+    return typed_data["message"]["deadline"], sign_permit(customer.private_key, typed_data)
+
+
+def test_permit_sets_allowance_once(owner, accounts, token):
+    customer, spender = accounts[7], accounts[8]
+    deadline, (v, r, s) = _permit(token, customer, spender.address, 5 * 10**18)
+
+    token.permit(customer.address, spender.address, 5 * 10**18, deadline, v, r, s, sender=spender)
+    assert token.allowance(customer.address, spender.address) == 5 * 10**18
+    assert token.nonces(customer.address) == 1
+
+    with reverts("Invalid signature"):
+        token.permit(customer.address, spender.address, 5 * 10**18, deadline, v, r, s, sender=spender)
+    # Signed by someone else
+    with reverts("Invalid signature"):
+        token.permit(owner.address, spender.address, 5 * 10**18, deadline, v, r, s, sender=spender)
+
+    expired, (v, r, s) = _permit(token, customer, spender.address, 1, deadline=chain.pending_timestamp - 1)
+    with reverts("Permit expired"):
+        token.permit(customer.address, spender.address, 1, expired, v, r, s, sender=spender)
+
+
+def test_redeem_with_permit_in_one_transaction(owner, accounts, token, manager):
+    customer = accounts[7]
+    manager.registerCustomer(customer.address, sender=owner)
+    cost = manager.getRewardCost(1)
+    manager.issueTokens(customer.address, 2 * cost, sender=owner)
+
+    deadline, (v, r, s) = _permit(token, customer, manager.address, cost)
+    receipt = manager.redeemRewardWithPermit(1, deadline, v, r, s, sender=customer)
+    assert token.balanceOf(customer.address) == cost
+    assert token.allowance(customer.address, manager.address) == 0
+    assert [log.reward_id for log in receipt.decode_logs(manager.RewardRedeemed)] == [1]
+
+    # A permit front-run by a third party still lets the redemption through
+    deadline, (v, r, s) = _permit(token, customer, manager.address, cost)
+    token.permit(customer.address, manager.address, cost, deadline, v, r, s, sender=owner)
+    manager.redeemRewardWithPermit(1, deadline, v, r, s, sender=customer)
+    assert token.balanceOf(customer.address) == 0
+
+    # Nothing left to spend and the signature is used up
+    with reverts():
+        manager.redeemRewardWithPermit(1, deadline, v, r, s, sender=customer)
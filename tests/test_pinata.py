@@ -0,0 +1,67 @@
+import time
+
+import pytest
+import requests
+
+from scripts.ipfs_demo import PinataIPFS
+
+
+def _client(stub, **kwargs):
+    return PinataIPFS("key", "secret", base_url=stub.url, gateway_url=stub.url, backoff=0.01, **kwargs)
+
+
+def test_upload_file_streams_from_disk(pinata_stub, tmp_path):
+    path = tmp_path / "reward.png"
+    content = bytes(range(256)) * 4096  # 1 MiB
+    path.write_bytes(content)
+    client = _client(pinata_stub)
+
+    cid = client.upload_file(str(path), "Reward_1_Image")
+
+    assert pinata_stub.pinned[cid] == ("Reward_1_Image", content)
+    assert client.get_content(cid).content == content
+    stats = client.stats()
+    assert stats["uploads"] == 1 and stats["bytes"] > len(content) and stats["throughput"] > 0
+
+
+def test_retries_rate_limits_and_server_errors(pinata_stub):
+    pinata_stub.fail_next = [(429, {"Retry-After": "0.3"}), (503, {})]
+    client = _client(pinata_stub)
+
+    cid = client.upload_json({"name": "Voucher"}, "Reward_1_Metadata")
+
+    assert cid in pinata_stub.pinned
+    times = [t for _, _, t in pinata_stub.requests]
+    assert len(times) == 3
+    assert times[1] - times[0] >= 0.3  # Retry-After honored
+    assert client.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_retries(pinata_stub):
+    pinata_stub.fail_next = [(503, {})] * 3
+    client = _client(pinata_stub, max_retries=2)
+
+    with pytest.raises(requests.HTTPError, match="503"):
+        client.upload_bytes(b"certificate", "certificate.pdf")
+    assert len(pinata_stub.requests) == 3
+
+
+def test_upload_many_is_concurrent_and_ordered(pinata_stub, tmp_path):
+    pinata_stub.delay = 0.1
+    path = tmp_path / "image.png"
+    path.write_bytes(b"png")
+    items = [(f"certificate {i}".encode(), f"cert_{i}") for i in range(7)]
+    items.append(({"reward": 1}, "metadata"))
+    items.append((path, "image"))
+    progress = []
+    client = _client(pinata_stub, max_workers=4)
+
+    started = time.monotonic()
+    results = client.upload_many(items, progress=lambda done, total, stats: progress.append((done, total)))
+    elapsed = time.monotonic() - started
+
+    assert [r["name"] for r in results] == [name for _, name in items]
+    assert all(pinata_stub.pinned[r["cid"]][0] == r["name"] for r in results)
+    assert pinata_stub.max_active == 4
+    assert elapsed < 0.1 * len(items) / 2
+    assert progress[-1] == (9, 9)
@@ -0,0 +1,56 @@
+import pytest
+from ape import reverts
+
+from scripts.redemption import MAX_CART_SIZE, build_cart, cart_total
+
+
+def test_build_cart_merges_lines():
+    assert build_cart([(2, 1), (1, 3), (2, 2)]) == ([2, 1], [3, 3])
+    assert build_cart({5: 1}) == ([5], [1])
+    with pytest.raises(ValueError):
+        build_cart({})
+    with pytest.raises(ValueError):
+        build_cart({1: 0})
+    with pytest.raises(ValueError):
+        build_cart({reward_id: 1 for reward_id in range(MAX_CART_SIZE + 1)})
+
+
+def test_redeem_cart_with_one_transfer(owner, accounts, token, manager):
+    customer = accounts[7]
+    manager.registerCustomer(customer.address, sender=owner)
+    manager.setRewardCost(2, 30 * 10**18, sender=owner)
+    reward_ids, quantities = build_cart({1: 2, 2: 1})
+    total = cart_total(reward_ids, quantities, manager.getRewardCost)
+    assert total == 230 * 10**18
+
+    manager.issueTokens(customer.address, total, sender=owner)
+    token.approve(manager.address, total, sender=customer)
+    receipt = manager.redeemRewards(reward_ids, quantities, sender=customer)
+
+    assert token.balanceOf(customer.address) == 0
+    assert token.balanceOf(manager.address) == total
+    assert len(receipt.decode_logs(token.Transfer)) == 1
+    assert [(log.reward_id, log.cost) for log in receipt.decode_logs(manager.RewardRedeemed)] == [
+        (1, 200 * 10**18), (2, 30 * 10**18)
+    ]
+
+
+def test_redeem_cart_is_all_or_nothing(owner, accounts, token, manager):
+    customer = accounts[7]
+    manager.registerCustomer(customer.address, sender=owner)
+    cost = manager.getRewardCost(1)
+    manager.issueTokens(customer.address, 2 * cost, sender=owner)
+    token.approve(manager.address, 3 * cost, sender=customer)
+
+    with reverts("Invalid reward"):
+        manager.redeemRewards([1, 99], [1, 1], sender=customer)
+    with reverts("Invalid quantity"):
+        manager.redeemRewards([1], [0], sender=customer)
+    with reverts("Length mismatch"):
+        manager.redeemRewards([1], [1, 1], sender=customer)
+    with reverts("Empty cart"):
+        manager.redeemRewards([], [], sender=customer)
+    # Balance covers two of the three
+    with reverts():
+        manager.redeemRewards([1], [3], sender=customer)
+    assert token.balanceOf(customer.address) == 2 * cost
@@ -0,0 +1,90 @@
+import json
+
+from ape import networks
+
+from scripts.event_indexer import EventIndexer
+from scripts.ipfs_cid import cid_of_json, json_bytes
+from scripts.ipfs_fetch import ContentCache, GatewayFetcher
+from scripts.reward_catalog import RewardCatalog
+
+IMAGE_CID = "QmTzQ1JRkWErjk39mryYw2WVaphAZNAREyMchXzYywZCpa"
+
+
+def test_catalog_follows_reward_events(owner, token, manager, pinata_stub, tmp_path):
+    metadata = {"name": "Túi tote cao cấp", "token_cost": 500}
+    gateway = pinata_stub
+    gateway.pinned[cid_of_json(metadata)] = ("metadata", json_bytes(metadata))
+    indexer = EventIndexer(networks.provider.web3, str(tmp_path / "index.db"), token.address, manager.address)
+    fetcher = GatewayFetcher(ContentCache(str(tmp_path / "ipfs")), gateways=[gateway.url])
+    catalog = RewardCatalog(indexer, fetcher)
+
+    manager.setRewardCost(30, 5 * 10**18, sender=owner)
+    manager.setRewardMetadata(30, cid_of_json(metadata), sender=owner)
+    manager.setRewardImage(30, IMAGE_CID, sender=owner)
+    manager.setRewardCost(31, 10**18, sender=owner)
+    indexer.sync()
+    assert catalog.refresh()
+
+    body, etag = catalog.document()
+    rewards = {r["reward_id"]: r for r in json.loads(body)["rewards"]}
+    assert rewards[1]["cost"] == str(manager.getRewardCost(1))  # created in the constructor
+    assert rewards[30] == {
+        "reward_id": 30, "cost": str(5 * 10**18), "metadata_cid": cid_of_json(metadata),
+        "image_cid": IMAGE_CID, "metadata": metadata,
+    }
+    assert rewards[31]["metadata"] is None
+
+    # No new events: same document, no gateway traffic
+    requests_before = len(gateway.requests)
+    assert not catalog.refresh()
+    assert catalog.document() == (body, etag)
+    assert len(gateway.requests) == requests_before
+
+    manager.setRewardCost(30, 6 * 10**18, sender=owner)
+    manager.removeReward(31, sender=owner)
+    indexer.sync()
+    assert catalog.refresh()
+
+    body, new_etag = catalog.document()
+    rewards = {r["reward_id"]: r for r in json.loads(body)["rewards"]}
+    assert new_etag != etag
+    assert rewards[30]["cost"] == str(6 * 10**18) and rewards[30]["metadata"] == metadata
+    assert 31 not in rewards
+
+
+def test_catalog_rebuilds_after_rollback(owner, token, manager, tmp_path):
+    indexer = EventIndexer(networks.provider.web3, str(tmp_path / "index.db"), token.address, manager.address)
+    catalog = RewardCatalog(indexer)
+    start = indexer.w3.eth.block_number
+
+    manager.setRewardCost(40, 10**18, sender=owner)
+    indexer.sync()
+    catalog.refresh()
+    assert 40 in [r["reward_id"] for r in json.loads(catalog.document()[0])["rewards"]]
+
+    indexer.rollback(start)
+    assert catalog.refresh()
+    assert 40 not in [r["reward_id"] for r in json.loads(catalog.document()[0])["rewards"]]
+
+
+def test_malformed_metadata_cid_does_not_block_refresh(owner, token, manager, pinata_stub, tmp_path):
+    metadata = {"name": "Bình giữ nhiệt", "token_cost": 200}
+    gateway = pinata_stub
+    gateway.pinned[cid_of_json(metadata)] = ("metadata", json_bytes(metadata))
+    indexer = EventIndexer(networks.provider.web3, str(tmp_path / "index.db"), token.address, manager.address)
+    fetcher = GatewayFetcher(ContentCache(str(tmp_path / "ipfs")), gateways=[gateway.url])
+    catalog = RewardCatalog(indexer, fetcher)
+
+    manager.setRewardCost(50, 10**18, sender=owner)
+    manager.setRewardMetadata(50, "ipfs://" + cid_of_json(metadata), sender=owner)
+    manager.setRewardCost(51, 10**18, sender=owner)
+    manager.setRewardMetadata(51, cid_of_json(metadata), sender=owner)
+    indexer.sync()
+    assert catalog.refresh()
+
+    rewards = {r["reward_id"]: r for r in json.loads(catalog.document()[0])["rewards"]}
+    assert rewards[50]["metadata"] is None
+    assert rewards[51]["metadata"] == metadata
+
+    # The bad CID is remembered, not retried on every refresh
+    assert not catalog.refresh()
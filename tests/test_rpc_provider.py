@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from web3 import Web3
+
+from scripts.rpc_provider import PooledBatchProvider, RPCEndpointError
+
+
+class _StubRPC:
+    """Minimal JSON-RPC server recording every HTTP request it receives"""
+
+    def __init__(self, chain_id=1337, delay=0.0):
+        self.chain_id = chain_id
+        self.delay = delay
+        self.fail_next = 0  # respond 503 to this many requests
+        self.requests = []  # (client port, payload)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append((self.client_address[1], payload))
+                time.sleep(stub.delay)
+                if stub.fail_next:
+                    stub.fail_next -= 1
+                    self._reply(503, {"error": "unavailable"})
+                    return
+                if isinstance(payload, list):
+                    body = [stub.handle(call) for call in reversed(payload)]
+                else:
+                    body = stub.handle(payload)
+                self._reply(200, body)
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, call):
+        results = {
+            "eth_chainId": hex(self.chain_id),
+            "eth_gasPrice": hex(10**9),
+            "eth_getTransactionCount": hex(7),
+            "eth_blockNumber": hex(100),
+        }
+        if call["method"] == "eth_sendRawTransaction":
+            return {"jsonrpc": "2.0", "id": call["id"], "result": "0x" + "ab" * 32}
+        return {"jsonrpc": "2.0", "id": call["id"], "result": results[call["method"]]}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    servers = []
+
+    def make(**kwargs):
+        server = _StubRPC(**kwargs)
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def _dead_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    url = f"http://127.0.0.1:{server.server_port}"
+    server.server_close()
+    return url
+
+
+def test_batch_is_one_http_request(stubs):
+    stub = stubs()
+    provider = PooledBatchProvider([stub.url])
+
+    gas_price, nonce, chain_id = provider.batch([
+        ("eth_gasPrice", []),
+        ("eth_getTransactionCount", ["0x" + "11" * 20, "pending"]),
+        ("eth_chainId", []),
+    ])
+
+    assert len(stub.requests) == 1
+    assert (int(gas_price, 16), int(nonce, 16), int(chain_id, 16)) == (10**9, 7, 1337)
+
+
+def test_web3_calls_reuse_pooled_connection(stubs):
+    stub = stubs()
+    w3 = Web3(PooledBatchProvider([stub.url]))
+
+    assert w3.eth.block_number == 100
+    assert w3.eth.block_number == 100
+    assert w3.eth.gas_price == 10**9
+
+    ports = {port for port, _ in stub.requests}
+    assert len(stub.requests) == 3
+    assert len(ports) == 1
+
+
+def test_reads_are_retried_after_server_errors(stubs):
+    stub = stubs()
+    stub.fail_next = 2
+    provider = PooledBatchProvider([stub.url], backoff=0.01)
+
+    assert provider.make_request("eth_blockNumber", [])["result"] == hex(100)
+    assert len(stub.requests) == 3
+
+
+def test_send_raw_transaction_is_not_retried(stubs):
+    stub = stubs()
+    stub.fail_next = 1
+    provider = PooledBatchProvider([stub.url], backoff=0.01)
+
+    with pytest.raises(RPCEndpointError):
+        provider.make_request("eth_sendRawTransaction", ["0x00"])
+    assert len(stub.requests) == 1
+
+
+def test_fails_over_from_unreachable_endpoint(stubs):
+    stub = stubs(chain_id=11155111)
+    provider = PooledBatchProvider([_dead_url(), stub.url])
+
+    assert Web3(provider).eth.chain_id == 11155111
+    assert [s["healthy"] for s in provider.endpoint_stats()] == [False, True]
+    # A transaction also fails over when the connection was never opened
+    assert provider.make_request("eth_sendRawTransaction", ["0x00"])["result"] == "0x" + "ab" * 32
+
+
+def test_prefers_lowest_latency_endpoint(stubs):
+    slow = stubs(delay=0.05)
+    fast = stubs()
+    provider = PooledBatchProvider([slow.url, fast.url])
+
+    # Each endpoint is measured once, then traffic settles on the fast one
+    for _ in range(7):
+        provider.make_request("eth_blockNumber", [])
+
+    assert len(slow.requests) == 1
+    assert len(fast.requests) == 6
+
+
+def test_all_endpoints_down_raises(stubs):
+    provider = PooledBatchProvider([_dead_url()], max_retries=1, backoff=0.01)
+    with pytest.raises(RPCEndpointError):
+        provider.make_request("eth_blockNumber", [])
@@ -0,0 +1,87 @@
+import pytest
+from ape import networks, reverts
+
+from scripts.signer_pool import NoSignerAvailable, SignerPool
+
+ISSUE_TOKENS_ABI = [{
+    "type": "function", "name": "issueTokens", "stateMutability": "nonpayable",
+    "inputs": [{"name": "_customer", "type": "address"}, {"name": "_amount", "type": "uint256"}],
+    "outputs": [],
+}]
+
+
+@pytest.fixture
+def w3():
+    return networks.provider.web3
+
+
+@pytest.fixture
+def operators(owner, accounts, manager):
+    operators = [accounts[8], accounts[9]]
+    for operator in operators:
+        manager.setOperator(operator.address, True, sender=owner)
+    return operators
+
+
+def _pool(w3, operators, **kwargs):
+    return SignerPool(w3, [o.private_key for o in operators], w3.eth.chain_id,
+                      lambda: {"gasPrice": w3.eth.gas_price}, **kwargs)
+
+
+def test_operators_register_and_issue(owner, user, accounts, token, manager, operators):
+    customer, operator = accounts[7], operators[0]
+    manager.registerCustomer(customer.address, sender=operator)
+    manager.issueTokens(customer.address, 10, sender=operator)
+    assert token.balanceOf(customer.address) == 10
+
+    # Reward administration stays with the owner
+    with reverts("Only owner"):
+        manager.setRewardCost(7, 10, sender=operator)
+    with reverts("Only owner"):
+        manager.setOperator(user.address, True, sender=operator)
+
+    manager.setOperator(operator.address, False, sender=owner)
+    with reverts("Only operator"):
+        manager.issueTokens(customer.address, 10, sender=operator)
+
+
+def test_pool_spreads_sends_over_operators(owner, accounts, w3, token, manager, operators):
+    customer = accounts[7]
+    manager.registerCustomer(customer.address, sender=owner)
+    contract = w3.eth.contract(address=manager.address, abi=ISSUE_TOKENS_ABI)
+    pool = _pool(w3, operators)
+
+    senders = []
+    for _ in range(4):
+        tx_hash = pool.send(contract.functions.issueTokens(customer.address, 1), gas=100000)
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        assert receipt["status"] == 1
+        senders.append(receipt["from"])
+    assert sorted(senders) == sorted([o.address for o in operators] * 2)
+    assert token.balanceOf(customer.address) == 4
+
+    pool.refresh()
+    assert [s["backlog"] for s in pool.stats()] == [0, 0]
+
+
+def test_pool_skips_stuck_and_failing_operators(owner, accounts, w3, manager, operators):
+    customer = accounts[7]
+    manager.registerCustomer(customer.address, sender=owner)
+    contract = w3.eth.contract(address=manager.address, abi=ISSUE_TOKENS_ABI)
+    pool = _pool(w3, operators, stuck_after=0, cooldown=60)
+    first, second = pool.signers
+
+    # Without a refresh the first operator's send looks unmined, hence stuck
+    pool.send(contract.functions.issueTokens(customer.address, 1), gas=100000)
+    assert first.sent == 1 and first.stuck(0)
+    assert pool.pick() is second
+
+    # A rejected send puts the operator on cooldown
+    with pytest.raises(Exception):
+        pool.send(contract.functions.issueTokens(customer.address, 1), gas=1000)
+    assert second.cooling_down()
+    assert pool.pick() is first  # stuck, but the only one left
+
+    first.cooldown_until = second.cooldown_until
+    with pytest.raises(NoSignerAvailable):
+        pool.pick()
@@ -0,0 +1,105 @@
+from ape import chain, networks
+
+from scripts.view_cache import CacheInvalidator, ViewCache
+
+
+class _Loader:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_read_through_counts_hits_and_misses():
+    cache = ViewCache()
+    loader = _Loader(100)
+
+    assert cache.get("getRewardCost", (1,), loader) == 100
+    assert cache.get("getRewardCost", (1,), loader) == 100
+    assert loader.calls == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_bound_and_ttl():
+    cache = ViewCache(maxsize=2, ttls={"balanceOf": 0})
+    cache.get("getRewardCost", (1,), _Loader(1))
+    cache.get("getRewardCost", (2,), _Loader(2))
+    cache.get("getRewardCost", (1,), _Loader(1))  # 1 is now most recent
+    cache.get("getRewardCost", (3,), _Loader(3))  # evicts 2
+
+    loader = _Loader(2)
+    cache.get("getRewardCost", (2,), loader)
+    assert loader.calls == 1
+    assert cache.stats()["evictions"] == 2
+    assert cache.stats()["size"] == 2
+
+    # Zero TTL: never served from cache
+    balance = _Loader(5)
+    cache.get("balanceOf", ("0xabc",), balance)
+    cache.get("balanceOf", ("0xabc",), balance)
+    assert balance.calls == 2
+
+
+def test_events_evict_exact_entries():
+    cache = ViewCache()
+    alice, bob, carol = "0x" + "a" * 40, "0x" + "b" * 40, "0x" + "c" * 40
+    for address in (alice, bob, carol):
+        cache.get("balanceOf", (address,), _Loader(1))
+    cache.get("getRewardCost", (1,), _Loader(1))
+    cache.get("getRewardCost", (2,), _Loader(1))
+
+    assert cache.apply_event("Transfer", {"from": alice, "to": bob, "value": 1}) == 2
+    assert cache.apply_event("RewardUpdated", {"reward_id": 2, "old_cost": 1, "new_cost": 2}) == 1
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["invalidations"] == 3
+
+
+def test_invalidator_follows_chain_events(owner, accounts, token, manager):
+    w3 = networks.provider.web3
+    cache = ViewCache()
+    invalidator = CacheInvalidator(w3, cache, [token.address, manager.address])
+    invalidator.poll()
+    customer = accounts[7]
+
+    def cost():
+        return cache.get("getRewardCost", (1,), lambda: manager.getRewardCost(1))
+
+    def balance():
+        return cache.get("balanceOf", (customer.address,), lambda: token.balanceOf(customer.address))
+
+    old_cost, old_balance = cost(), balance()
+    manager.setRewardCost(1, old_cost + 1, sender=owner)
+    if not manager.isCustomerRegistered(customer.address):
+        manager.registerCustomer(customer.address, sender=owner)
+    manager.issueTokens(customer.address, 10**18, sender=owner)
+
+    # Stale until the events are applied
+    assert cost() == old_cost
+    assert invalidator.poll() == 2
+    assert cost() == old_cost + 1
+    assert balance() == old_balance + 10**18
+
+
+def test_invalidator_bounds_log_ranges_and_resets_after_a_gap(owner, token, manager):
+    w3 = networks.provider.web3
+    cache = ViewCache()
+    invalidator = CacheInvalidator(w3, cache, [token.address, manager.address], max_block_span=2, max_gap=5)
+    invalidator.poll()
+    start = invalidator.last_block
+
+    chain.mine(3)
+    invalidator.poll()
+    assert invalidator.last_block == start + 2  # one span per poll
+    invalidator.poll()
+    assert invalidator.last_block == start + 3
+
+    # Far behind the head: clear instead of replaying the gap
+    cache.get("getRewardCost", (1,), lambda: 1)
+    chain.mine(10)
+    assert invalidator.poll() == 1
+    assert invalidator.last_block == w3.eth.block_number
+    assert cache.stats()["size"] == 0